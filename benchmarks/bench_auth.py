@@ -0,0 +1,13 @@
+# benchmarks/bench_auth.py
+from src.utils.auth import generate_pw_hash, verify_password
+from benchmarks.harness import measure, result
+
+
+def run(scale=1):
+    pw_hash = generate_pw_hash("password")
+    return {
+            "generate_pw_hash": result(measure(
+                lambda: generate_pw_hash("password"), repeat=3)),
+            "verify_password": result(measure(
+                lambda: verify_password(pw_hash, "password"), repeat=3)),
+            }
@@ -0,0 +1,33 @@
+# benchmarks/bench_db.py
+import os
+import tempfile
+import src.db.db as db
+from benchmarks.harness import measure, result
+
+TABLE = "bench_rows(id INTEGER PRIMARY KEY, name TEXT, email TEXT)"
+INSERT = "INSERT INTO bench_rows(name, email) VALUES (?, ?)"
+
+
+def run(scale=1):
+    row_count = 500 * scale
+    rows = [(f"name {i}", f"user_{i}@email.com") for i in range(row_count)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db.create_connection(os.path.join(tmp_dir, "bench.db"))
+        db.create_table(db.cursor, db.create_table_query(TABLE))
+
+        def insert_each():
+            for row in rows:
+                db.insert(db.cursor, INSERT, row)
+
+        def insert_batched():
+            db.insert_many(db.cursor, INSERT, rows)
+
+        try:
+            each = measure(insert_each, repeat=3) / row_count
+            batched = measure(insert_batched, repeat=3) / row_count
+        finally:
+            db.close()
+    return {
+            "db_insert_per_row": result(each),
+            "db_insert_many_per_row": result(batched),
+            }
@@ -0,0 +1,50 @@
+# benchmarks/bench_memory.py
+import tracemalloc
+from datetime import datetime
+from src.booking.booking import Booking
+from src.contact.contact import Contact
+from benchmarks.harness import result
+
+"""
+    Measures the memory held per Booking and Contact object, by allocating
+    'count' of each and dividing the traced memory by 'count'.
+    Run with: python -m benchmarks.bench_memory
+"""
+
+
+def bytes_per_object(factory, count=100000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def bench_booking(count=100000):
+    date = datetime(2024, 6, 4)
+    time = (9, 30)
+    return bytes_per_object(
+            lambda: Booking("Meeting", date, time, "Contact", "Description"),
+            count)
+
+
+def bench_contact(count=100000):
+    return bytes_per_object(
+            lambda: Contact("Contact", "contact@email.com"), count)
+
+
+def run(scale=1):
+    count = 20000 * scale
+    return {
+            "booking_bytes_per_object": result(
+                bench_booking(count), "bytes/object"),
+            "contact_bytes_per_object": result(
+                bench_contact(count), "bytes/object"),
+            }
+
+
+if __name__ == '__main__':
+    for name, value in run(scale=5).items():
+        print(f"{name}: {value['value']:.1f}")
@@ -0,0 +1,28 @@
+# benchmarks/bench_user.py
+from datetime import datetime, timedelta
+from src.user.user import User
+from src.contact.contact import Contact
+from benchmarks.harness import measure, result
+
+
+def run(scale=1):
+    contact_count = 2000 * scale
+    user = User()
+    for i in range(contact_count):
+        user.add_contact(Contact(f"contact {i}", f"contact_{i}@email.com"))
+    name = f"contact {contact_count - 1}"
+    email = f"contact_{contact_count - 1}@email.com"
+    start = datetime(2024, 1, 1)
+    days = iter(range(10 ** 9))
+
+    def create_booking():
+        # A new day every call so the bookings never conflict
+        user.create_booking(
+                "Meeting", start + timedelta(days=next(days)), (9, 0),
+                name, email, "Benchmark booking")
+
+    value = measure(create_booking, number=200, repeat=5)
+    user.reset()
+    return {
+            f"user_create_booking_{contact_count}_contacts": result(value),
+            }
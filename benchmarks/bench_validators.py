@@ -0,0 +1,30 @@
+# benchmarks/bench_validators.py
+from src.utils.validators import validate_email, validate_emails, \
+        validate_string_property
+from benchmarks.harness import measure, result
+
+
+def run(scale=1):
+    emails = [f"first.last_{i}@sub.domain-{i}.example.com"
+              for i in range(1000 * scale)]
+    values = [f"value {i}" for i in range(1000 * scale)]
+
+    def check_emails():
+        for email in emails:
+            validate_email(email)
+
+    def check_email_column():
+        validate_emails(emails)
+
+    def check_strings():
+        for value in values:
+            validate_string_property(value, 'value')
+
+    return {
+            "validate_email": result(
+                measure(check_emails, repeat=7) / len(emails)),
+            "validate_emails": result(
+                measure(check_email_column, repeat=7) / len(emails)),
+            "validate_string_property": result(
+                measure(check_strings, repeat=7) / len(values)),
+            }
@@ -0,0 +1,25 @@
+# benchmarks/bench_view.py
+import time
+from benchmarks.harness import measure, result
+
+
+def run(scale=1):
+    """
+        Needs a display, raises tkinter.TclError without one.
+    """
+    from src.views.view import View
+    widget_count = 200 * scale
+    view = View()
+    try:
+        start = time.perf_counter()
+        for i in range(widget_count):
+            view.create_label(name=f"lbl_{i}", text=f"label {i}", x=0, y=0)
+        build = time.perf_counter() - start
+        last = f"lbl_{widget_count - 1}"
+        lookup = measure(lambda: view.get_component(last), number=100)
+    finally:
+        view.tk.destroy()
+    return {
+            f"view_build_{widget_count}_labels": result(build, "s"),
+            f"view_get_component_{widget_count}_widgets": result(lookup),
+            }
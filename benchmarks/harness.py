@@ -0,0 +1,30 @@
+# benchmarks/harness.py
+import time
+
+"""
+    Helpers shared by the benchmark modules.
+    Every benchmark module has a 'run(scale)' function returning a dict of
+    result name -> {"value": float, "unit": str}. Lower is better for every
+    unit used here.
+"""
+
+
+def measure(func, number=1, repeat=5):
+    """
+        Calls 'func' 'number' times per round for 'repeat' rounds and returns
+        the best time per call in seconds. The best round is the one least
+        disturbed by the rest of the machine.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = (time.perf_counter() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def result(value, unit="s/op"):
+    return {"value": value, "unit": unit}
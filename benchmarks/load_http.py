@@ -0,0 +1,116 @@
+# benchmarks/load_http.py
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from src.service.http_server import HTTPServer
+
+"""
+    Load test for src/service/http_server.py. Starts a server in this process
+    on a free port (or uses --host/--port of a running one), sends bookings
+    from several keep-alive connections and reports throughput and the p50
+    and p99 latency:
+        python -m benchmarks.load_http --requests 5000 --connections 20
+"""
+
+
+def booking_body(i):
+    # one 30 minute booking per slot, spread over as many days as needed
+    day = i // 16
+    return {"title": f"load {i}",
+            "date": f"{2030 + day // 336}-{1 + day // 28 % 12:02d}-"
+                    f"{1 + day % 28:02d}",
+            "time": f"{9 + i % 16 // 2:02d}:{30 * (i % 2):02d}",
+            "contact_name": f"Contact {i % 100}",
+            "contact_email": f"contact{i % 100}@email.com",
+            "description": "load test", "duration": 30}
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                  f"Content-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, indexes, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in indexes:
+            start = time.perf_counter()
+            status, _ = await request(
+                    reader, writer, "POST", "/bookings", booking_body(i))
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(values, percent):
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+async def run_load(host, port, requests, connections):
+    latencies = []
+    failures = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, range(c, requests, connections), latencies,
+               failures)
+        for c in range(connections)))
+    elapsed = time.perf_counter() - start
+    return {"requests": requests, "connections": connections,
+            "failed": len(failures), "seconds": elapsed,
+            "requests_per_second": requests / elapsed,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000}
+
+
+async def run_local(requests, connections):
+    server = HTTPServer(port=0)
+    server.service.controller.reset_user()
+    await server.start()
+    try:
+        return await run_load(server.host, server.port, requests, connections)
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Load test the HTTP server and report latencies.")
+    parser.add_argument("--host", default=None,
+                        help="test a running server instead of a local one")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=10)
+    args = parser.parse_args(argv)
+    if args.host:
+        report = asyncio.run(run_load(
+            args.host, args.port, args.requests, args.connections))
+    else:
+        report = asyncio.run(run_local(args.requests, args.connections))
+    print(f"{report['requests']} requests over {report['connections']} "
+          f"connections in {report['seconds']:.2f}s "
+          f"({report['requests_per_second']:.0f} req/s), "
+          f"{report['failed']} failed")
+    print(f"p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# benchmarks/run.py
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+
+"""
+    Runs every benchmark module, writes the results to JSON and compares them
+    with a baseline file, printing the change of each result as a percentage.
+    Run from the repository root:
+        python -m benchmarks.run                   run and compare
+        python -m benchmarks.run --update-baseline run and save as baseline
+        python -m benchmarks.run --only validators,auth --scale 2
+"""
+
+BENCHMARK_MODULES = ("validators", "auth", "user", "db", "view", "memory")
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+
+
+def run_benchmarks(names=BENCHMARK_MODULES, scale=1):
+    """
+        Returns (results, skipped). A module that raises is reported as
+        skipped with the error instead of stopping the whole run, e.g. the
+        view benchmarks on a machine without a display.
+    """
+    results = {}
+    skipped = {}
+    for name in names:
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        print(f"running {name} ...", file=sys.stderr)
+        try:
+            results.update(module.run(scale=scale))
+        except Exception as e:
+            skipped[name] = f"{type(e).__name__}: {e}"
+    return results, skipped
+
+
+def compare(results, baseline, threshold=10.0):
+    """
+        Returns a list of (name, current, baseline, delta_percent, status)
+        rows, status is 'new', 'ok', 'faster' or 'REGRESSION'. All results
+        are lower-is-better, so a delta above 'threshold' percent is a
+        regression.
+    """
+    rows = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            rows.append((name, current["value"], None, None, "new"))
+            continue
+        delta = (current["value"] - previous["value"]) / previous["value"]
+        delta *= 100
+        if delta > threshold:
+            status = "REGRESSION"
+        elif delta < -threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, current["value"], previous["value"], delta,
+                     status))
+    return rows
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_results(path, results, scale):
+    document = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "scale": scale,
+            "results": results,
+            }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+def print_report(rows, skipped):
+    print(f"{'benchmark':<45} {'current':>12} {'baseline':>12} "
+          f"{'delta':>9}  status")
+    for name, current, previous, delta, status in rows:
+        previous = "-" if previous is None else f"{previous:.3e}"
+        delta = "-" if delta is None else f"{delta:+.1f}%"
+        print(f"{name:<45} {current:>12.3e} {previous:>12} {delta:>9}  "
+              f"{status}")
+    for name, reason in skipped.items():
+        print(f"skipped {name}: {reason}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Run the benchmarks and compare with a baseline.")
+    parser.add_argument("--only", help="comma separated benchmark modules")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent slower that counts as a regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else BENCHMARK_MODULES
+    results, skipped = run_benchmarks(names, args.scale)
+    save_results(args.output, results, args.scale)
+    if args.update_baseline:
+        baseline = load_results(args.baseline)
+        baseline.update(results)
+        save_results(args.baseline, baseline, args.scale)
+        print(f"baseline written to {args.baseline}")
+    rows = compare(results, load_results(args.baseline), args.threshold)
+    print_report(rows, skipped)
+    regressions = [row for row in rows if row[-1] == "REGRESSION"]
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,28 @@
 # src/booking/booking.py
-from datetime import datetime
+from datetime import datetime, timedelta
+from src.booking.recurrence import RecurrenceRule, Occurrence
 from src.utils.validators import validate_string_property, \
-        validate_datetime_property, validate_int_tuple_property
+        validate_datetime_property, validate_int_tuple_property, \
+        validate_int_property
+
+DEFAULT_DURATION = 60
+
+# Confirmation states, a booking waits for its contact as PENDING until they
+# confirm or decline it, or it expires at 'expires_at'.
+PENDING = "pending"
+CONFIRMED = "confirmed"
+DECLINED = "declined"
+EXPIRED = "expired"
+BOOKING_STATUSES = (PENDING, CONFIRMED, DECLINED, EXPIRED)
+# status: the statuses it can change to
+STATUS_TRANSITIONS = {
+        PENDING: (CONFIRMED, DECLINED, EXPIRED),
+        CONFIRMED: (DECLINED,),
+        DECLINED: (),
+        EXPIRED: (),
+        }
+# how long a contact has to answer, see confirmation_deadline
+CONFIRMATION_WINDOW = timedelta(hours=48)
 
 
 def validate_date_property(value):
@@ -21,13 +42,62 @@ def validate_time_property(value: tuple):
                 f"recieved: {value[1]}")
 
 
+def validate_duration_property(value):
+    # Duration in minutes
+    validate_int_property(value, "duration")
+    if value == 0:
+        raise ValueError("'duration' must be greater than 0.")
+
+
+def validate_status_property(value):
+    validate_string_property(value, "status")
+    if value not in BOOKING_STATUSES:
+        raise ValueError(
+                f"'status' must be one of {', '.join(BOOKING_STATUSES)}.\n" +
+                f"received: {value}")
+
+
+def validate_expires_at_property(value):
+    # None for a booking that doesn't expire
+    if value is not None and not isinstance(value, datetime):
+        raise TypeError("'expires_at' must be a datetime or None.")
+
+
+def can_change_status(current, new):
+    return new in STATUS_TRANSITIONS[current]
+
+
+def confirmation_deadline(start, now=None):
+    """
+        Returns when a request to confirm a booking starting at 'start'
+        expires: CONFIRMATION_WINDOW from 'now', but no later than the start.
+    """
+    if now is None:
+        now = datetime.now()
+    return min(now + CONFIRMATION_WINDOW, start)
+
+
 class Booking:
+    """
+    This class holds a single booking. Its attributes live in __slots__ so
+    large calendars don't pay for a __dict__ per booking.
+    'id' is the row id in the bookings table, None until the booking is
+    saved, and can only be set once.
+    """
+    __slots__ = ('_id', '_title', '_date', '_time', '_contact',
+                 '_description', '_duration', '_status', '_expires_at',
+                 '_recurrence')
 
     def __init__(self, _title="New Booking",
                  _date=None,
                  _time=None,
                  _contact="New Contact",
-                 _description="Enter a description."):
+                 _description="Enter a description.",
+                 _duration=DEFAULT_DURATION,
+                 _status=PENDING,
+                 _expires_at=None,
+                 _recurrence=None,
+                 _id=None):
         if _date is None:
             dt = datetime.now()
             _date = (dt.year, dt.month, dt.day)
@@ -36,11 +106,27 @@ class Booking:
             dt = datetime.now()
             _time = (dt.hour, dt.minute)
 
+        self._id = _id
         self._title = _title
         self._date = _date
         self._time = _time
         self._contact = _contact
         self._description = _description
+        self._duration = _duration
+        self._status = _status
+        self._expires_at = _expires_at
+        self._recurrence = _recurrence
+
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, value):
+        if self._id is not None:
+            raise AttributeError("id attribute is read-only.")
+        validate_int_property(value, "id")
+        self._id = value
 
     @property
     def title(self):
@@ -87,6 +173,86 @@ class Booking:
         validate_string_property(value, "description")
         self._description = value
 
+    @property
+    def duration(self):
+        return self._duration
+
+    @duration.setter
+    def duration(self, value):
+        validate_duration_property(value)
+        self._duration = value
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        """
+            Moves the booking to status 'value', raises a ValueError if it
+            can't get there from its current status (see STATUS_TRANSITIONS).
+        """
+        validate_status_property(value)
+        if value != self._status and \
+                not can_change_status(self._status, value):
+            raise ValueError(
+                    f"a {self._status} booking can't become {value}.")
+        self._status = value
+
+    @property
+    def expires_at(self):
+        return self._expires_at
+
+    @expires_at.setter
+    def expires_at(self, value):
+        validate_expires_at_property(value)
+        self._expires_at = value
+
+    @property
+    def recurrence(self):
+        return self._recurrence
+
+    @recurrence.setter
+    def recurrence(self, value):
+        # None for a booking that happens once
+        if value is not None and not isinstance(value, RecurrenceRule):
+            raise TypeError(
+                    "'recurrence' must be of type 'RecurrenceRule' or None.")
+        self._recurrence = value
+
+    def occurrences(self, window_start=None, window_end=None):
+        """
+            Generator that yields an Occurrence for each time the booking
+            starts in [window_start, window_end), just the one for a booking
+            without a recurrence rule.
+        """
+        start = self.start
+        if self._recurrence is None:
+            if (window_start is None or start >= window_start) and \
+                    (window_end is None or start < window_end):
+                yield Occurrence(self, start)
+            return
+        for occurrence in self._recurrence.occurrences(
+                start, window_start, window_end):
+            yield Occurrence(self, occurrence)
+
+    @property
+    def start(self):
+        """
+            The date and time the booking starts at as a datetime, 'date' may
+            be a datetime or a (year, month, day) tuple.
+        """
+        if isinstance(self._date, tuple):
+            year, month, day = self._date
+        else:
+            year, month, day = (
+                    self._date.year, self._date.month, self._date.day)
+        return datetime(year, month, day, self._time[0], self._time[1])
+
+    @property
+    def end(self):
+        return self.start + timedelta(minutes=self._duration)
+
     def __repr__(self):
         return (f"Booking(title='{self.title}', "
                 f"date={self.date}, "
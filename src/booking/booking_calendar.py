@@ -0,0 +1,237 @@
+# src/booking/booking_calendar.py
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, datetime, timedelta
+from heapq import merge
+from operator import attrgetter
+from src.booking.booking import Booking
+from src.utils.validators import validate_int_tuple_property, \
+        validate_int_property
+
+
+# how far ahead the dates of a repeating booking are checked for conflicts
+# when the series has no end
+CONFLICT_HORIZON = timedelta(days=365)
+
+_by_start = attrgetter('start')
+
+
+def _day_start(day):
+    if isinstance(day, tuple):
+        validate_int_tuple_property(day, 'day')
+        return datetime(*day)
+    if isinstance(day, (datetime, date)):
+        return datetime(day.year, day.month, day.day)
+    raise TypeError("'day' must be a datetime, date or (y, m, d) tuple.")
+
+
+class BookingCalendar:
+    """
+    This class indexes bookings by their start time in a sorted array, so
+    overlap and free-slot questions are answered with a binary search plus
+    a walk over the bookings in range instead of a scan of every booking.
+    attributes:
+        _starts (list) sorted booking start datetimes.
+        _bookings (list) the bookings, in the same order as '_starts'.
+        _durations (Counter) the number of bookings of each duration.
+        _longest (timedelta) the longest duration in '_durations', bounds
+        how far back an overlapping booking can start.
+        _recurring (list) the bookings with a recurrence rule.
+    A repeating booking is kept once. Range queries expand its dates over
+    the range only and merge them, as Occurrence objects, into the stream
+    of single bookings in start order.
+    A booking's date, time, duration or recurrence must not be changed while
+    it is in the calendar, remove it and add it again instead.
+    """
+
+    def __init__(self, bookings=()):
+        self._starts = []
+        self._bookings = []
+        self._durations = Counter()
+        self._longest = timedelta(0)
+        self._recurring = []
+        for booking in bookings:
+            self.add(booking)
+
+    def __len__(self):
+        return len(self._bookings) + len(self._recurring)
+
+    def __iter__(self):
+        """
+            Iterates over the bookings in start order, a repeating booking
+            once at its first date.
+        """
+        if not self._recurring:
+            return iter(list(self._bookings))
+        return merge(list(self._bookings),
+                     sorted(self._recurring, key=_by_start), key=_by_start)
+
+    def add(self, booking):
+        if not isinstance(booking, Booking):
+            raise TypeError("'booking' must be of type 'Booking'.")
+        if booking.recurrence is not None:
+            self._recurring.append(booking)
+            return
+        start = booking.start
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._bookings.insert(i, booking)
+        self._durations[booking.duration] += 1
+        self._longest = max(
+                self._longest, timedelta(minutes=booking.duration))
+
+    def remove(self, booking):
+        if booking.recurrence is not None:
+            for i, other in enumerate(self._recurring):
+                if other is booking:
+                    del self._recurring[i]
+                    return
+            raise ValueError("'booking' is not in the calendar.")
+        start = booking.start
+        lo = bisect_left(self._starts, start)
+        hi = bisect_right(self._starts, start)
+        for i in range(lo, hi):
+            if self._bookings[i] is booking:
+                del self._starts[i]
+                del self._bookings[i]
+                self._forget_duration(booking.duration)
+                return
+        raise ValueError("'booking' is not in the calendar.")
+
+    def _forget_duration(self, duration):
+        self._durations[duration] -= 1
+        if self._durations[duration]:
+            return
+        del self._durations[duration]
+        if timedelta(minutes=duration) == self._longest:
+            # there are few distinct durations, so finding the next longest
+            # is cheap
+            self._longest = timedelta(minutes=max(self._durations, default=0))
+
+    def clear(self):
+        self._starts = []
+        self._bookings = []
+        self._durations = Counter()
+        self._longest = timedelta(0)
+        self._recurring = []
+
+    def _merge_occurrences(self, singles, start, end, overlap):
+        """
+            Merges the occurrences of the repeating bookings that start in
+            [start, end), or that overlap it when 'overlap' is True, into
+            the start ordered iterable 'singles'.
+        """
+        series = []
+        for booking in self._recurring:
+            window_start = start
+            if overlap:
+                window_start -= timedelta(minutes=booking.duration)
+            series.append(booking.occurrences(window_start, end))
+        return merge(singles, *series, key=_by_start)
+
+    def iter_between(self, start, end):
+        """
+            Generator that yields the bookings and occurrences that start in
+            [start, end), in order.
+        """
+        lo = bisect_left(self._starts, start)
+        hi = bisect_left(self._starts, end)
+        singles = self._bookings[lo:hi]
+        if not self._recurring:
+            return iter(singles)
+        return self._merge_occurrences(singles, start, end, False)
+
+    def between(self, start, end):
+        """
+            Returns the bookings that start in [start, end), in order.
+        """
+        if not self._recurring:
+            lo = bisect_left(self._starts, start)
+            hi = bisect_left(self._starts, end)
+            return self._bookings[lo:hi]
+        return list(self.iter_between(start, end))
+
+    def iter_overlapping(self, start, end):
+        """
+            Generator that yields the bookings and occurrences that overlap
+            the [start, end) interval, in start order.
+            Only bookings starting within the longest duration before
+            'start' can overlap it, so the search starts there.
+        """
+        if end <= start:
+            raise ValueError("'end' must be after 'start'.")
+        lo = bisect_right(self._starts, start - self._longest)
+        hi = bisect_left(self._starts, end)
+        singles = self._bookings[lo:hi]
+        if self._recurring:
+            singles = self._merge_occurrences(singles, start, end, True)
+        return (booking for booking in singles if booking.end > start)
+
+    def overlapping(self, start, end):
+        """
+            Returns the bookings that overlap the [start, end) interval.
+        """
+        return list(self.iter_overlapping(start, end))
+
+    def conflicts(self, booking):
+        """
+            Returns the bookings and occurrences in the calendar that overlap
+            'booking', excluding 'booking' itself. Every date of a repeating
+            'booking' is checked, up to CONFLICT_HORIZON ahead if the series
+            has no end.
+        """
+        if booking.recurrence is None:
+            windows = [(booking.start, booking.end)]
+        else:
+            horizon = booking.start + CONFLICT_HORIZON
+            windows = ((occurrence.start, occurrence.end) for occurrence in
+                       booking.occurrences(booking.start, horizon))
+        conflicts = []
+        seen = set()
+        for start, end in windows:
+            for other in self.iter_overlapping(start, end):
+                if other is booking or \
+                        getattr(other, 'booking', None) is booking:
+                    continue
+                if other not in seen:
+                    seen.add(other)
+                    conflicts.append(other)
+        return conflicts
+
+    def bookings_on(self, day):
+        start = _day_start(day)
+        return self.between(start, start + timedelta(days=1))
+
+    def free_slots(self, day, day_start=(9, 0), day_end=(17, 0),
+                   min_duration=30):
+        """
+            Returns the free (start, end) datetime intervals on 'day' between
+            'day_start' and 'day_end' that last at least 'min_duration'
+            minutes.
+            parameters:
+                day: datetime, date or (year, month, day) tuple
+                day_start: (hour, minute) tuple
+                day_end: (hour, minute) tuple, (24, 0) for midnight
+                min_duration: int
+        """
+        validate_int_tuple_property(day_start, 'day_start')
+        validate_int_tuple_property(day_end, 'day_end')
+        validate_int_property(min_duration, 'min_duration')
+        midnight = _day_start(day)
+        window_start = midnight + timedelta(
+                hours=day_start[0], minutes=day_start[1])
+        window_end = midnight + timedelta(
+                hours=day_end[0], minutes=day_end[1])
+        if window_end <= window_start:
+            raise ValueError("'day_end' must be after 'day_start'.")
+        shortest = timedelta(minutes=min_duration)
+
+        slots = []
+        cursor = window_start
+        for booking in self.iter_overlapping(window_start, window_end):
+            if booking.start - cursor >= shortest:
+                slots.append((cursor, booking.start))
+            cursor = max(cursor, booking.end)
+        if window_end - cursor >= shortest:
+            slots.append((cursor, window_end))
+        return slots
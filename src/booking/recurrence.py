@@ -0,0 +1,322 @@
+# src/booking/recurrence.py
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from src.utils.validators import validate_string_property, \
+        validate_int_property
+
+"""
+    This module describes repeating bookings. A RecurrenceRule is stored once
+    on its Booking, the dates it repeats on are worked out when they are
+    asked for, one at a time and only over the requested window, so a weekly
+    meeting with no end costs no more to keep than a single booking.
+    The rules follow iCalendar RRULE: COUNT includes the excluded dates, and
+    a monthly rule skips the months that don't have the start's day.
+"""
+
+DAILY = "DAILY"
+WEEKLY = "WEEKLY"
+MONTHLY = "MONTHLY"
+FREQUENCIES = (DAILY, WEEKLY, MONTHLY)
+_STEPS = {DAILY: timedelta(days=1), WEEKLY: timedelta(weeks=1)}
+
+DATETIME_FORMAT = "%Y%m%dT%H%M%S"
+DATE_FORMAT = "%Y%m%d"
+
+
+def format_rule_date(value):
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    return value.strftime(DATE_FORMAT)
+
+
+def parse_rule_date(text):
+    """
+        Returns a datetime for '20240501T090000' and a date for '20240501',
+        a trailing 'Z' is ignored.
+    """
+    text = text.strip().rstrip("Zz")
+    if "T" in text:
+        return datetime.strptime(text, DATETIME_FORMAT)
+    return datetime.strptime(text, DATE_FORMAT).date()
+
+
+class RecurrenceRule:
+    """
+    This class repeats a booking every 'interval' days, weeks or months.
+    attributes:
+        frequency (str) DAILY, WEEKLY or MONTHLY.
+        interval (int) repeat every 'interval' periods, 1 or more.
+        count (int) the number of occurrences, None for no limit.
+        until (datetime) the last time an occurrence may start, None for
+        no limit.
+        exceptions (frozenset) start datetimes that are skipped, a date
+        skips every occurrence on that day.
+    """
+    __slots__ = ('_frequency', '_interval', '_count', '_until',
+                 '_exceptions')
+
+    def __init__(self, frequency, interval=1, count=None, until=None,
+                 exceptions=()):
+        self.frequency = frequency
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.exceptions = exceptions
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, value):
+        validate_string_property(value, "frequency")
+        value = value.strip().upper()
+        if value not in FREQUENCIES:
+            raise ValueError(
+                    f"'frequency' must be one of {', '.join(FREQUENCIES)}.\n"
+                    f"received: {value}")
+        self._frequency = value
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @interval.setter
+    def interval(self, value):
+        validate_int_property(value, "interval")
+        if value < 1:
+            raise ValueError("'interval' must be greater than 0.")
+        self._interval = value
+
+    @property
+    def count(self):
+        return self._count
+
+    @count.setter
+    def count(self, value):
+        if value is not None:
+            validate_int_property(value, "count")
+            if value < 1:
+                raise ValueError("'count' must be greater than 0.")
+        self._count = value
+
+    @property
+    def until(self):
+        return self._until
+
+    @until.setter
+    def until(self, value):
+        if value is not None and not isinstance(value, datetime):
+            raise TypeError("'until' must be a datetime or None.")
+        self._until = value
+
+    @property
+    def exceptions(self):
+        return self._exceptions
+
+    @exceptions.setter
+    def exceptions(self, value):
+        value = frozenset(value)
+        for item in value:
+            if not isinstance(item, date):
+                raise TypeError(
+                        "'exceptions' must only hold datetimes and dates.")
+        self._exceptions = value
+
+    def _nth(self, start, n):
+        """
+            Returns the start of the n'th repetition counting from 0, or None
+            if that month doesn't have the start's day.
+        """
+        if self._frequency != MONTHLY:
+            return start + _STEPS[self._frequency] * (n * self._interval)
+        months = start.month - 1 + n * self._interval
+        year = start.year + months // 12
+        month = months % 12 + 1
+        if start.day > monthrange(year, month)[1]:
+            return None
+        return start.replace(year=year, month=month)
+
+    def _first_index(self, start, window_start):
+        """
+            Returns (n, produced): the repetition to start looking from for
+            'window_start' and how many occurrences come before it.
+        """
+        if window_start is None or window_start <= start:
+            return 0, 0
+        if self._frequency != MONTHLY:
+            step = _STEPS[self._frequency] * self._interval
+            n = -(-(window_start - start) // step)
+            return n, n
+        if start.day > 28:
+            # some months are skipped and don't count, so walk from the start
+            return 0, 0
+        months = (window_start.year - start.year) * 12 + \
+            window_start.month - start.month
+        n = max(months // self._interval, 0)
+        return n, n
+
+    def is_excluded(self, start):
+        return start in self._exceptions or start.date() in self._exceptions
+
+    def occurrences(self, start, window_start=None, window_end=None):
+        """
+            Generator that yields the start datetimes of the series that
+            begins at 'start', in order, from 'window_start' (inclusive) up
+            to 'window_end' (exclusive) when they are given.
+            Daily and weekly rules jump straight to the window instead of
+            walking the series from its start.
+        """
+        n, produced = self._first_index(start, window_start)
+        while True:
+            if self._count is not None and produced >= self._count:
+                return
+            try:
+                occurrence = self._nth(start, n)
+            except (OverflowError, ValueError):
+                # past datetime.max, the end of an unbounded series
+                return
+            n += 1
+            if occurrence is None:
+                continue
+            if self._until is not None and occurrence > self._until:
+                return
+            if window_end is not None and occurrence >= window_end:
+                return
+            produced += 1
+            if window_start is not None and occurrence < window_start:
+                continue
+            if not self.is_excluded(occurrence):
+                yield occurrence
+
+    def rrule_text(self):
+        """
+            Returns the rule as an iCalendar RRULE value, without the
+            exceptions.
+        """
+        parts = [f"FREQ={self._frequency}"]
+        if self._interval != 1:
+            parts.append(f"INTERVAL={self._interval}")
+        if self._count is not None:
+            parts.append(f"COUNT={self._count}")
+        if self._until is not None:
+            parts.append(f"UNTIL={format_rule_date(self._until)}")
+        return ";".join(parts)
+
+    def exdate_text(self):
+        """
+            Returns the exceptions as a comma separated iCalendar EXDATE
+            value, oldest first, or an empty string.
+        """
+        return ",".join(sorted(
+                format_rule_date(value) for value in self._exceptions))
+
+    def to_text(self):
+        """
+            Returns the rule as it is stored in the bookings 'rrule' column,
+            the RRULE value plus an EXDATE part for the exceptions.
+        """
+        text = self.rrule_text()
+        if self._exceptions:
+            text += ";EXDATE=" + self.exdate_text()
+        return text
+
+    @classmethod
+    def from_text(cls, text):
+        """
+            Returns the rule of a to_text() or iCalendar RRULE value.
+            Raises ValueError for a part this class doesn't support, such as
+            BYDAY.
+        """
+        validate_string_property(text, "text")
+        values = {}
+        for part in text.strip().split(";"):
+            if not part:
+                continue
+            key, sep, value = part.partition("=")
+            key = key.strip().upper()
+            if not sep or key in values:
+                raise ValueError(f"invalid recurrence rule part '{part}'")
+            values[key] = value.strip()
+        unsupported = set(values) - {
+                "FREQ", "INTERVAL", "COUNT", "UNTIL", "EXDATE", "WKST"}
+        if unsupported:
+            raise ValueError(
+                    "unsupported recurrence rule parts: " +
+                    ", ".join(sorted(unsupported)))
+        if "FREQ" not in values:
+            raise ValueError("recurrence rule has no FREQ.")
+        until = None
+        if "UNTIL" in values:
+            until = parse_rule_date(values["UNTIL"])
+            if not isinstance(until, datetime):
+                # a date-only UNTIL includes the whole day
+                until = datetime(until.year, until.month, until.day,
+                                 23, 59, 59)
+        exceptions = ()
+        if values.get("EXDATE"):
+            exceptions = [parse_rule_date(value)
+                          for value in values["EXDATE"].split(",")]
+        return cls(values["FREQ"],
+                   interval=int(values.get("INTERVAL", 1)),
+                   count=int(values["COUNT"]) if "COUNT" in values else None,
+                   until=until,
+                   exceptions=exceptions)
+
+    def __eq__(self, other):
+        if not isinstance(other, RecurrenceRule):
+            return NotImplemented
+        return self.to_text() == other.to_text()
+
+    def __hash__(self):
+        return hash(self.to_text())
+
+    def __repr__(self):
+        return f"RecurrenceRule('{self.to_text()}')"
+
+
+class Occurrence:
+    """
+    This class is one date of a repeating booking. It has the start, end,
+    date and time of that date, every other attribute is the booking's.
+    """
+    __slots__ = ('booking', 'start')
+
+    def __init__(self, booking, start):
+        self.booking = booking
+        self.start = start
+
+    @property
+    def end(self):
+        return self.start + timedelta(minutes=self.booking.duration)
+
+    @property
+    def date(self):
+        return datetime(self.start.year, self.start.month, self.start.day)
+
+    @property
+    def time(self):
+        return (self.start.hour, self.start.minute)
+
+    def __getattr__(self, name):
+        if name in Occurrence.__slots__:
+            # not set yet, e.g. while being copied
+            raise AttributeError(name)
+        return getattr(self.booking, name)
+
+    def __eq__(self, other):
+        if not isinstance(other, Occurrence):
+            return NotImplemented
+        return self.booking is other.booking and self.start == other.start
+
+    def __hash__(self):
+        return hash((id(self.booking), self.start))
+
+    def __repr__(self):
+        return (f"Occurrence(title='{self.booking.title}', "
+                f"start={self.start}, "
+                f"contact='{self.booking.contact}')")
+
+
+if __name__ == '__main__':
+    print("not intended to run in isolation")
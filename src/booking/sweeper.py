@@ -0,0 +1,93 @@
+# src/booking/sweeper.py
+import threading
+import time
+from datetime import datetime
+import src.db.db as db
+import src.db.repository as repository
+from src.booking.booking import PENDING
+from src.utils.validators import validate_int_property
+from src.utils.log import get_logger, log_event
+
+"""
+    This module expires booking confirmation requests nobody answered.
+    A sweep is a few UPDATE statements over the (status, expires_at) index,
+    see repository.expire_bookings, no booking is loaded into Python.
+"""
+
+logger = get_logger("sweeper")
+
+DEFAULT_INTERVAL = 60  # seconds
+DEFAULT_BATCH_SIZE = 500
+
+
+class BookingSweeper:
+    """
+    This class expires stale pending bookings through 'pool', the pool of
+    src/db/db.py unless given, once per call of 'sweep' or every 'interval'
+    seconds from a background thread between 'start' and 'stop'.
+    'clock' returns the current time as a datetime, the same local time
+    'expires_at' is stored in.
+    """
+
+    def __init__(self, pool=None, interval=DEFAULT_INTERVAL,
+                 batch_size=DEFAULT_BATCH_SIZE, clock=datetime.now):
+        validate_int_property(interval, 'interval')
+        validate_int_property(batch_size, 'batch_size')
+        if batch_size < 1:
+            raise ValueError("'batch_size' must be greater than 0.")
+        self.pool = pool
+        self.interval = interval
+        self.batch_size = batch_size
+        self.clock = clock
+        self.last_sweep = None
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _cursor(self):
+        return (self.pool or db.get_pool()).cursor()
+
+    def sweep(self):
+        """
+            Expires every pending booking past its 'expires_at'.
+            Returns a dict of the number expired, the number still pending
+            and the seconds the sweep took, which is also kept in
+            'last_sweep'.
+        """
+        start = time.perf_counter()
+        with self._cursor() as cursor:
+            expired = repository.expire_bookings(
+                    cursor, self.clock(), self.batch_size)
+            pending = repository.count_bookings_by_status(cursor)[PENDING]
+        counts = {"expired": expired, "pending": pending,
+                  "seconds": time.perf_counter() - start}
+        self.last_sweep = counts
+        log_event(logger, "bookings_expired",
+                  "Expired %d bookings, %d still pending.", expired, pending,
+                  **counts)
+        return counts
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Booking sweep failed.")
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+                target=self._run, name="booking-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+if __name__ == '__main__':
+    print("not intended to run in isolation")
@@ -1,6 +1,9 @@
 # contact.py
 import uuid
 from src.utils.validators import validate_string_property, validate_email
+from src.utils.log import get_logger, log_event
+
+logger = get_logger("contact")
 
 
 class Contact:
@@ -17,10 +20,16 @@ class Contact:
     _name ValueError: if None or empty string.
     _name TypeError: if trying set it to a non-string value.
     _email ValueError: if None, empty string or incorrect email format.
-    _email TypeError: if trying to set it to a non-string value."""
+    _email TypeError: if trying to set it to a non-string value.
+    Any ContactIndex holding the contact is told when its name or email
+    changes.
+    Attributes live in __slots__ and the id is kept as the 128-bit int of the
+    uuid, the 'id' property rebuilds the uuid.UUID when it is read."""
+    __slots__ = ('_id', '_name', '_email', '_indexes')
 
     def __init__(self, name=None, email=None):
-        self._id = uuid.uuid4()
+        self._id = uuid.uuid4().int
+        self._indexes = ()
         # assign None values, default values
         if name is None:
             self._name = "New Contact"
@@ -31,17 +40,17 @@ class Contact:
             self._email = "unknown@app_genie.app"
         else:
             self._email = email
-        print(
-                "New Contact Created.\n" +
-                f"ID: {self._id}\n" +
-                f"Name: {self._name}\n" +
-                f"Email: {self._email}\n"
-                )
+        log_event(logger, "contact_created", "New Contact Created. %r", self)
+
+    def __repr__(self):
+        return (f"Contact(id='{self.id}', "
+                f"name='{self.name}', "
+                f"email='{self.email}')")
 
     # Properties
     @property
     def id(self):
-        return self._id
+        return uuid.UUID(int=self._id)
 
     @id.setter
     def id(self, value):
@@ -57,7 +66,9 @@ class Contact:
     @name.setter
     def name(self, value):
         validate_string_property(value, 'name')
-        self._name = value
+        old_value, self._name = self._name, value
+        for index in self._indexes:
+            index.reindex(self, 'name', old_value, value)
 
     @property
     def email(self):
@@ -67,4 +78,6 @@ class Contact:
     def email(self, value):
         validate_string_property(value, 'email')
         validate_email(value)
-        self._email = value
+        old_value, self._email = self._email, value
+        for index in self._indexes:
+            index.reindex(self, 'email', old_value, value)
@@ -0,0 +1,108 @@
+# src/contact/contact_index.py
+from src.utils.validators import validate_string_property
+
+
+def normalize_email(email):
+    return email.strip().lower()
+
+
+def normalize_name(name):
+    return " ".join(name.split()).casefold()
+
+
+class ContactIndex:
+    """
+    This class keeps Contact objects indexed by their normalized email, with
+    a secondary index on their normalized name, so a contact can be found
+    without scanning the whole contact list.
+    Contacts added to an index notify it when their 'name' or 'email'
+    property changes, keeping both indexes in sync.
+    """
+
+    def __init__(self):
+        self._by_email = {}
+        self._by_name = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, contact):
+        return any(
+                item is contact for item in
+                self._by_email.get(normalize_email(contact.email), ()))
+
+    @staticmethod
+    def _put(index, key, contact):
+        index.setdefault(key, []).append(contact)
+
+    @staticmethod
+    def _drop(index, key, contact):
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        for i, item in enumerate(bucket):
+            if item is contact:
+                del bucket[i]
+                break
+        if not bucket:
+            del index[key]
+
+    def _detach(self, contact):
+        indexes = list(contact._indexes)
+        indexes.remove(self)
+        contact._indexes = tuple(indexes)
+
+    def add(self, contact):
+        self._put(self._by_email, normalize_email(contact.email), contact)
+        self._put(self._by_name, normalize_name(contact.name), contact)
+        contact._indexes += (self,)
+        self._count += 1
+
+    def remove(self, contact):
+        if contact not in self:
+            raise ValueError("'contact' is not in the index.")
+        self._drop(self._by_email, normalize_email(contact.email), contact)
+        self._drop(self._by_name, normalize_name(contact.name), contact)
+        self._detach(contact)
+        self._count -= 1
+
+    def clear(self):
+        for bucket in self._by_email.values():
+            for contact in bucket:
+                self._detach(contact)
+        self._by_email = {}
+        self._by_name = {}
+        self._count = 0
+
+    def reindex(self, contact, property_name, old_value, new_value):
+        """
+            Called by a Contact after its 'name' or 'email' changed.
+        """
+        if property_name == 'email':
+            self._drop(self._by_email, normalize_email(old_value), contact)
+            self._put(self._by_email, normalize_email(new_value), contact)
+        elif property_name == 'name':
+            self._drop(self._by_name, normalize_name(old_value), contact)
+            self._put(self._by_name, normalize_name(new_value), contact)
+
+    def find_by_email(self, email):
+        validate_string_property(email, 'email')
+        return list(self._by_email.get(normalize_email(email), ()))
+
+    def find_by_name(self, name):
+        validate_string_property(name, 'name')
+        return list(self._by_name.get(normalize_name(name), ()))
+
+    def find(self, name, email):
+        """
+            Returns the contact with both 'name' and 'email', or None.
+            Only the contacts sharing 'email' are compared.
+        """
+        validate_string_property(name, 'name')
+        validate_string_property(email, 'email')
+        key = normalize_name(name)
+        for contact in self._by_email.get(normalize_email(email), ()):
+            if normalize_name(contact.name) == key:
+                return contact
+        return None
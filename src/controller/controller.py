@@ -1,62 +1,276 @@
 # controller.py
+import importlib
+import time
+from datetime import date, datetime
 from src.user.user import User
-from src.views.login import Login
-from src.views.add_contact import AddContact
-from src.views.create_booking import CreateBooking, DateEntry
+from src.user.authenticator import LoginRateLimited
+from src.contact.contact import Contact
+from src.booking.booking import DEFAULT_DURATION
+import src.db.db as db
+import src.db.repository as repository
 import src.utils.validators as val
+from src.utils.log import get_logger, log_event
+
+logger = get_logger("controller")
+
+# The views pull in tkinter and tkcalendar, they are imported the first time
+# one of these names is used so headless code never loads them.
+_LAZY_IMPORTS = {
+        "Login": "src.views.login",
+        "AddContact": "src.views.add_contact",
+        "CreateBooking": "src.views.create_booking",
+        "DateEntry": "src.views.create_booking",
+        }
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
 
 
 class Controller:
     """
         This class will handle the switch between views and program flow.
+        Views are built the first time they are needed and then reused.
+        After a successful login the views in 'prewarm_after_login' are
+        built in idle time so they open straight away, and the time taken
+        to build each view is kept in 'view_timings'.
+        Without a 'user' the controller works on the shared
+        User.get_instance(), a server passes the User of a session instead.
+        With an 'authenticator' logins are checked against the users table.
+        With a 'mailer' (src/mail/outbox.py MailWorker) every new booking
+        is saved, through the authenticator's pool or the pool of
+        src/db/db.py, and queues a confirmation email to its contact.
     """
 
-    def __init__(self):
-        self.user = User.get_instance()
-        self.reset_user()
+    # view name: (attribute, view class name, default title)
+    VIEWS = {
+            "login": ("login_view", "Login", "Login"),
+            "add_contact": ("add_contact_view", "AddContact", "Add Contact"),
+            "create_booking": (
+                "create_booking_view", "CreateBooking", "Create Booking"),
+            }
+
+    def __init__(self, user=None, authenticator=None, mailer=None):
+        if user is None:
+            # the desktop application's shared user, starting signed out
+            self.user = User.get_instance()
+            self.reset_user()
+        else:
+            if not isinstance(user, User):
+                raise TypeError("'user' must be of type 'User'")
+            self.user = user
+        self.authenticator = authenticator
+        self.mailer = mailer
         self.login_view = None
         self.add_contact_view = None
         self.create_booking_view = None
+        self.view_timings = {}
+        self.prewarm_after_login = ("create_booking",)
+        self._prewarmed = set()
+
+    def get_view(self, name, title=None):
+        """
+            Returns the view called 'name', building it on first use. A
+            view built before is shown again, it may have been closed or
+            built hidden by 'prewarm'.
+        """
+        if name not in self.VIEWS:
+            raise ValueError(f"Unknown view '{name}'.")
+        attribute, class_name, default_title = self.VIEWS[name]
+        view = getattr(self, attribute)
+        if view is None:
+            view_class = __getattr__(class_name)
+            start = time.perf_counter()
+            view = view_class(controller=self, title=title or default_title)
+            elapsed = time.perf_counter() - start
+            self.view_timings[name] = elapsed
+            setattr(self, attribute, view)
+            log_event(logger, "view_built", "%s built in %.1f ms",
+                      name, elapsed * 1000, view=name, seconds=elapsed)
+        else:
+            self._prewarmed.discard(name)
+            view.show()
+        return view
 
     def handle_login_view(self, title=None):
-        if self.login_view is None:
-            title = title or "Login"
-            self.login_view = Login(controller=self, title=title)
-        return self.login_view
+        return self.get_view("login", title)
 
     def handle_add_contact_view(self, title=None):
-        if self.add_contact_view is None:
-            title = title or "Add Contact"
-            self.add_contact_view = AddContact(controller=self, title=title)
-        return self.add_contact_view
+        return self.get_view("add_contact", title)
 
     def handle_create_booking_view(self, title=None):
-        if self.create_booking_view is None:
-            title = title or "Create Booking"
-            self.create_booking_view = CreateBooking(
-                    controller=self, title=title)
-        return self.create_booking_view
+        return self.get_view("create_booking", title)
+
+    def prewarm(self, *names):
+        """
+            Schedules the views in 'names' to be built hidden when the Tk
+            event loop is idle. Only done when a window is already open,
+            without one there is no event loop to schedule on.
+            Returns the names that were scheduled.
+        """
+        window = next((getattr(self, attribute)
+                       for attribute, _, _ in self.VIEWS.values()
+                       if getattr(self, attribute) is not None), None)
+        if window is None:
+            return ()
+        scheduled = tuple(name for name in names
+                          if getattr(self, self.VIEWS[name][0]) is None)
+        for name in scheduled:
+            window.tk.after_idle(self._prewarm_view, name)
+        return scheduled
+
+    def _prewarm_view(self, name):
+        if getattr(self, self.VIEWS[name][0]) is not None:
+            return
+        view = self.get_view(name)
+        self._prewarmed.add(name)
+        # withdraw directly, hiding through the window manager could stop
+        # the main loop if no other window is visible at this moment
+        view.tk.withdraw()
+
+    def switch_view(self, view):
+        """
+            Shows 'view' and hides the other windows, the views share one Tk
+            root so this doesn't create anything new.
+        """
+        view.window_manager.switch_to(view.tk)
+        return view
 
     def handle_login(self, username, password):
+        if self.authenticator is not None:
+            return self._login_with_authenticator(username, password)
         if self.user.authenticate(username, password):
-            print("Login successful.")
+            log_event(logger, "login", "Login successful.", success=True)
+            self.prewarm(*self.prewarm_after_login)
             return True
         else:
-            print("Login failed.")
+            log_event(logger, "login", "Login failed.", success=False)
             return False
 
+    def _login_with_authenticator(self, username, password):
+        """
+            Checks the login against the users table, on success the loaded
+            user replaces 'user'.
+        """
+        try:
+            user = self.authenticator.authenticate(username, password)
+        except LoginRateLimited as e:
+            log_event(logger, "login", "Login refused. %s", e,
+                      success=False, rate_limited=True)
+            return False
+        if user is None:
+            log_event(logger, "login", "Login failed.", success=False)
+            return False
+        self.user = user
+        log_event(logger, "login", "Login successful.", success=True)
+        self.prewarm(*self.prewarm_after_login)
+        return True
+
     def reset_user(self):
         self.user.reset()
 
+    # These don't touch any view, so they can be driven without a display.
+    def add_contact(self, name, email):
+        """
+            Adds a contact to the user's contacts, unless a contact with the
+            same name and email is already there.
+            Raises a ValueError or TypeError for an invalid name or email.
+            Returns the new or existing Contact.
+        """
+        val.validate_string_property(name, 'name')
+        val.validate_email(email)
+        contact = self.user.find_contact(name, email)
+        if contact is None:
+            contact = Contact(name, email)
+            self.user.add_contact(contact)
+            log_event(logger, "add_contact", "add contact: %r", contact)
+        return contact
+
+    def create_booking(self, title, date, time, contact_name, contact_email,
+                       description, duration=DEFAULT_DURATION,
+                       allow_conflicts=False, recurrence=None):
+        """
+            Creates a booking for the user, see User.create_booking. When
+            there is a mailer the booking is saved, its confirmation email
+            is keyed by the row id, and the email is queued. If the booking
+            can't be saved it is taken back out of the user and RuntimeError
+            is raised.
+            Returns the new Booking.
+        """
+        if self.mailer is not None:
+            self._user_id()
+        booking = self.user.create_booking(
+                title, date, time, contact_name, contact_email, description,
+                duration=duration, allow_conflicts=allow_conflicts,
+                recurrence=recurrence)
+        if self.mailer is not None:
+            if booking.id is None:
+                try:
+                    written = self.save_bookings([booking])
+                except Exception:
+                    self.user.remove_booking(booking)
+                    raise
+                if written != 1:
+                    self.user.remove_booking(booking)
+                    raise RuntimeError(f"booking {booking.title!r} wasn't "
+                                       "saved.")
+            self.mailer.request_confirmation(
+                    self.user.user_name, booking, contact_name, contact_email)
+        log_event(logger, "create_booking", "create booking: %r", booking)
+        return booking
+
+    def _cursor(self):
+        pool = None
+        if self.authenticator is not None:
+            pool = self.authenticator.pool
+        return (pool or db.get_pool()).cursor()
+
+    def _user_id(self):
+        user_id = getattr(self.user, "id", None)
+        if user_id is None:
+            raise ValueError("the user has no id, it isn't stored.")
+        return user_id
+
+    def save_bookings(self, bookings):
+        """
+            Saves 'bookings' for the user, who must have been loaded from
+            the database so it has an id.
+        """
+        with self._cursor() as cursor:
+            return repository.save_bookings(
+                    cursor, self._user_id(), bookings)
+
+    def list_bookings(self, on_date=None):
+        """
+            Returns the user's bookings in start order, only those on
+            'on_date' if it is given. A repeating booking is listed once,
+            or as its Occurrence on 'on_date'.
+        """
+        if on_date is None:
+            return list(self.user.calendar)
+        return self.user.calendar.bookings_on(on_date)
+
     def handle_add_contact(self, details):
         if details is None:
             raise ValueError("'details' must not be None.")
         for item in details:
             val.validate_string_property(item, 'item in details')
-        print(details)
+        self.add_contact(*details)
         return True
 
     def handle_create_booking(self, details):
+        """
+            Creates a booking from the CreateBooking view's
+            [contact name, hour, minute, date], see create_booking. The
+            contact must already be in the user's contacts, its email is
+            taken from there.
+        """
         if details is None:
             raise ValueError("'details' must not be None.")
         for item in details:
@@ -64,7 +278,17 @@ class Controller:
                 val.validate_string_property(item, 'item in details')
             if isinstance(item, int):
                 val.validate_int_property(item, 'item in details')
-        print(details)
+        contact_name, hour, minute, day = details
+        if isinstance(day, date) and not isinstance(day, datetime):
+            # DateEntry.get_date() returns a date
+            day = datetime(day.year, day.month, day.day)
+        contacts = self.user.contact_index.find_by_name(contact_name)
+        if not contacts:
+            raise ValueError(
+                    f"'{contact_name}' is not in your contacts.")
+        self.create_booking(
+                f"Booking with {contact_name}", day, (hour, minute),
+                contacts[0].name, contacts[0].email, "Enter a description.")
         return True
 
 
@@ -1,21 +1,74 @@
 # src/db/db.py
+import logging
 import sqlite3
-from src.utils.validators import validate_string_property
+import time
+from contextlib import contextmanager
+from itertools import islice
+from src.db.pool import ConnectionPool
+from src.utils.log import get_logger, log_event
+from src.utils.validators import validate_string_property, \
+        validate_int_property
+
+logger = get_logger("db")
 
 connection = None
 cursor = None
 db_name = None
-
-
-def create_connection(_db_name):
-    global connection, cursor, db_name
+pool = None
+POOL_SIZE = 5
+
+
+def create_connection(_db_name, pool_size=POOL_SIZE):
+    """
+        Opens a connection pool on '_db_name' and checks out one connection
+        from it as the module-level 'connection'/'cursor' pair used by the
+        functions in this module.
+        Threads should use 'pooled_connection()'/'pooled_cursor()' instead
+        of sharing the module-level cursor.
+    """
+    global connection, cursor, db_name, pool
     validate_string_property(_db_name, "_db_name")
-    connection = sqlite3.connect(_db_name)
+    if pool is not None:
+        close()
+    pool = ConnectionPool(_db_name, size=pool_size)
+    connection = pool.checkout()
     cursor = connection.cursor()
     db_name = _db_name
     return connection
 
 
+def get_pool():
+    if pool is None:
+        print("Error getting db pool")
+        return None
+    else:
+        return pool
+
+
+@contextmanager
+def pooled_connection():
+    """
+        Checks a connection out of the pool for the calling thread and
+        returns it to the pool when the block exits.
+    """
+    if pool is None:
+        raise RuntimeError("create_connection() must be called first.")
+    with pool.connection() as conn:
+        yield conn
+
+
+@contextmanager
+def pooled_cursor():
+    """
+        Yields a cursor on a pooled connection, committing when the block
+        exits cleanly and rolling back otherwise.
+    """
+    if pool is None:
+        raise RuntimeError("create_connection() must be called first.")
+    with pool.cursor() as _cursor:
+        yield _cursor
+
+
 def get_cursor():
     if cursor is None:
         print("Error getting db cursor")
@@ -48,9 +101,23 @@ def commit():
 
 
 def close():
-    global connection, cursor
+    """
+        Closes the module-level connection and the pool. Safe to call from
+        any thread, e.g. a server shutting down from a worker thread.
+    """
+    global connection, cursor, pool
     try:
-        connection.close()
+        if pool is not None:
+            try:
+                pool.release(connection)
+            except ValueError:
+                # checked out by another thread, which is the only one
+                # that can return it to the pool, so close it here
+                connection.close()
+            pool.close()
+            pool = None
+        else:
+            connection.close()
         print("db connection closed.")
         connection, cursor = None, None
         return True
@@ -69,6 +136,50 @@ def insert(cursor, insert_query, data):
         return False
 
 
+def insert_many(cursor, insert_query, rows, chunk_size=500):
+    """
+        Insert rows in chunks of 'chunk_size' using executemany, committing
+        once per chunk instead of once per row.
+        'rows' may be any iterable or generator of row tuples, it is consumed
+        lazily so the full data set never has to be held in memory.
+        Logs an 'insert_chunk' event with the rows written and the time
+        taken for each chunk.
+        Returns the total number of rows written. A chunk that fails is
+        rolled back and stops the whole run: the chunks after it are not
+        written, the chunks committed before it are kept, and an
+        'insert_chunk_failed' error is logged.
+    """
+    validate_string_property(insert_query, 'insert_query')
+    validate_int_property(chunk_size, 'chunk_size')
+    if chunk_size == 0:
+        raise ValueError("'chunk_size' must be greater than 0.")
+    rows = iter(rows)
+    total = 0
+    chunk_number = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        chunk_number += 1
+        start = time.perf_counter()
+        try:
+            cursor.executemany(insert_query, chunk)
+            cursor.connection.commit()
+        except sqlite3.Error as e:
+            cursor.connection.rollback()
+            log_event(logger, "insert_chunk_failed",
+                      "chunk %d failed, stopping after %d rows: %s",
+                      chunk_number, total, e, level=logging.ERROR,
+                      chunk=chunk_number, total=total, error=str(e))
+            break
+        elapsed = time.perf_counter() - start
+        total += len(chunk)
+        log_event(logger, "insert_chunk", "chunk %d: wrote %d rows in %.4fs",
+                  chunk_number, len(chunk), elapsed, chunk=chunk_number,
+                  rows=len(chunk), seconds=elapsed)
+    return total
+
+
 def get_users(cursor):
     cursor.execute("SELECT * FROM users")
     users = cursor.fetchall()
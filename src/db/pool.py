@@ -0,0 +1,138 @@
+# src/db/pool.py
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from src.utils.validators import validate_string_property, \
+        validate_int_property
+
+
+class ConnectionPool:
+    """
+    A fixed size pool of SQLite connections that can be shared between
+    threads.
+    attributes:
+        db_name (str) the database file every connection is opened on.
+        size (int) the maximum number of open connections.
+        timeout (float) seconds to wait for a free connection before
+        raising TimeoutError.
+    Every pooled connection is switched to WAL journal mode so readers do not
+    block the writer.
+    A thread that already holds a connection gets the same one back when it
+    checks out again, so nested 'with pool.connection()' blocks don't
+    deadlock the pool.
+    """
+
+    def __init__(self, db_name, size=5, timeout=5.0):
+        validate_string_property(db_name, 'db_name')
+        validate_int_property(size, 'size')
+        if size == 0:
+            raise ValueError("'size' must be greater than 0.")
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        self._closed = False
+
+    def _open(self):
+        conn = sqlite3.connect(
+                self.db_name, timeout=self.timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def checkout(self):
+        """
+            Returns a connection for the calling thread, opening a new one if
+            the pool is not full yet, otherwise waiting for one to be
+            returned.
+        """
+        if self._closed:
+            raise RuntimeError("connection pool is closed.")
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if len(self._connections) < self.size:
+                    conn = self._open()
+                    self._connections.append(conn)
+            if conn is None:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                            "Timed out waiting for a pooled connection.")
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn):
+        """
+            Returns a connection checked out by the calling thread to the
+            pool.
+        """
+        if getattr(self._local, 'conn', None) is not conn:
+            raise ValueError(
+                    "'conn' was not checked out by the current thread.")
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def cursor(self):
+        """
+            Yields a cursor on a pooled connection. The transaction is
+            committed when the block exits cleanly and rolled back otherwise.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def close(self):
+        """
+            Closes every idle connection, connections still checked out are
+            closed when they are released.
+        """
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,593 @@
+# src/db/repository.py
+import sqlite3
+import uuid
+from datetime import date, datetime
+from itertools import islice
+import src.db.db as db
+from src.contact.contact import Contact
+from src.booking.booking import Booking, BOOKING_STATUSES, \
+        STATUS_TRANSITIONS, validate_status_property
+from src.booking.recurrence import RecurrenceRule
+from src.utils.validators import validate_int_property, \
+        validate_string_property
+
+"""
+    This module stores user accounts and their contacts and bookings in
+    SQLite.
+    Every function takes the cursor to run on, so it works with the module
+    level 'db.cursor' as well as with a cursor from 'db.pooled_cursor()'.
+"""
+
+USERS_TABLE = """
+        users(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                password TEXT NOT NULL,
+                email TEXT NOT NULL UNIQUE
+                )"""
+
+CONTACTS_TABLE = """
+        contacts(
+                id TEXT PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL
+                )"""
+
+BOOKINGS_TABLE = """
+        bookings(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                date TEXT NOT NULL,
+                time TEXT NOT NULL,
+                contact TEXT NOT NULL,
+                description TEXT NOT NULL,
+                duration INTEGER NOT NULL DEFAULT 60,
+                revision INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending',
+                expires_at TEXT,
+                rrule TEXT,
+                uid TEXT
+                )"""
+
+# Emails waiting to be sent, see src/mail/outbox.py. 'dedupe_key' stops the
+# same email being queued twice, e.g. two confirmations for one booking.
+OUTBOX_TABLE = """
+        outbox(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                dedupe_key TEXT NOT NULL UNIQUE,
+                recipient TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                last_error TEXT
+                )"""
+
+# Columns added to the tables after they were first released, with their
+# definitions, so older databases can be brought up to date.
+ADDED_COLUMNS = {
+        "bookings": (
+            ("duration", "INTEGER NOT NULL DEFAULT 60"),
+            ("revision", "INTEGER NOT NULL DEFAULT 0"),
+            ("status", "TEXT NOT NULL DEFAULT 'pending'"),
+            ("expires_at", "TEXT"),
+            ("rrule", "TEXT"),
+            ("uid", "TEXT"),
+            ),
+        }
+
+# One row per counter, 'bookings' is the revision of the last booking change
+# and is handed to calendar clients as their sync token.
+SYNC_STATE_TABLE = """
+        sync_state(
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+                )"""
+
+# Deleted bookings, kept so an incremental export can cancel them.
+BOOKING_DELETIONS_TABLE = """
+        booking_deletions(
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                revision INTEGER NOT NULL
+                )"""
+
+# Every insert, update or delete of a booking takes the next revision.
+INIT_SYNC_STATE = "INSERT OR IGNORE INTO sync_state(name, value) " + \
+    "VALUES ('bookings', 0)"
+
+TRIGGERS = (
+        """CREATE TRIGGER IF NOT EXISTS trg_bookings_insert_revision
+        AFTER INSERT ON bookings
+        BEGIN
+            UPDATE sync_state SET value = value + 1 WHERE name = 'bookings';
+            UPDATE bookings SET revision = (
+                SELECT value FROM sync_state WHERE name = 'bookings')
+            WHERE id = NEW.id;
+        END""",
+        # dropped first so databases made before a column was added to it
+        # get the new column list
+        "DROP TRIGGER IF EXISTS trg_bookings_update_revision",
+        """CREATE TRIGGER trg_bookings_update_revision
+        AFTER UPDATE OF user_id, title, date, time, contact, description,
+            duration, status, expires_at, rrule ON bookings
+        BEGIN
+            UPDATE sync_state SET value = value + 1 WHERE name = 'bookings';
+            UPDATE bookings SET revision = (
+                SELECT value FROM sync_state WHERE name = 'bookings')
+            WHERE id = NEW.id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_bookings_delete_revision
+        AFTER DELETE ON bookings
+        BEGIN
+            UPDATE sync_state SET value = value + 1 WHERE name = 'bookings';
+            INSERT OR REPLACE INTO booking_deletions(id, user_id, revision)
+            SELECT OLD.id, OLD.user_id, value FROM sync_state
+            WHERE name = 'bookings';
+        END""",
+        )
+
+INDEXES = (
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username " +
+        "ON users(username)",
+        "CREATE INDEX IF NOT EXISTS idx_contacts_user_email " +
+        "ON contacts(user_id, email)",
+        "CREATE INDEX IF NOT EXISTS idx_contacts_user_lower_email " +
+        "ON contacts(user_id, lower(email))",
+        "CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts(name)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_user_uid " +
+        "ON bookings(user_id, uid)",
+        "CREATE INDEX IF NOT EXISTS idx_bookings_user_date_time " +
+        "ON bookings(user_id, date, time)",
+        "CREATE INDEX IF NOT EXISTS idx_bookings_user_revision " +
+        "ON bookings(user_id, revision)",
+        "CREATE INDEX IF NOT EXISTS idx_booking_deletions_user_revision " +
+        "ON booking_deletions(user_id, revision)",
+        "CREATE INDEX IF NOT EXISTS idx_bookings_status_expires_at " +
+        "ON bookings(status, expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_outbox_status_next_attempt " +
+        "ON outbox(status, next_attempt)",
+        )
+
+INSERT_CONTACT = "INSERT OR REPLACE INTO contacts(id, user_id, name, " + \
+    "email) VALUES (?, ?, ?, ?)"
+
+# Imported rows: a contact is skipped if the user already has one with the
+# same name and email (ignoring case), an event with a known UID updates its
+# booking instead of adding another.
+IMPORT_CONTACT = "INSERT INTO contacts(id, user_id, name, email) " + \
+    "SELECT ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM contacts " + \
+    "WHERE user_id = ? AND lower(email) = ? AND lower(name) = ?)"
+
+IMPORT_BOOKING = "INSERT INTO bookings(user_id, uid, title, date, time, " + \
+    "contact, description, duration, status, expires_at, rrule) " + \
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) " + \
+    "ON CONFLICT(user_id, uid) DO UPDATE SET " + \
+    "title = excluded.title, date = excluded.date, time = excluded.time, " + \
+    "contact = excluded.contact, description = excluded.description, " + \
+    "duration = excluded.duration, status = excluded.status, " + \
+    "expires_at = excluded.expires_at, rrule = excluded.rrule"
+
+# a NULL id inserts a new row, a stored booking's id updates its row in place
+# so the update trigger bumps its revision. A row of another user is left
+# alone, the statement then changes nothing.
+INSERT_BOOKING = "INSERT INTO bookings(id, user_id, title, date, time, " + \
+    "contact, description, duration, status, expires_at, rrule) " + \
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) " + \
+    "ON CONFLICT(id) DO UPDATE SET " + \
+    "title = excluded.title, date = excluded.date, time = excluded.time, " + \
+    "contact = excluded.contact, description = excluded.description, " + \
+    "duration = excluded.duration, status = excluded.status, " + \
+    "expires_at = excluded.expires_at, rrule = excluded.rrule " + \
+    "WHERE bookings.user_id = excluded.user_id"
+
+INSERT_USER = "INSERT INTO users(username, password, email) " + \
+    "VALUES (?, ?, ?)"
+
+SELECT_USER = "SELECT id, username, password, email FROM users " + \
+    "WHERE username = ? ORDER BY id LIMIT 1"
+
+UPDATE_PASSWORD = "UPDATE users SET password = ? WHERE id = ?"
+
+SELECT_CONTACTS = "SELECT id, name, email FROM contacts"
+
+SELECT_BOOKINGS = "SELECT id, title, date, time, contact, description, " + \
+    "duration, status, expires_at, rrule FROM bookings"
+
+UPDATE_BOOKING_STATUS = "UPDATE bookings SET status = ? " + \
+    "WHERE id = ? AND user_id = ? AND status IN ({})"
+
+# expires up to 'batch_size' stale requests per statement, so a big backlog
+# is worked off in short write transactions
+EXPIRE_BOOKINGS = "UPDATE bookings SET status = 'expired' WHERE id IN (" + \
+    "SELECT id FROM bookings WHERE status = 'pending' " + \
+    "AND expires_at <= ? LIMIT ?)"
+
+COUNT_BOOKINGS_BY_STATUS = "SELECT status, COUNT(*) FROM bookings"
+
+
+def add_missing_columns(cursor):
+    for table, columns in ADDED_COLUMNS.items():
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, definition in columns:
+            if name not in existing:
+                cursor.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def make_usernames_unique(cursor):
+    """
+        idx_users_username used to be a plain index, drops it so it is
+        created again as a UNIQUE one. Fails in create_tables with
+        sqlite3.IntegrityError if the database already holds a username
+        twice.
+    """
+    cursor.execute("PRAGMA index_list(users)")
+    for row in cursor.fetchall():
+        if row[1] == "idx_users_username" and not row[2]:
+            cursor.execute("DROP INDEX idx_users_username")
+
+
+def create_tables(cursor):
+    db.create_table(cursor, db.create_table_query(USERS_TABLE))
+    db.create_table(cursor, db.create_table_query(CONTACTS_TABLE))
+    db.create_table(cursor, db.create_table_query(BOOKINGS_TABLE))
+    db.create_table(cursor, db.create_table_query(SYNC_STATE_TABLE))
+    db.create_table(cursor, db.create_table_query(BOOKING_DELETIONS_TABLE))
+    db.create_table(cursor, db.create_table_query(OUTBOX_TABLE))
+    add_missing_columns(cursor)
+    make_usernames_unique(cursor)
+    for index in INDEXES:
+        cursor.execute(index)
+    cursor.execute(INIT_SYNC_STATE)
+    for trigger in TRIGGERS:
+        cursor.execute(trigger)
+    cursor.connection.commit()
+
+
+# Conversions between model values and their column text
+def date_to_text(value):
+    """
+        Accepts a datetime, a date or a (year, month, day) tuple and returns
+        it as 'YYYY-MM-DD', which sorts the same way as the dates do.
+    """
+    if isinstance(value, (datetime, date)):
+        return f"{value.year:04d}-{value.month:02d}-{value.day:02d}"
+    if isinstance(value, tuple) and len(value) == 3:
+        return f"{value[0]:04d}-{value[1]:02d}-{value[2]:02d}"
+    raise TypeError("'date' must be a datetime, date or (y, m, d) tuple.")
+
+
+def time_to_text(value):
+    """
+        Accepts an (hour, minute) tuple and returns it as 'HH:MM'.
+    """
+    if isinstance(value, tuple) and len(value) == 2:
+        return f"{value[0]:02d}:{value[1]:02d}"
+    raise TypeError("'time' must be an (hour, minute) tuple.")
+
+
+def text_to_date(value):
+    year, month, day = value.split("-")
+    return datetime(int(year), int(month), int(day))
+
+
+def text_to_time(value):
+    hour, minute = value.split(":")
+    return (int(hour), int(minute))
+
+
+def datetime_to_text(value):
+    """
+        Returns a datetime as 'YYYY-MM-DD HH:MM:SS', or None for None.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    raise TypeError("'value' must be a datetime or None.")
+
+
+def text_to_datetime(value):
+    if value is None:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+def contact_to_row(user_id, contact):
+    return (str(contact.id), user_id, contact.name, contact.email)
+
+
+def row_to_contact(row):
+    contact = Contact(row[1], row[2])
+    contact._id = uuid.UUID(row[0]).int
+    return contact
+
+
+def booking_to_row(user_id, booking):
+    return (booking.id, user_id, booking.title, date_to_text(booking.date),
+            time_to_text(booking.time), booking.contact, booking.description,
+            booking.duration, booking.status,
+            datetime_to_text(booking.expires_at),
+            None if booking.recurrence is None
+            else booking.recurrence.to_text())
+
+
+def row_to_booking(row):
+    return Booking(
+            _id=row[0],
+            _title=row[1],
+            _date=text_to_date(row[2]),
+            _time=text_to_time(row[3]),
+            _contact=row[4],
+            _description=row[5],
+            _duration=row[6],
+            _status=row[7],
+            _expires_at=text_to_datetime(row[8]),
+            _recurrence=None if row[9] is None
+            else RecurrenceRule.from_text(row[9]))
+
+
+def _fetch_in_batches(cursor, batch_size):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
+
+
+# Contacts
+def save_contacts(cursor, user_id, contacts, chunk_size=500):
+    """
+        Saves an iterable of Contact objects for 'user_id', replacing any
+        contact already stored with the same id.
+        Returns the number of contacts written.
+    """
+    validate_int_property(user_id, 'user_id')
+    rows = (contact_to_row(user_id, contact) for contact in contacts)
+    return db.insert_many(cursor, INSERT_CONTACT, rows, chunk_size)
+
+
+def load_contacts(cursor, user_id, batch_size=500):
+    """
+        Generator that yields the Contact objects of 'user_id', fetching
+        'batch_size' rows at a time.
+    """
+    validate_int_property(user_id, 'user_id')
+    cursor.execute(SELECT_CONTACTS + " WHERE user_id = ?", (user_id,))
+    for row in _fetch_in_batches(cursor, batch_size):
+        yield row_to_contact(row)
+
+
+def find_contact(cursor, user_id, email):
+    """
+        Returns the Contact of 'user_id' with 'email' or None, using the
+        (user_id, email) index.
+    """
+    validate_int_property(user_id, 'user_id')
+    validate_string_property(email, 'email')
+    cursor.execute(
+            SELECT_CONTACTS + " WHERE user_id = ? AND email = ?",
+            (user_id, email))
+    row = cursor.fetchone()
+    return None if row is None else row_to_contact(row)
+
+
+def find_contacts_by_name(cursor, user_id, name):
+    validate_int_property(user_id, 'user_id')
+    validate_string_property(name, 'name')
+    cursor.execute(
+            SELECT_CONTACTS + " WHERE name = ? AND user_id = ?",
+            (name, user_id))
+    return [row_to_contact(row) for row in cursor.fetchall()]
+
+
+# Bookings
+def save_bookings(cursor, user_id, bookings, chunk_size=500):
+    """
+        Saves an iterable of Booking objects for 'user_id', committing once
+        per chunk of 'chunk_size'. A booking without an id gets the id of
+        its new row, one that has an id updates its row, so saving the same
+        bookings again doesn't duplicate them.
+        Returns the number of bookings written, a booking whose id is the
+        row of another user isn't written. If a chunk fails it is rolled
+        back, its bookings keep the ids they had and the chunks
+        committed before it are kept.
+    """
+    validate_int_property(user_id, 'user_id')
+    validate_int_property(chunk_size, 'chunk_size')
+    if chunk_size < 1:
+        raise ValueError("'chunk_size' must be greater than 0.")
+    bookings = iter(bookings)
+    total = 0
+    while True:
+        chunk = list(islice(bookings, chunk_size))
+        if not chunk:
+            break
+        inserted = []
+        written = 0
+        try:
+            for booking in chunk:
+                cursor.execute(INSERT_BOOKING,
+                               booking_to_row(user_id, booking))
+                written += cursor.rowcount
+                if booking.id is None:
+                    booking.id = cursor.lastrowid
+                    inserted.append(booking)
+            cursor.connection.commit()
+        except sqlite3.Error as e:
+            cursor.connection.rollback()
+            for booking in inserted:
+                booking._id = None
+            print(f"Error when trying to save bookings: {e}")
+            break
+        total += written
+    return total
+
+
+def load_bookings(cursor, user_id, batch_size=500):
+    """
+        Generator that yields the Booking objects of 'user_id' in date and
+        time order, fetching 'batch_size' rows at a time.
+    """
+    validate_int_property(user_id, 'user_id')
+    cursor.execute(
+            SELECT_BOOKINGS + " WHERE user_id = ? ORDER BY date, time",
+            (user_id,))
+    for row in _fetch_in_batches(cursor, batch_size):
+        yield row_to_booking(row)
+
+
+def find_bookings(cursor, user_id, on_date, at_time=None):
+    """
+        Returns the bookings of 'user_id' on 'on_date', optionally only the
+        ones at 'at_time', using the (user_id, date, time) index.
+    """
+    validate_int_property(user_id, 'user_id')
+    query = SELECT_BOOKINGS + " WHERE user_id = ? AND date = ?"
+    params = [user_id, date_to_text(on_date)]
+    if at_time is not None:
+        query += " AND time = ?"
+        params.append(time_to_text(at_time))
+    cursor.execute(query + " ORDER BY time", params)
+    return [row_to_booking(row) for row in cursor.fetchall()]
+
+
+def find_bookings_between(cursor, user_id, start_date, end_date):
+    """
+        Returns the bookings of 'user_id' from 'start_date' up to and
+        including 'end_date', as an index range scan. A repeating booking is
+        matched on its first date only, a BookingCalendar expands it.
+    """
+    validate_int_property(user_id, 'user_id')
+    cursor.execute(
+            SELECT_BOOKINGS + " WHERE user_id = ? AND date BETWEEN ? AND ?" +
+            " ORDER BY date, time",
+            (user_id, date_to_text(start_date), date_to_text(end_date)))
+    return [row_to_booking(row) for row in cursor.fetchall()]
+
+
+def set_booking_status(cursor, user_id, booking_id, status):
+    """
+        Records a contact's answer, or any other allowed status change, for
+        booking 'booking_id' of 'user_id'. The current status is checked in
+        the same UPDATE, so two answers racing each other can't both win.
+        Returns True if the booking changed, False if there is no such
+        booking or it can't move to 'status' (see STATUS_TRANSITIONS).
+    """
+    validate_int_property(user_id, 'user_id')
+    validate_int_property(booking_id, 'booking_id')
+    validate_status_property(status)
+    sources = [current for current, allowed in STATUS_TRANSITIONS.items()
+               if status in allowed]
+    if not sources:
+        return False
+    cursor.execute(
+            UPDATE_BOOKING_STATUS.format(", ".join("?" * len(sources))),
+            (status, booking_id, user_id, *sources))
+    return cursor.rowcount == 1
+
+
+def expire_bookings(cursor, now, batch_size=500):
+    """
+        Marks every pending booking whose 'expires_at' is not after 'now' as
+        expired, 'batch_size' rows per UPDATE, committing after each.
+        The bookings are found through the (status, expires_at) index and
+        never loaded. Returns the number of bookings expired.
+    """
+    validate_int_property(batch_size, 'batch_size')
+    if batch_size < 1:
+        raise ValueError("'batch_size' must be greater than 0.")
+    now_text = datetime_to_text(now)
+    expired = 0
+    while True:
+        cursor.execute(EXPIRE_BOOKINGS, (now_text, batch_size))
+        count = cursor.rowcount
+        cursor.connection.commit()
+        expired += count
+        if count < batch_size:
+            return expired
+
+
+def count_bookings_by_status(cursor, user_id=None):
+    """
+        Returns a dict of the number of bookings in each status, of every
+        user unless 'user_id' is given.
+    """
+    query = COUNT_BOOKINGS_BY_STATUS
+    params = ()
+    if user_id is not None:
+        validate_int_property(user_id, 'user_id')
+        query += " WHERE user_id = ?"
+        params = (user_id,)
+    cursor.execute(query + " GROUP BY status", params)
+    counts = dict.fromkeys(BOOKING_STATUSES, 0)
+    counts.update(cursor.fetchall())
+    return counts
+
+
+# User accounts
+def create_account(cursor, username, password_hash, email):
+    """
+        Stores a new account, 'password_hash' must already be hashed.
+        Returns the id of the new row.
+        Raises ValueError if the username or email is already taken.
+    """
+    validate_string_property(username, 'username')
+    validate_string_property(password_hash, 'password_hash')
+    validate_string_property(email, 'email')
+    try:
+        cursor.execute(INSERT_USER, (username, password_hash, email))
+    except sqlite3.IntegrityError as e:
+        cursor.connection.rollback()
+        if "users.email" in str(e):
+            raise ValueError(f"email '{email}' is already taken.") from e
+        raise ValueError(f"username '{username}' is already taken.") from e
+    cursor.connection.commit()
+    return cursor.lastrowid
+
+
+def find_account(cursor, username):
+    """
+        Returns the (id, username, password_hash, email) row of 'username',
+        looked up through idx_users_username, or None.
+    """
+    validate_string_property(username, 'username')
+    cursor.execute(SELECT_USER, (username,))
+    return cursor.fetchone()
+
+
+def update_password(cursor, user_id, password_hash):
+    validate_int_property(user_id, 'user_id')
+    validate_string_property(password_hash, 'password_hash')
+    cursor.execute(UPDATE_PASSWORD, (password_hash, user_id))
+    cursor.connection.commit()
+    return cursor.rowcount
+
+
+def save_user(cursor, user_id, user, chunk_size=500):
+    """
+        Saves the contacts and bookings held in memory by 'user'.
+        Returns a (contacts_written, bookings_written) tuple.
+    """
+    return (save_contacts(cursor, user_id, user.contacts, chunk_size),
+            save_bookings(cursor, user_id, user.bookings, chunk_size))
+
+
+def load_user(cursor, user_id, user, batch_size=500):
+    """
+        Loads the stored contacts and bookings of 'user_id' into 'user'.
+    """
+    for contact in list(load_contacts(cursor, user_id, batch_size)):
+        user.add_contact(contact)
+    for booking in list(load_bookings(cursor, user_id, batch_size)):
+        user.add_booking(booking)
+    return user
+
+
+if __name__ == '__main__':
+    print("not intended to run in isolation")
@@ -0,0 +1,209 @@
+# src/exporter/exporter.py
+import argparse
+import sys
+from datetime import datetime, timezone
+import src.db.db as db
+import src.db.repository as repository
+from src.booking.booking import PENDING, CONFIRMED, DECLINED, EXPIRED
+from src.booking.recurrence import RecurrenceRule, format_rule_date
+from src.utils.validators import validate_int_property
+
+"""
+    This module exports a user's bookings as an iCalendar (RFC 5545) file:
+        python -m src.exporter.exporter --db app_genie.db --user-id 1 \\
+            --output bookings.ics [--since 42]
+
+    Bookings are read from the cursor a batch at a time and each VEVENT is
+    written as soon as it is formatted, so the calendar is never built in
+    memory. 'output' can be any object with a write() method, such as a file
+    or socket.makefile('w').
+
+    Every change to the bookings table takes the next revision (see
+    repository.TRIGGERS). An export returns the revision it covers as the
+    sync token, and an export 'since' a token only holds the bookings
+    changed after it, with deleted bookings sent as cancelled events.
+    Declined and expired bookings are exported as cancelled too, pending
+    ones as tentative.
+"""
+
+PRODUCT_ID = "-//Appointment Genie//Bookings//EN"
+UID_DOMAIN = "appointment-genie"
+DEFAULT_BATCH_SIZE = 500
+
+# booking status: VEVENT STATUS
+EVENT_STATUSES = {PENDING: "TENTATIVE", CONFIRMED: "CONFIRMED",
+                  DECLINED: "CANCELLED", EXPIRED: "CANCELLED"}
+
+SELECT_CHANGED_BOOKINGS = "SELECT id, title, date, time, contact, " + \
+    "description, duration, rrule, status FROM bookings WHERE user_id = ? " + \
+    "AND revision > ? AND revision <= ? ORDER BY revision"
+
+SELECT_DELETED_BOOKINGS = "SELECT id FROM booking_deletions " + \
+    "WHERE user_id = ? AND revision > ? AND revision <= ? ORDER BY revision"
+
+SELECT_SYNC_TOKEN = "SELECT value FROM sync_state WHERE name = 'bookings'"
+
+
+def escape_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\r\n", "\\n")
+            .replace("\n", "\\n"))
+
+
+def fold_line(line):
+    """
+        Returns 'line' ending in CRLF, split into lines of at most 75 octets,
+        continuation lines start with a space.
+    """
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while encoded:
+        # don't split a multi byte character
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def booking_uid(booking_id):
+    return f"booking-{booking_id}@{UID_DOMAIN}"
+
+
+def format_event(row, stamp):
+    """
+        Returns the VEVENT text of a booking row (id, title, 'YYYY-MM-DD',
+        'HH:MM', contact, description, duration, rrule, status). A repeating
+        booking is one VEVENT with its RRULE and EXDATE.
+    """
+    booking_id, title, date_text, time_text, contact, description, \
+        duration, rrule, status = row
+    start = date_text.replace("-", "") + "T" + \
+        time_text.replace(":", "") + "00"
+    lines = ["BEGIN:VEVENT",
+             f"UID:{booking_uid(booking_id)}",
+             f"DTSTAMP:{stamp}",
+             f"DTSTART:{start}",
+             f"DURATION:PT{duration}M",
+             f"SUMMARY:{escape_text(title)}",
+             f"DESCRIPTION:{escape_text(description)}",
+             f"CONTACT:{escape_text(contact)}",
+             f"STATUS:{EVENT_STATUSES[status]}"]
+    if rrule is not None:
+        rule = RecurrenceRule.from_text(rrule)
+        lines.append(f"RRULE:{rule.rrule_text()}")
+        # whole day exceptions need their own EXDATE with VALUE=DATE
+        times = sorted(value for value in rule.exceptions
+                       if isinstance(value, datetime))
+        days = sorted(value for value in rule.exceptions
+                      if not isinstance(value, datetime))
+        if times:
+            lines.append("EXDATE:" + ",".join(
+                    format_rule_date(value) for value in times))
+        if days:
+            lines.append("EXDATE;VALUE=DATE:" + ",".join(
+                    format_rule_date(value) for value in days))
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def format_cancelled_event(booking_id, stamp):
+    lines = ("BEGIN:VEVENT",
+             f"UID:{booking_uid(booking_id)}",
+             f"DTSTAMP:{stamp}",
+             "STATUS:CANCELLED",
+             "END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def get_sync_token(cursor):
+    cursor.execute(SELECT_SYNC_TOKEN)
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def iter_calendar(cursor, user_id, since=None, batch_size=DEFAULT_BATCH_SIZE,
+                  token=None):
+    """
+        Generator that yields the iCalendar text piece by piece: the header,
+        one VEVENT at a time and the footer. With 'since' only bookings
+        changed after that sync token are included, plus cancelled events
+        for bookings deleted after it.
+        Changes after 'token' (the current sync token unless given) are
+        left for the next export. The token is also written as the
+        X-APPGENIE-SYNC-TOKEN calendar property.
+    """
+    validate_int_property(user_id, 'user_id')
+    validate_int_property(batch_size, 'batch_size')
+    if since is not None:
+        validate_int_property(since, 'since')
+    if token is None:
+        token = get_sync_token(cursor)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield (fold_line("BEGIN:VCALENDAR") + fold_line("VERSION:2.0") +
+           fold_line(f"PRODID:{PRODUCT_ID}") +
+           fold_line(f"X-APPGENIE-SYNC-TOKEN:{token}"))
+    cursor.execute(SELECT_CHANGED_BOOKINGS,
+                   (user_id, -1 if since is None else since, token))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield format_event(row, stamp)
+    if since is not None:
+        cursor.execute(SELECT_DELETED_BOOKINGS, (user_id, since, token))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for (booking_id,) in rows:
+                yield format_cancelled_event(booking_id, stamp)
+    yield fold_line("END:VCALENDAR")
+
+
+def export_bookings(cursor, user_id, output, since=None,
+                    batch_size=DEFAULT_BATCH_SIZE):
+    """
+        Writes the calendar of 'user_id' to 'output', see iter_calendar.
+        Returns the sync token for the next incremental export.
+    """
+    token = get_sync_token(cursor)
+    for text in iter_calendar(cursor, user_id, since, batch_size, token):
+        output.write(text)
+    return token
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Export a user's bookings as an iCalendar file.")
+    parser.add_argument("--db", default="app_genie.db")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--output", default="-",
+                        help="file to write, '-' for stdout")
+    parser.add_argument("--since", type=int, default=None,
+                        help="sync token of the previous export")
+    args = parser.parse_args(argv)
+    db.create_connection(_db_name=args.db)
+    repository.create_tables(db.cursor)
+    try:
+        if args.output == "-":
+            token = export_bookings(
+                    db.cursor, args.user_id, sys.stdout, args.since)
+        else:
+            with open(args.output, "w", newline="", encoding="utf-8") as f:
+                token = export_bookings(
+                        db.cursor, args.user_id, f, args.since)
+    finally:
+        db.close()
+    print(f"sync token: {token}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,461 @@
+# src/importer/importer.py
+import argparse
+import csv
+import json
+import re
+import sqlite3
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import src.db.db as db
+import src.db.repository as repository
+from src.booking.booking import validate_time_property, \
+        validate_duration_property, confirmation_deadline, \
+        DEFAULT_DURATION, PENDING, CONFIRMED, DECLINED
+from src.booking.recurrence import RecurrenceRule, parse_rule_date
+from src.utils.validators import validate_emails, validate_string_property, \
+        validate_int_property
+
+"""
+    This module imports contacts from a CSV file and bookings from an
+    iCalendar (.ics) file:
+        python -m src.importer.importer contacts.csv --db app_genie.db \\
+            --user-id 1 --rejects rejects.csv
+
+    Each import is a generator pipeline: records are read one at a time,
+    grouped into chunks of 'chunk_size', validated a chunk at a time and the
+    valid rows of each chunk are written and committed together. Only one
+    chunk is held at a time, so memory use doesn't grow with the size of the
+    file.
+    Invalid records are skipped and listed in the rejects file as
+    line, error, data rows. A chunk the database refuses is rolled back and
+    its records are counted as failed, the import then goes on with the next
+    chunk and the command exits with status 1.
+    Importing a file again doesn't add its rows twice: contacts the user
+    already has are skipped and an event updates the booking imported with
+    the same UID.
+    UTC ('Z') and TZID times are converted to local time, the time bookings
+    are kept in.
+"""
+
+DEFAULT_CHUNK_SIZE = 500
+REJECTS_HEADER = ("line", "error", "data")
+DEFAULT_DESCRIPTION = "Enter a description."
+DEFAULT_CONTACT = "New Contact"
+
+# VEVENT STATUS: booking status, the reverse of exporter.EVENT_STATUSES.
+# A cancelled event comes back declined, whether it was declined or expired.
+# Events without a STATUS are from another calendar and already agreed.
+BOOKING_STATUSES = {"TENTATIVE": PENDING, "CONFIRMED": CONFIRMED,
+                    "CANCELLED": DECLINED}
+
+
+def chunked(iterable, size):
+    """
+        Generator that yields lists of up to 'size' items from 'iterable'.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def open_source(source):
+    """
+        Yields an open text file for a path, or 'source' itself if it is
+        already a file object.
+    """
+    if isinstance(source, str):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            yield f
+    else:
+        yield source
+
+
+# CSV contacts
+def read_csv_contacts(f):
+    """
+        Generator that yields (line_number, {"name": ..., "email": ...})
+        for each row of a CSV file with 'name' and 'email' columns, in any
+        order and case. Raises ValueError if either column is missing.
+    """
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [column.strip().lower() for column in header]
+    for required in ("name", "email"):
+        if required not in columns:
+            raise ValueError(f"CSV file has no '{required}' column.")
+    name_index = columns.index("name")
+    email_index = columns.index("email")
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        name = row[name_index].strip() if name_index < len(row) else ""
+        email = row[email_index].strip() if email_index < len(row) else ""
+        yield reader.line_num, {"name": name, "email": email}
+
+
+def validate_contact_chunk(user_id, chunk):
+    """
+        Validates a chunk of (line_number, record) pairs, the email column
+        of the whole chunk is checked in one validate_emails call.
+        Returns (rows, rejects), rows are ready for IMPORT_CONTACT and
+        rejects are (line_number, error, record) tuples.
+    """
+    errors = dict(validate_emails(record["email"] for _, record in chunk))
+    rows = []
+    rejects = []
+    for index, (line_number, record) in enumerate(chunk):
+        error = errors.get(index)
+        if error is None:
+            try:
+                validate_string_property(record["name"], 'name')
+            except (TypeError, ValueError) as e:
+                error = str(e)
+        if error is not None:
+            rejects.append((line_number, error, record))
+            continue
+        rows.append((str(uuid.uuid4()), user_id, record["name"],
+                     record["email"], user_id, record["email"].lower(),
+                     record["name"].lower()))
+    return rows, rejects
+
+
+# iCalendar bookings
+def unfold_lines(f):
+    """
+        Generator that yields (line_number, line) for each logical line of
+        an iCalendar file, joining folded continuation lines.
+    """
+    current = None
+    start = 0
+    for line_number, line in enumerate(f, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current = line
+        start = line_number
+    if current is not None:
+        yield start, current
+
+
+def parse_property(line):
+    """
+        Splits 'NAME;PARAM=value:VALUE' into (name, params dict, value).
+        A ':' inside a quoted parameter value doesn't end the parameters.
+    """
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            break
+    else:
+        raise ValueError(f"no ':' in property line '{line}'")
+    head, value = line[:index], line[index + 1:]
+    name, *raw_params = head.split(";")
+    params = {}
+    for param in raw_params:
+        key, _, param_value = param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def unescape_text(value):
+    return re.sub(r"\\([\\;,nN])",
+                  lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def read_ics_events(f):
+    """
+        Generator that yields (line_number, {name: (params, value)}) for each
+        VEVENT, line_number is the line of its BEGIN:VEVENT. Only the first
+        occurrence of each property is kept, except EXDATE whose values are
+        joined.
+    """
+    event = None
+    start = 0
+    for line_number, line in unfold_lines(f):
+        if not line.strip():
+            continue
+        upper = line.upper()
+        if upper == "BEGIN:VEVENT":
+            event, start = {}, line_number
+        elif upper == "END:VEVENT" and event is not None:
+            yield start, event
+            event = None
+        elif event is not None:
+            try:
+                name, params, value = parse_property(line)
+            except ValueError:
+                continue
+            if name == "EXDATE" and name in event:
+                event[name] = (params, event[name][1] + "," + value)
+            else:
+                event.setdefault(name, (params, value))
+
+
+def parse_ics_datetime(value, params=None):
+    """
+        Returns a local datetime for a DATE-TIME ('20240501T093000') or DATE
+        ('20240501') value. A UTC time ('20240501T093000Z') or one with a
+        TZID parameter in 'params' is converted to local time.
+        Raises ValueError for a TZID that isn't a known time zone.
+    """
+    value = value.strip()
+    if "T" not in value:
+        return datetime.strptime(value, "%Y%m%d")
+    tzinfo = None
+    if value[-1:] in ("Z", "z"):
+        value = value[:-1]
+        tzinfo = timezone.utc
+    elif params and params.get("TZID"):
+        tzid = params["TZID"]
+        try:
+            tzinfo = ZoneInfo(tzid)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"unknown TZID '{tzid}'")
+    result = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    if tzinfo is None:
+        return result
+    return result.replace(tzinfo=tzinfo).astimezone().replace(tzinfo=None)
+
+
+def parse_ics_dates(value, params=None):
+    """
+        Returns the datetimes and dates of a comma separated EXDATE value,
+        converted to local time like DTSTART.
+    """
+    return [parse_ics_datetime(item, params) if "T" in item
+            else parse_rule_date(item) for item in value.split(",")]
+
+
+_DURATION = re.compile(
+        r"P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?\Z")
+
+
+def parse_ics_duration(value):
+    """
+        Returns the minutes of a DURATION value such as 'PT1H30M' or 'P1D'.
+    """
+    match = _DURATION.match(value.strip().lstrip("+"))
+    if match is None or value.strip().lstrip("+") == "P":
+        raise ValueError(f"invalid DURATION '{value}'")
+    weeks, days, hours, minutes, seconds = (
+            int(part or 0) for part in match.groups())
+    return (weeks * 7 + days) * 24 * 60 + hours * 60 + minutes + seconds // 60
+
+
+def event_to_record(event):
+    """
+        Turns the properties of a VEVENT into a booking record with the
+        Booking field names. Raises ValueError for a missing or unreadable
+        SUMMARY, DTSTART, DTEND or DURATION, an unknown STATUS, or an RRULE
+        that RecurrenceRule doesn't support.
+        A tentative event is pending and expires like a new booking, see
+        confirmation_deadline.
+    """
+    if "SUMMARY" not in event:
+        raise ValueError("VEVENT has no SUMMARY.")
+    if "DTSTART" not in event:
+        raise ValueError("VEVENT has no DTSTART.")
+    start = parse_ics_datetime(event["DTSTART"][1], event["DTSTART"][0])
+    if "DTEND" in event:
+        end = parse_ics_datetime(event["DTEND"][1], event["DTEND"][0])
+        duration = int((end - start).total_seconds() // 60)
+    elif "DURATION" in event:
+        duration = parse_ics_duration(event["DURATION"][1])
+    else:
+        duration = DEFAULT_DURATION
+    contact = DEFAULT_CONTACT
+    if "ATTENDEE" in event:
+        params, value = event["ATTENDEE"]
+        contact = params.get("CN") or value.split(":", 1)[-1] or contact
+    elif "CONTACT" in event and event["CONTACT"][1].strip():
+        contact = unescape_text(event["CONTACT"][1])
+    description = DEFAULT_DESCRIPTION
+    if "DESCRIPTION" in event and event["DESCRIPTION"][1].strip():
+        description = unescape_text(event["DESCRIPTION"][1])
+    status = CONFIRMED
+    expires_at = None
+    if "STATUS" in event:
+        value = event["STATUS"][1].strip().upper()
+        if value not in BOOKING_STATUSES:
+            raise ValueError(f"unknown STATUS '{value}'")
+        status = BOOKING_STATUSES[value]
+        if status == PENDING:
+            expires_at = confirmation_deadline(start)
+    recurrence = None
+    if "RRULE" in event:
+        recurrence = RecurrenceRule.from_text(event["RRULE"][1])
+        if "EXDATE" in event and event["EXDATE"][1].strip():
+            recurrence.exceptions = parse_ics_dates(
+                    event["EXDATE"][1], event["EXDATE"][0])
+    return {"title": unescape_text(event["SUMMARY"][1]),
+            "date": start, "time": (start.hour, start.minute),
+            "contact": contact, "description": description,
+            "duration": duration, "status": status,
+            "expires_at": expires_at, "recurrence": recurrence}
+
+
+def validate_booking_chunk(user_id, chunk):
+    """
+        Validates a chunk of (line_number, event) pairs.
+        Returns (rows, rejects), rows are ready for IMPORT_BOOKING and
+        rejects are (line_number, error, event) tuples.
+    """
+    rows = []
+    rejects = []
+    for line_number, event in chunk:
+        try:
+            record = event_to_record(event)
+            validate_string_property(record["title"], 'title')
+            validate_time_property(record["time"])
+            validate_string_property(record["contact"], 'contact')
+            validate_string_property(record["description"], 'description')
+            validate_duration_property(record["duration"])
+        except (TypeError, ValueError) as e:
+            rejects.append((line_number, str(e), {
+                name: value for name, (_, value) in event.items()}))
+            continue
+        uid = event["UID"][1].strip() if "UID" in event else ""
+        rows.append((user_id, uid or None, record["title"],
+                     repository.date_to_text(record["date"]),
+                     repository.time_to_text(record["time"]),
+                     record["contact"], record["description"],
+                     record["duration"], record["status"],
+                     repository.datetime_to_text(record["expires_at"]),
+                     None if record["recurrence"] is None
+                     else record["recurrence"].to_text()))
+    return rows, rejects
+
+
+# pipeline
+def write_rejects(writer, rejects):
+    if writer is None:
+        return
+    for line_number, error, data in rejects:
+        writer.writerow((line_number, error, json.dumps(data, default=str)))
+
+
+@contextmanager
+def open_rejects(rejects):
+    """
+        Yields a csv writer for a rejects path or file object, or None when
+        'rejects' is None.
+    """
+    if rejects is None:
+        yield None
+    elif isinstance(rejects, str):
+        with open(rejects, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(REJECTS_HEADER)
+            yield writer
+    else:
+        writer = csv.writer(rejects)
+        writer.writerow(REJECTS_HEADER)
+        yield writer
+
+
+def run_import(cursor, user_id, records, validate_chunk, insert_query,
+               rejects=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        Validates 'records' chunk by chunk and inserts the valid rows of
+        each chunk in one transaction. A chunk that fails to insert is
+        rolled back and its valid records are counted as failed, valid
+        records 'insert_query' leaves out are counted as skipped.
+        Returns a dict with the number of records read, imported, skipped,
+        rejected and failed.
+    """
+    validate_int_property(user_id, 'user_id')
+    validate_int_property(chunk_size, 'chunk_size')
+    if chunk_size < 1:
+        raise ValueError("'chunk_size' must be greater than 0.")
+    counts = {"read": 0, "imported": 0, "skipped": 0, "rejected": 0,
+              "failed": 0}
+    with open_rejects(rejects) as writer:
+        for chunk_number, chunk in enumerate(
+                chunked(records, chunk_size), 1):
+            rows, rejected = validate_chunk(user_id, chunk)
+            counts["read"] += len(chunk)
+            counts["rejected"] += len(rejected)
+            write_rejects(writer, rejected)
+            if not rows:
+                continue
+            try:
+                cursor.executemany(insert_query, rows)
+                cursor.connection.commit()
+            except sqlite3.Error as e:
+                cursor.connection.rollback()
+                counts["failed"] += len(rows)
+                print(f"Error when trying to insert chunk {chunk_number}: "
+                      f"{e}", file=sys.stderr)
+                continue
+            counts["imported"] += cursor.rowcount
+            counts["skipped"] += len(rows) - cursor.rowcount
+    return counts
+
+
+def import_contacts(cursor, user_id, source, rejects=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        Imports the contacts of a CSV file (path or file object) for
+        'user_id', see run_import.
+    """
+    with open_source(source) as f:
+        return run_import(
+                cursor, user_id, read_csv_contacts(f), validate_contact_chunk,
+                repository.IMPORT_CONTACT, rejects, chunk_size)
+
+
+def import_bookings(cursor, user_id, source, rejects=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        Imports the VEVENTs of an iCalendar file (path or file object) as
+        bookings for 'user_id', see run_import.
+    """
+    with open_source(source) as f:
+        return run_import(
+                cursor, user_id, read_ics_events(f), validate_booking_chunk,
+                repository.IMPORT_BOOKING, rejects, chunk_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Import contacts (.csv) or bookings (.ics).")
+    parser.add_argument("source")
+    parser.add_argument("--db", default="app_genie.db")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--rejects", default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    db.create_connection(_db_name=args.db)
+    repository.create_tables(db.cursor)
+    if args.source.lower().endswith(".ics"):
+        importer = import_bookings
+    else:
+        importer = import_contacts
+    try:
+        counts = importer(db.cursor, args.user_id, args.source, args.rejects,
+                          args.chunk_size)
+    finally:
+        db.close()
+    print(f"read {counts['read']}, imported {counts['imported']}, "
+          f"skipped {counts['skipped']}, rejected {counts['rejected']}, "
+          f"failed {counts['failed']}")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
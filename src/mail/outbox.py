@@ -0,0 +1,392 @@
+# src/mail/outbox.py
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+import src.db.db as db
+from src.utils.validators import validate_int_property, \
+        validate_string_property
+from src.utils.log import get_logger, log_event
+
+"""
+    This module sends the booking confirmation emails.
+
+    Booking creation stores the email in the outbox table, one small insert
+    in the caller's thread (MailWorker.request_confirmation), so a queued
+    email survives a restart and creating a booking never waits on the mail
+    server. The worker thread sends the due emails in batches over one SMTP
+    connection, which is kept open while there is mail to send and closed
+    once the outbox is empty.
+    A temporary failure (4xx reply, lost connection) is retried after
+    'retry_delay' seconds, doubling with every attempt up to
+    'max_retry_delay'. A permanent failure (5xx reply) or running out of
+    attempts marks the email as failed. When the server can't be reached
+    or refuses the connection the emails are left as they are and the
+    worker waits before connecting again, with the same doubling delay.
+    Each email has a dedupe key, for a confirmation it is the booking's id,
+    so the same booking is never confirmed twice.
+    Only one worker should send from an outbox table at a time.
+"""
+
+logger = get_logger("mail")
+
+DEFAULT_SMTP_HOST = "localhost"
+DEFAULT_SMTP_PORT = 25
+DEFAULT_SENDER = "appointment-genie@localhost"
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 30  # seconds, doubled after every failed attempt
+DEFAULT_MAX_RETRY_DELAY = 60 * 60  # seconds
+DEFAULT_POLL_INTERVAL = 5  # seconds
+DEFAULT_TIMEOUT = 10  # seconds
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+INSERT_MESSAGE = "INSERT OR IGNORE INTO outbox(dedupe_key, recipient, " + \
+    "subject, body, next_attempt) VALUES (?, ?, ?, ?, ?)"
+
+SELECT_DUE = "SELECT id, recipient, subject, body, attempts FROM outbox " + \
+    "WHERE status = 'pending' AND next_attempt <= ? " + \
+    "ORDER BY next_attempt, id LIMIT ?"
+
+MARK_SENT = "UPDATE outbox SET status = 'sent', attempts = attempts + 1, " + \
+    "last_error = NULL WHERE id = ?"
+
+MARK_ATTEMPT = "UPDATE outbox SET status = ?, attempts = ?, " + \
+    "next_attempt = ?, last_error = ? WHERE id = ?"
+
+COUNT_BY_STATUS = "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+
+
+def confirmation_key(booking):
+    """
+        Returns the dedupe key of the confirmation of 'booking', made from
+        its row id. Raises ValueError if the booking hasn't been saved.
+    """
+    if booking.id is None:
+        raise ValueError(
+                "the booking must be saved before its confirmation is sent.")
+    return f"confirm:booking-{booking.id}"
+
+
+def confirmation_message(user_name, booking, contact_name):
+    """
+        Returns the (subject, body) of the confirmation email of 'booking'.
+    """
+    start = booking.start
+    subject = f"Booking confirmation: {booking.title}"
+    body = (f"Hello {contact_name},\n\n"
+            f"{user_name} has booked '{booking.title}' with you on "
+            f"{start:%Y-%m-%d} at {start:%H:%M} for {booking.duration} "
+            f"minutes.\n\n{booking.description}\n")
+    return subject, body
+
+
+def retry_delay(attempts, base=DEFAULT_RETRY_DELAY,
+                cap=DEFAULT_MAX_RETRY_DELAY):
+    """
+        Returns the seconds to wait after the 'attempts'th failed attempt.
+    """
+    return min(cap, base * 2 ** max(attempts - 1, 0))
+
+
+def is_permanent(error):
+    """
+        Returns True if the SMTP server refused the email for good, so
+        sending it again won't help.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class Outbox:
+    """
+    This class reads and writes the outbox table through 'pool', the pool of
+    src/db/db.py unless given.
+    """
+
+    def __init__(self, pool=None, clock=time.time):
+        self.pool = pool
+        self.clock = clock
+
+    def _cursor(self):
+        return (self.pool or db.get_pool()).cursor()
+
+    def add(self, messages):
+        """
+            Stores (dedupe_key, recipient, subject, body) messages in one
+            transaction, a message whose key is already in the outbox is
+            skipped. Returns the number of messages stored.
+        """
+        now = self.clock()
+        rows = [(key, recipient, subject, body, now)
+                for key, recipient, subject, body in messages]
+        if not rows:
+            return 0
+        with self._cursor() as cursor:
+            cursor.executemany(INSERT_MESSAGE, rows)
+            return cursor.rowcount
+
+    def due(self, limit):
+        """
+            Returns up to 'limit' (id, recipient, subject, body, attempts)
+            rows that are waiting to be sent, oldest first.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_DUE, (self.clock(), limit))
+            return cursor.fetchall()
+
+    def mark_sent(self, message_ids):
+        with self._cursor() as cursor:
+            cursor.executemany(MARK_SENT, [(i,) for i in message_ids])
+
+    def mark_attempt(self, message_id, status, attempts, next_attempt, error):
+        with self._cursor() as cursor:
+            cursor.execute(MARK_ATTEMPT, (status, attempts, next_attempt,
+                                          error, message_id))
+
+    def counts(self):
+        """
+            Returns a dict of the number of messages in each status.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(COUNT_BY_STATUS)
+            counts = {PENDING: 0, SENT: 0, FAILED: 0}
+            counts.update(cursor.fetchall())
+            return counts
+
+
+class MailWorker:
+    """
+    This class sends the emails of 'outbox' from a background thread.
+    'request_confirmation' and 'enqueue' can be called from any thread, they
+    store the email and wake the thread. 'start' and 'stop' control the
+    thread and 'run_once' does one round of work in the calling thread.
+    'smtp_factory' is called with (host, port, timeout=...) to open a
+    connection, smtplib.SMTP unless given.
+    """
+
+    def __init__(self, outbox=None, host=DEFAULT_SMTP_HOST,
+                 port=DEFAULT_SMTP_PORT, sender=DEFAULT_SENDER,
+                 batch_size=DEFAULT_BATCH_SIZE,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 retry_delay=DEFAULT_RETRY_DELAY,
+                 max_retry_delay=DEFAULT_MAX_RETRY_DELAY,
+                 poll_interval=DEFAULT_POLL_INTERVAL,
+                 timeout=DEFAULT_TIMEOUT, smtp_factory=smtplib.SMTP):
+        validate_string_property(host, 'host')
+        validate_int_property(port, 'port')
+        validate_string_property(sender, 'sender')
+        for name, value in (("batch_size", batch_size),
+                            ("max_attempts", max_attempts)):
+            validate_int_property(value, name)
+            if value < 1:
+                raise ValueError(f"'{name}' must be greater than 0.")
+        self.outbox = outbox if outbox is not None else Outbox()
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._smtp = None
+        self.connections = 0
+        # failed connection attempts in a row, and when to try again
+        self._connect_failures = 0
+        self._connect_retry_at = 0
+
+    # called by the application, never waits on the mail server
+    def enqueue(self, dedupe_key, recipient, subject, body):
+        """
+            Stores an email in the outbox and wakes the worker.
+            Returns True if it was stored, False if its key was already in
+            the outbox.
+        """
+        stored = self.outbox.add([(dedupe_key, recipient, subject, body)])
+        self._wake.set()
+        return stored > 0
+
+    def request_confirmation(self, user_name, booking, contact_name,
+                             contact_email):
+        """
+            Queues the confirmation email of 'booking' to 'contact_email',
+            the booking must already be saved, see confirmation_key.
+            Returns its dedupe key.
+        """
+        key = confirmation_key(booking)
+        subject, body = confirmation_message(user_name, booking, contact_name)
+        self.enqueue(key, contact_email, subject, body)
+        log_event(logger, "confirmation_queued",
+                  "Confirmation to %s queued.", contact_email)
+        return key
+
+    # worker
+    def _connection(self):
+        if self._smtp is None:
+            self._smtp = self.smtp_factory(
+                    self.host, self.port, timeout=self.timeout)
+            self.connections += 1
+        return self._smtp
+
+    def close_connection(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except OSError:
+            smtp.close()
+
+    def _drop_connection(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            smtp.close()
+
+    def _message(self, recipient, subject, body):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+        return message
+
+    def _failed(self, row, error, counts):
+        message_id, recipient, _, _, attempts = row
+        attempts += 1
+        if is_permanent(error) or attempts >= self.max_attempts:
+            self.outbox.mark_attempt(
+                    message_id, FAILED, attempts, 0, str(error))
+            counts["failed"] += 1
+            log_event(logger, "mail_failed", "Email to %s failed: %s",
+                      recipient, error, attempts=attempts)
+            return
+        delay = retry_delay(attempts, self.retry_delay, self.max_retry_delay)
+        self.outbox.mark_attempt(message_id, PENDING, attempts,
+                                 self.outbox.clock() + delay, str(error))
+        counts["retried"] += 1
+        log_event(logger, "mail_retry", "Email to %s retried in %ds: %s",
+                  recipient, delay, error, attempts=attempts)
+
+    def _connect_failed(self, rows, error, counts):
+        # nothing was sent, so the emails keep their attempts and the whole
+        # batch waits for the next connection
+        self._connect_failures += 1
+        delay = retry_delay(self._connect_failures, self.retry_delay,
+                            self.max_retry_delay)
+        self._connect_retry_at = self.outbox.clock() + delay
+        counts["retried"] += len(rows)
+        log_event(logger, "mail_connect_failed",
+                  "Could not connect to %s:%d, retrying in %ds: %s",
+                  self.host, self.port, delay, error,
+                  failures=self._connect_failures)
+
+    def send_batch(self, rows):
+        """
+            Sends outbox rows over the current connection and records the
+            outcome of each. Returns a dict of the number sent, retried and
+            failed.
+        """
+        counts = {"sent": 0, "retried": 0, "failed": 0}
+        try:
+            self._connection()
+        except OSError as e:
+            # includes SMTPConnectError, a refusal from the server rather
+            # than from any one email
+            self._drop_connection()
+            self._connect_failed(rows, e, counts)
+            return counts
+        self._connect_failures = 0
+        sent = []
+        for index, row in enumerate(rows):
+            _, recipient, subject, body, _ = row
+            try:
+                self._connection().send_message(
+                        self._message(recipient, subject, body))
+            except OSError as e:
+                # SMTPException is an OSError too, anything but a reply to
+                # this one email means the connection is gone and the rest
+                # of the batch waits for the retry as well
+                if isinstance(e, smtplib.SMTPException) and not \
+                        isinstance(e, smtplib.SMTPServerDisconnected):
+                    self._failed(row, e, counts)
+                    continue
+                self._drop_connection()
+                for failed in rows[index:]:
+                    self._failed(failed, e, counts)
+                break
+            sent.append(row[0])
+        self.outbox.mark_sent(sent)
+        counts["sent"] = len(sent)
+        return counts
+
+    def run_once(self):
+        """
+            Sends one batch of due emails, unless a failed connection is
+            still being waited out.
+            Returns a dict of the number sent, retried and failed.
+        """
+        counts = {"sent": 0, "retried": 0, "failed": 0}
+        if self.outbox.clock() < self._connect_retry_at:
+            return counts
+        rows = self.outbox.due(self.batch_size)
+        if rows:
+            counts.update(self.send_batch(rows))
+            log_event(logger, "mail_batch", "Sent %d of %d emails.",
+                      counts["sent"], len(rows), **counts)
+        return counts
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                counts = self.run_once()
+            except Exception:
+                logger.exception("Mail worker round failed.")
+                counts = None
+            if counts and counts["sent"] + counts["retried"] + \
+                    counts["failed"] == self.batch_size:
+                # a full batch, there may be more due straight away
+                continue
+            self.close_connection()
+            self._wake.wait(self.poll_interval)
+        self.close_connection()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+                target=self._run, name="mail-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+            Stops the thread after its current round. Emails not sent yet
+            stay in the outbox and are sent after a restart.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+if __name__ == '__main__':
+    print("not intended to run in isolation")
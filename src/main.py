@@ -1,26 +1,66 @@
 # src/main.py
+import argparse
+import getpass
+import sys
 from src.controller.controller import Controller
+from src.user.authenticator import Authenticator
+from src.utils.validators import validate_email
 import src.db.db as db
+import src.db.repository as repository
 
+"""
+    Starts Appointment Genie on the login view:
+        python -m src.main
+    Accounts are created from the command line, the password is asked for
+    twice without being echoed:
+        python -m src.main --create-user USERNAME EMAIL
+"""
 
-def main():
-    db_name = "app_genie.db"
-    table_schema = """
-        users(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                password TEXT NOT NULL,
-                email TEXT NOT NULL UNIQUE
-                )"""
-    db.create_connection(_db_name=db_name)
-    db_query = db.create_table_query(table_schema)
-    db.create_table(db.cursor, db_query)
+
+def create_user(authenticator, username, email, ask=getpass.getpass):
+    """
+        Registers 'username' with a password read through 'ask'.
+        Returns 0, or 1 if the password is empty, the passwords don't match
+        or the account can't be created.
+    """
+    password = ask("Password: ")
+    if not password:
+        print("The password must not be empty.", file=sys.stderr)
+        return 1
+    if password != ask("Repeat password: "):
+        print("The passwords don't match.", file=sys.stderr)
+        return 1
+    try:
+        validate_email(email)
+        account_id = authenticator.register(username, password, email)
+    except (TypeError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Created user '{username}' with id {account_id}.")
+    return 0
+
+
+def main(argv=None, ask=getpass.getpass):
+    parser = argparse.ArgumentParser(description="Appointment Genie.")
+    parser.add_argument("--db", default="app_genie.db")
+    parser.add_argument("--create-user", nargs=2,
+                        metavar=("USERNAME", "EMAIL"))
+    args = parser.parse_args(argv)
+    db.create_connection(_db_name=args.db)
+    repository.create_tables(db.cursor)
+    authenticator = Authenticator(db.get_pool())
+    if args.create_user is not None:
+        try:
+            return create_user(authenticator, *args.create_user, ask=ask)
+        finally:
+            db.close()
     db.show_tables()
     print("Welcome To Appointment Genie!")
-    controller = Controller()
+    controller = Controller(authenticator=authenticator)
     view = controller.handle_login_view(title="App Genie: Login")
-    view.tk.mainloop()
+    view.window_manager.mainloop()
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# src/service/headless.py
+import argparse
+import itertools
+import json
+import sys
+from src.booking.booking import DEFAULT_DURATION
+from src.booking.recurrence import RecurrenceRule
+from src.controller.controller import Controller
+from src.db.repository import date_to_text, time_to_text, text_to_date, \
+        text_to_time
+
+"""
+    This module drives the Controller from a stream of JSON commands, one per
+    line, without importing any GUI module, so it can run on a server with no
+    display:
+        python -m src.service.headless < commands.jsonl > results.jsonl
+
+    Each command is an object with an "op" and its arguments, plus an
+    optional "id" that is copied to the response:
+        {"op": "login", "username": "user", "password": "password"}
+        {"op": "add_contact", "name": "Jane", "email": "jane@email.com"}
+        {"op": "create_booking", "title": "Catch up", "date": "2024-05-01",
+         "time": "09:30", "contact_name": "Jane",
+         "contact_email": "jane@email.com", "description": "Coffee",
+         "duration": 30, "recurrence": "FREQ=WEEKLY;COUNT=10"}
+        {"op": "list_bookings", "date": "2024-05-01"}
+    Each response is {"id": ..., "ok": true, "result": ...} or
+    {"id": ..., "ok": false, "error": "..."}.
+    Commands are read and answered in batches, with one write per batch.
+"""
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def contact_to_dict(contact):
+    return {"id": str(contact.id), "name": contact.name,
+            "email": contact.email}
+
+
+def booking_to_dict(booking):
+    result = {"title": booking.title, "date": date_to_text(booking.date),
+              "time": time_to_text(booking.time), "contact": booking.contact,
+              "description": booking.description,
+              "duration": booking.duration}
+    if booking.recurrence is not None:
+        result["recurrence"] = booking.recurrence.to_text()
+    return result
+
+
+class HeadlessService:
+    """
+    This class maps JSON commands onto Controller methods.
+    'handle' answers a single command, 'run' answers a stream of them.
+    """
+
+    def __init__(self, controller=None, batch_size=DEFAULT_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValueError("'batch_size' must be greater than 0.")
+        self.controller = controller or Controller()
+        self.batch_size = batch_size
+        self.operations = {
+                "login": self.login,
+                "add_contact": self.add_contact,
+                "create_booking": self.create_booking,
+                "list_bookings": self.list_bookings,
+                }
+
+    # operations, each takes the command dict and returns a JSON value
+    def login(self, command):
+        return self.controller.handle_login(
+                command["username"], command["password"])
+
+    def add_contact(self, command):
+        return contact_to_dict(self.controller.add_contact(
+                command["name"], command["email"]))
+
+    def create_booking(self, command):
+        recurrence = command.get("recurrence")
+        if recurrence is not None:
+            recurrence = RecurrenceRule.from_text(recurrence)
+        booking = self.controller.create_booking(
+                command["title"],
+                text_to_date(command["date"]),
+                text_to_time(command["time"]),
+                command["contact_name"],
+                command["contact_email"],
+                command.get("description", "Enter a description."),
+                duration=command.get("duration", DEFAULT_DURATION),
+                allow_conflicts=command.get("allow_conflicts", False),
+                recurrence=recurrence)
+        return booking_to_dict(booking)
+
+    def list_bookings(self, command):
+        on_date = command.get("date")
+        if on_date is not None:
+            on_date = text_to_date(on_date)
+        return [booking_to_dict(booking)
+                for booking in self.controller.list_bookings(on_date)]
+
+    def handle(self, command):
+        """
+            Returns the response dict for one decoded command. Errors are
+            reported in the response instead of being raised.
+        """
+        if not isinstance(command, dict):
+            return {"id": None, "ok": False,
+                    "error": "command must be a JSON object"}
+        response = {"id": command.get("id")}
+        operation = self.operations.get(command.get("op"))
+        if operation is None:
+            response.update(
+                    ok=False, error=f"unknown op {command.get('op')!r}")
+            return response
+        try:
+            response.update(ok=True, result=operation(command))
+        except KeyError as e:
+            response.update(ok=False, error=f"missing argument {e}")
+        except Exception as e:
+            # e.g. a bad value or a field of the wrong type deep in the
+            # controller, one bad command mustn't end the stream
+            response.update(ok=False, error=f"{type(e).__name__}: {e}")
+        return response
+
+    def handle_line(self, line):
+        try:
+            command = json.loads(line)
+        except ValueError as e:
+            return {"id": None, "ok": False, "error": f"invalid JSON: {e}"}
+        return self.handle(command)
+
+    def run(self, lines, output):
+        """
+            Reads commands from the iterable 'lines' in batches and writes a
+            response line to 'output' for each one, blank lines are skipped.
+            Returns a dict with the number of commands and failures.
+        """
+        counts = {"commands": 0, "failed": 0}
+        lines = (line for line in lines if line.strip())
+        while True:
+            batch = list(itertools.islice(lines, self.batch_size))
+            if not batch:
+                break
+            responses = [self.handle_line(line) for line in batch]
+            counts["commands"] += len(responses)
+            counts["failed"] += sum(
+                    1 for response in responses if not response["ok"])
+            output.write("".join(
+                json.dumps(response) + "\n" for response in responses))
+            output.flush()
+        return counts
+
+
+def main(argv=None, stdin=None, stdout=None):
+    parser = argparse.ArgumentParser(
+            description="Run Controller commands from JSON lines on stdin.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    service = HeadlessService(batch_size=args.batch_size)
+    counts = service.run(stdin or sys.stdin, stdout or sys.stdout)
+    print(f"{counts['commands']} commands, {counts['failed']} failed",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
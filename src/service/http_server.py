@@ -0,0 +1,380 @@
+# src/service/http_server.py
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+import src.db.db as db
+import src.db.repository as repository
+from src.controller.controller import Controller
+from src.mail.outbox import MailWorker, DEFAULT_SMTP_PORT
+from src.service.headless import HeadlessService
+from src.user.authenticator import Authenticator, LoginRateLimited
+from src.user.session import SessionRegistry
+from src.utils.log import get_logger
+
+"""
+    This module serves the Controller over HTTP with asyncio streams from the
+    standard library, so other systems can create contacts and bookings:
+        python -m src.service.http_server --port 8080
+
+        POST /login      {"username": ..., "password": ...}
+        POST /contacts   {"name": ..., "email": ...}
+        POST /bookings   {"title": ..., "date": "YYYY-MM-DD",
+                          "time": "HH:MM", "contact_name": ...,
+                          "contact_email": ..., "description": ...,
+                          "duration": 30}
+        GET  /bookings   optional ?date=YYYY-MM-DD
+
+    Request bodies and responses are the commands and responses of
+    src.service.headless, a failed command is answered with status 400.
+    With an Authenticator, POST /login checks the users table and answers
+    {"session": token}, the other routes then need an
+    'Authorization: Bearer <token>' header and work on that session's user.
+    The contacts and bookings a session creates are saved to the users'
+    database straight away. Without an Authenticator they are only kept in
+    memory.
+    An unexpected error in a command is answered with status 500.
+    Connections are kept alive unless the client sends 'Connection: close'.
+    The event loop only parses and writes, every command runs in a thread
+    pool so password hashing doesn't stall other connections.
+    With --smtp-host, new bookings queue a confirmation email that a
+    background MailWorker sends, see src.mail.outbox.
+"""
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BODY_SIZE = 64 * 1024
+
+# (method, path): headless op
+ROUTES = {
+        ("POST", "/login"): "login",
+        ("POST", "/contacts"): "add_contact",
+        ("POST", "/bookings"): "create_booking",
+        ("GET", "/bookings"): "list_bookings",
+        }
+
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized",
+           404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 429: "Too Many Requests",
+           500: "Internal Server Error"}
+
+logger = get_logger("http_server")
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class HTTPServer:
+    """
+    This class answers HTTP requests by running the matching headless command
+    in 'executor'.
+    Without an 'authenticator' every request works on 'controller'. Login
+    only reads and hashes, so logins run side by side. Commands that change
+    the user's contacts or bookings take a lock, the Controller and User
+    objects aren't safe to change from several threads at once.
+    With an 'authenticator' each login opens a session in 'sessions' and
+    requests only lock their own session.
+    Session controllers are given 'mailer', so their bookings queue a
+    confirmation email.
+    """
+
+    def __init__(self, controller=None, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 max_workers=4, authenticator=None, sessions=None,
+                 mailer=None):
+        if controller is None:
+            controller = Controller(mailer=mailer)
+        self.service = HeadlessService(controller)
+        self.mailer = mailer
+        self.authenticator = authenticator
+        if authenticator is not None and sessions is None:
+            sessions = SessionRegistry()
+        self.sessions = sessions
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def run_command(self, command):
+        if command.get("op") == "login":
+            return self.service.handle(command)
+        with self._lock:
+            return self.service.handle(command)
+
+    def route(self, method, target, body):
+        """
+            Returns the headless command for a request, raises HTTPError for
+            an unknown path or method or a body that isn't a JSON object.
+        """
+        url = urlsplit(target)
+        op = ROUTES.get((method, url.path))
+        if op is None:
+            if any(path == url.path for _, path in ROUTES):
+                raise HTTPError(405, f"{method} not allowed on {url.path}")
+            raise HTTPError(404, f"no route for {url.path}")
+        command = dict(parse_qsl(url.query))
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError as e:
+                raise HTTPError(400, f"invalid JSON: {e}")
+            if not isinstance(data, dict):
+                raise HTTPError(400, "body must be a JSON object")
+            command.update(data)
+        command["op"] = op
+        return command
+
+    def login(self, command):
+        """
+            Returns (status, response) for a login checked by the
+            authenticator, a successful one opens a session.
+        """
+        response = {"id": command.get("id")}
+        try:
+            user = self.authenticator.authenticate(
+                    command["username"], command["password"])
+        except KeyError as e:
+            response.update(ok=False, error=f"missing argument {e}")
+            return 400, response
+        except LoginRateLimited as e:
+            response.update(ok=False, error=str(e),
+                            retry_after=round(e.retry_after))
+            return 429, response
+        if user is None:
+            response.update(ok=False, error="invalid username or password")
+            return 401, response
+        session = self.sessions.create(user)
+        response.update(ok=True, result={"session": session.id})
+        return 200, response
+
+    def _cursor(self):
+        return (self.authenticator.pool or db.get_pool()).cursor()
+
+    def run_session_command(self, session, command):
+        """
+            Runs a command on the session's user and saves the contacts and
+            bookings it created.
+        """
+        with session.lock:
+            user = session.user
+            contact_count = len(user.contacts)
+            booking_count = len(user.bookings)
+            service = HeadlessService(
+                    Controller(user=user, authenticator=self.authenticator,
+                               mailer=self.mailer))
+            response = service.handle(command)
+            if response["ok"]:
+                self.save(user, user.contacts[contact_count:],
+                          user.bookings[booking_count:])
+        return (200 if response["ok"] else 400), response
+
+    def save(self, user, contacts, bookings):
+        """
+            Saves new contacts and bookings of 'user'. Raises RuntimeError if
+            any of them weren't written, after taking the unsaved ones back
+            out of 'user' so the session matches the database.
+        """
+        # bookings with a confirmation were saved by the controller already
+        bookings = [booking for booking in bookings if booking.id is None]
+        if not contacts and not bookings:
+            return
+        with self._cursor() as cursor:
+            written = repository.save_contacts(cursor, user.id, contacts)
+            if written != len(contacts):
+                self.discard(user, contacts, bookings)
+                raise RuntimeError(f"saved {written} of {len(contacts)} "
+                                   "contacts.")
+            written = repository.save_bookings(cursor, user.id, bookings)
+            if written != len(bookings):
+                self.discard(user, [], bookings)
+                raise RuntimeError(f"saved {written} of {len(bookings)} "
+                                   "bookings.")
+
+    def discard(self, user, contacts, bookings):
+        for contact in contacts:
+            user.remove_contact(contact)
+        for booking in bookings:
+            # save_bookings resets the id of every booking it didn't write
+            if booking.id is None:
+                user.remove_booking(booking)
+
+    def find_session(self, headers):
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token.strip():
+            raise HTTPError(401, "missing 'Authorization: Bearer' header")
+        session = self.sessions.get(token.strip())
+        if session is None:
+            raise HTTPError(401, "unknown or expired session")
+        return session
+
+    async def handle_request(self, method, target, body, headers=None):
+        """
+            Returns (status, response dict) for one request.
+        """
+        try:
+            return await self._handle_request(method, target, body, headers)
+        except Exception as e:
+            logger.exception("Request %s %s failed.", method, target)
+            return 500, {"id": None, "ok": False,
+                         "error": f"internal error: {type(e).__name__}"}
+
+    async def _handle_request(self, method, target, body, headers):
+        loop = asyncio.get_running_loop()
+        try:
+            command = self.route(method, target, body)
+            if self.authenticator is None:
+                response = await loop.run_in_executor(
+                        self.executor, self.run_command, command)
+                return (200 if response["ok"] else 400), response
+            if command["op"] == "login":
+                return await loop.run_in_executor(
+                        self.executor, self.login, command)
+            session = self.find_session(headers or {})
+        except HTTPError as e:
+            return e.status, {"id": None, "ok": False, "error": str(e)}
+        return await loop.run_in_executor(
+                self.executor, self.run_session_command, session, command)
+
+    async def read_request(self, reader):
+        """
+            Returns (method, target, headers, body) or None once the client
+            has closed the connection.
+        """
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def encode_response(status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                "\r\n")
+        return head.encode("latin-1") + body
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HTTPError as e:
+                    writer.write(self.encode_response(
+                        e.status, {"id": None, "ok": False, "error": str(e)},
+                        False))
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self.handle_request(
+                        method, target, body, headers)
+                writer.write(self.encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            logger.exception("Connection failed.")
+            writer.write(self.encode_response(
+                    500, {"id": None, "ok": False, "error": "internal error"},
+                    False))
+        finally:
+            writer.close()
+
+    async def start(self):
+        """
+            Starts listening, port 0 picks a free port which is then stored
+            in 'port'.
+        """
+        self._server = await asyncio.start_server(
+                self.handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.executor.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            description="Serve the Controller over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--db", default=None,
+                        help="log users in against this database")
+    parser.add_argument("--smtp-host", default=None,
+                        help="send booking confirmations through this "
+                        f"server, needs --db (port {DEFAULT_SMTP_PORT})")
+    parser.add_argument("--smtp-port", type=int, default=DEFAULT_SMTP_PORT)
+    args = parser.parse_args(argv)
+    if args.smtp_host and not args.db:
+        parser.error("--smtp-host needs --db for the outbox table")
+    authenticator = None
+    mailer = None
+    if args.db:
+        db.create_connection(_db_name=args.db)
+        repository.create_tables(db.cursor)
+        authenticator = Authenticator()
+    if args.smtp_host:
+        mailer = MailWorker(host=args.smtp_host,
+                            port=args.smtp_port)
+        mailer.start()
+    server = HTTPServer(host=args.host, port=args.port,
+                        max_workers=args.workers, authenticator=authenticator,
+                        mailer=mailer)
+    print(f"serving on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if mailer is not None:
+            mailer.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
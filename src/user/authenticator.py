@@ -0,0 +1,221 @@
+# src/user/authenticator.py
+import collections
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+import src.db.db as db
+import src.db.repository as repository
+from src.user.user import User
+from src.utils.auth import verify_and_check_rehash, verify_password, \
+        generate_pw_hash, default_password_hash, DEFAULT_PASSWORD
+from src.utils.validators import validate_int_property
+from src.utils.log import get_logger, log_event
+
+"""
+    This module checks logins against the users table.
+
+    A successful verification is remembered for 'cache_ttl' seconds, keyed by
+    (username, fingerprint of the stored hash), so logging in again within
+    that time skips the scrypt work. The password itself isn't kept, only an
+    HMAC of it under a key made when the Authenticator is created, and a
+    changed password hash changes the fingerprint so old entries stop
+    matching. Failed attempts are counted per username and a username with
+    too many recent failures is refused until the window has passed. At most
+    'max_tracked' usernames are counted, the ones failed longest ago are
+    dropped first, so guessing many usernames can't grow the table forever.
+"""
+
+logger = get_logger("authenticator")
+
+DEFAULT_CACHE_TTL = 60  # seconds
+DEFAULT_MAX_FAILURES = 5
+DEFAULT_FAILURE_WINDOW = 5 * 60  # seconds
+DEFAULT_MAX_TRACKED = 10000  # usernames with recent failures
+
+
+class LoginRateLimited(PermissionError):
+    """
+    Raised when a username has failed to log in too often, 'retry_after' is
+    the number of seconds until the next attempt is allowed.
+    """
+
+    def __init__(self, username, retry_after):
+        super().__init__(
+                f"Too many failed logins for '{username}', "
+                f"try again in {retry_after:.0f} seconds.")
+        self.username = username
+        self.retry_after = retry_after
+
+
+def hash_fingerprint(pw_hash):
+    return hashlib.sha256(pw_hash.encode()).hexdigest()
+
+
+class Authenticator:
+    """
+    This class logs users in against the users table through 'pool', the
+    pool of src/db/db.py unless given.
+    'authenticate' returns a User loaded with its contacts and bookings, or
+    None, and raises LoginRateLimited while a username is locked out.
+    A matching hash made with an older cost profile is rehashed and saved.
+    """
+
+    def __init__(self, pool=None, cache_ttl=DEFAULT_CACHE_TTL,
+                 max_failures=DEFAULT_MAX_FAILURES,
+                 failure_window=DEFAULT_FAILURE_WINDOW,
+                 max_tracked=DEFAULT_MAX_TRACKED, clock=time.monotonic):
+        validate_int_property(cache_ttl, 'cache_ttl')
+        validate_int_property(max_failures, 'max_failures')
+        validate_int_property(failure_window, 'failure_window')
+        validate_int_property(max_tracked, 'max_tracked')
+        if max_tracked < 1:
+            raise ValueError("'max_tracked' must be greater than 0.")
+        self.pool = pool
+        self.cache_ttl = cache_ttl
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+        self.max_tracked = max_tracked
+        self.clock = clock
+        self._key = secrets.token_bytes(32)
+        # (username, hash fingerprint): (password digest, expires)
+        self._verified = {}
+        # username: deque of failure times, oldest first, the username
+        # that failed longest ago first
+        self._failures = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cursor(self):
+        return (self.pool or db.get_pool()).cursor()
+
+    def _digest(self, password):
+        return hmac.new(self._key, password.encode(), hashlib.sha256).digest()
+
+    # verified credential cache
+    def _cached(self, username, pw_hash, password, now):
+        key = (username, hash_fingerprint(pw_hash))
+        with self._lock:
+            entry = self._verified.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._verified[key]
+                entry = None
+        if entry is None:
+            self.cache_misses += 1
+            return False
+        if hmac.compare_digest(entry[0], self._digest(password)):
+            self.cache_hits += 1
+            return True
+        self.cache_misses += 1
+        return False
+
+    def _remember(self, username, pw_hash, password, now):
+        key = (username, hash_fingerprint(pw_hash))
+        with self._lock:
+            self._verified[key] = (
+                    self._digest(password), now + self.cache_ttl)
+
+    def forget(self, username):
+        """
+            Drops the cached verifications of 'username', e.g. when its
+            password is changed or the user logs out everywhere.
+        """
+        with self._lock:
+            for key in [key for key in self._verified if key[0] == username]:
+                del self._verified[key]
+
+    # rate limiting
+    def _check_rate_limit(self, username, now):
+        with self._lock:
+            failures = self._failures.get(username)
+            if not failures:
+                return
+            while failures and failures[0] <= now - self.failure_window:
+                failures.popleft()
+            if not failures:
+                del self._failures[username]
+                return
+            if len(failures) >= self.max_failures:
+                retry_after = failures[0] + self.failure_window - now
+                raise LoginRateLimited(username, retry_after)
+
+    def _record_failure(self, username, now):
+        with self._lock:
+            self._failures.setdefault(
+                    username, collections.deque()).append(now)
+            self._failures.move_to_end(username)
+            self._evict_failures(now)
+
+    def _evict_failures(self, now):
+        # the first entry failed longest ago, stop at the first one that
+        # still counts, unless there are too many
+        failures = self._failures
+        while failures:
+            username, times = next(iter(failures.items()))
+            if times[-1] > now - self.failure_window and \
+                    len(failures) <= self.max_tracked:
+                break
+            del failures[username]
+
+    def _clear_failures(self, username):
+        with self._lock:
+            self._failures.pop(username, None)
+
+    def authenticate(self, username, password):
+        now = self.clock()
+        self._check_rate_limit(username, now)
+        with self._cursor() as cursor:
+            row = repository.find_account(cursor, username)
+        if row is None:
+            # same scrypt work as a real check, so unknown usernames can't be
+            # told apart by how long the answer takes
+            verify_password(default_password_hash(), DEFAULT_PASSWORD)
+            self._record_failure(username, now)
+            log_event(logger, "login", "Unknown user '%s'.", username,
+                      success=False)
+            return None
+        user_id, _, pw_hash, email = row
+        if self._cached(username, pw_hash, password, now):
+            matches, rehash = True, False
+        else:
+            matches, rehash = verify_and_check_rehash(pw_hash, password)
+        if not matches:
+            self._record_failure(username, now)
+            log_event(logger, "login", "Wrong password for '%s'.", username,
+                      success=False)
+            return None
+        if rehash:
+            pw_hash = generate_pw_hash(password)
+            with self._cursor() as cursor:
+                repository.update_password(cursor, user_id, pw_hash)
+            self.forget(username)
+            log_event(logger, "password_rehashed",
+                      "Password of '%s' rehashed.", username)
+        self._remember(username, pw_hash, password, now)
+        self._clear_failures(username)
+        log_event(logger, "login", "'%s' logged in.", username, success=True)
+        return self.load_user(user_id, username, email, pw_hash)
+
+    def load_user(self, user_id, username, email, pw_hash):
+        user = User(username, email)
+        user.password = pw_hash
+        user.id = user_id
+        with self._cursor() as cursor:
+            repository.load_user(cursor, user_id, user)
+        return user
+
+    def register(self, username, password, email):
+        """
+            Creates an account with a freshly hashed password.
+            Returns the new account id.
+        """
+        pw_hash = generate_pw_hash(password)
+        with self._cursor() as cursor:
+            return repository.create_account(
+                    cursor, username, pw_hash, email)
+
+
+if __name__ == '__main__':
+    print("not intended to run in isolation")
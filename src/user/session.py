@@ -0,0 +1,149 @@
+# src/user/session.py
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from src.user.user import User
+from src.utils.validators import validate_int_property, \
+        validate_string_property
+from src.utils.log import get_logger, log_event
+
+"""
+    This module keeps a User per session, so one process can serve many
+    signed in users at once instead of sharing User.get_instance().
+"""
+
+logger = get_logger("session")
+
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_IDLE_TIMEOUT = 30 * 60  # seconds
+
+
+class Session:
+    """
+    This class is one signed in user. 'lock' is held while a request works
+    on 'user', so two requests of the same session don't change its
+    contacts or bookings at the same time, while other sessions carry on.
+    """
+    __slots__ = ('id', 'user', 'lock', 'created', 'last_used')
+
+    def __init__(self, session_id, user, now):
+        self.id = session_id
+        self.user = user
+        self.lock = threading.RLock()
+        self.created = now
+        self.last_used = now
+
+    def __repr__(self):
+        return (f"Session(id='{self.id[:8]}...', "
+                f"user='{self.user.user_name}')")
+
+
+class SessionRegistry:
+    """
+    This class maps session ids to Session objects.
+    A session that hasn't been used for 'idle_timeout' seconds is removed
+    the next time it is looked up or the registry is full. Once
+    'max_sessions' are open, creating another session first removes the idle
+    ones and then the least recently used one.
+    All methods are safe to call from several threads.
+    """
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, clock=time.monotonic):
+        validate_int_property(max_sessions, 'max_sessions')
+        if max_sessions < 1:
+            raise ValueError("'max_sessions' must be greater than 0.")
+        if not isinstance(idle_timeout, (int, float)) or \
+                isinstance(idle_timeout, bool):
+            raise TypeError("'idle_timeout' must be a number of seconds.")
+        if idle_timeout <= 0:
+            raise ValueError("'idle_timeout' must be greater than 0.")
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        # least recently used first
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, user):
+        """
+            Opens a session for 'user' and returns it, its 'id' is the token
+            handed to the client.
+        """
+        if not isinstance(user, User):
+            raise TypeError("'user' must be of type 'User'")
+        now = self.clock()
+        session = Session(secrets.token_urlsafe(32), user, now)
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                self._evict_idle(now)
+            while len(self._sessions) >= self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                log_event(logger, "session_evicted",
+                          "Session limit reached, closed %r", evicted,
+                          reason="limit")
+            self._sessions[session.id] = session
+        log_event(logger, "session_created", "Session created. %r", session)
+        return session
+
+    def get(self, session_id):
+        """
+            Returns the session for 'session_id' and marks it as used, or
+            None if there is no such session or it has been idle too long.
+        """
+        validate_string_property(session_id, 'session_id')
+        now = self.clock()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if now - session.last_used > self.idle_timeout:
+                del self._sessions[session_id]
+                log_event(logger, "session_evicted",
+                          "Session expired, closed %r", session,
+                          reason="idle")
+                return None
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def remove(self, session_id):
+        """
+            Closes a session, returns True if it was open.
+        """
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict_idle(self, now):
+        # the dict is in last used order, so stop at the first fresh session
+        expired = []
+        for session_id, session in self._sessions.items():
+            if now - session.last_used <= self.idle_timeout:
+                break
+            expired.append(session_id)
+        for session_id in expired:
+            del self._sessions[session_id]
+        return len(expired)
+
+    def evict_idle(self):
+        """
+            Removes every session idle for longer than 'idle_timeout'.
+            Returns the number of sessions removed.
+        """
+        with self._lock:
+            count = self._evict_idle(self.clock())
+        if count:
+            log_event(logger, "session_evicted", "Closed %d idle sessions",
+                      count, reason="idle", count=count)
+        return count
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+
+if __name__ == '__main__':
+    print("not intended to run in isolation")
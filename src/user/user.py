@@ -1,9 +1,16 @@
 # src/user/user.py
 from src.utils.validators import validate_string_property, \
         validate_string_dict_property, validate_email
-from src.utils.auth import verify_password, generate_pw_hash
+from src.utils.auth import generate_pw_hash, default_password_hash, \
+        verify_and_check_rehash
 from src.contact.contact import Contact
-from src.booking.booking import Booking
+from src.contact.contact_index import ContactIndex
+from src.booking.booking import Booking, DEFAULT_DURATION, \
+        confirmation_deadline
+from src.booking.booking_calendar import BookingCalendar
+from src.utils.log import get_logger, log_event
+
+logger = get_logger("user")
 
 
 class User:
@@ -12,15 +19,16 @@ class User:
         user_name : str,
         password : str (stored as a password hash),
         email : str,
-        contacts : list of Contact objects.
+        contacts : list of Contact objects, indexed by email and name in
+                   'contact_index'.
+        bookings : list of Booking objects, indexed by start time in
+                   'calendar'.
+    Every User() is a separate user, 'get_instance' returns the one shared
+    user of the desktop application. A server keeps a User per session, see
+    src/user/session.py.
     """
     __instance = None
 
-    def __new__(cls, *args, **kwargs):
-        if not cls.__instance:
-            cls.__instance = super(User, cls).__new__(cls, *args, **kwargs)
-        return cls.__instance
-
     def __init__(self, user_name=None, email=None, password=None):
         if user_name is None:
             self.user_name = "new_user"
@@ -35,14 +43,35 @@ class User:
             self.email = email
 
         if password is None:
-            self.password = generate_pw_hash("password")
+            # Hashed on first use, see the 'password' property
+            self.password = None
         else:
             validate_string_property(password, 'password')
             self.password = generate_pw_hash(password)
 
+        self._reset_contacts()
+        self._reset_bookings()
+
+    @property
+    def password(self):
+        if self._password is None:
+            self._password = default_password_hash()
+        return self._password
+
+    @password.setter
+    def password(self, value):
+        self._password = value
+
+    def _reset_contacts(self):
+        index = getattr(self, 'contact_index', None)
+        if index is not None:
+            index.clear()
         self.contacts = []
+        self.contact_index = ContactIndex()
+
+    def _reset_bookings(self):
         self.bookings = []
-        self._initialized = True  # Avoids re-initializing
+        self.calendar = BookingCalendar()
 
     def get_contacts(self):
         return self.contacts
@@ -54,10 +83,52 @@ class User:
             raise TypeError("'contact' must be a of type 'Contact'")
         else:
             self.contacts.append(value)
+            self.contact_index.add(value)
+
+    def add_booking(self, value):
+        if value is None:
+            raise ValueError("booking must not be None.")
+        if not isinstance(value, Booking):
+            raise TypeError("'booking' must be of type 'Booking'")
+        else:
+            self.bookings.append(value)
+            self.calendar.add(value)
+
+    def remove_contact(self, value):
+        """
+            Takes 'value' out of the contact list and its index.
+            Raises ValueError if it isn't in the list.
+        """
+        self.contacts.remove(value)
+        self.contact_index.remove(value)
+
+    def remove_booking(self, value):
+        """
+            Takes 'value' out of the bookings and the calendar.
+            Raises ValueError if it isn't in the bookings.
+        """
+        self.bookings.remove(value)
+        self.calendar.remove(value)
+
+    def find_contact(self, name, email):
+        """
+            Returns the contact matching 'name' and 'email' (ignoring case and
+            surrounding whitespace) or None.
+        """
+        return self.contact_index.find(name, email)
 
     def authenticate(self, username, password):
-        return self.user_name == username and verify_password(
-                self.password, password)
+        """
+            Returns True if 'username' and 'password' match this user.
+            A matching password hashed with an older cost profile is rehashed
+            with the current one.
+        """
+        if self.user_name != username:
+            return False
+        matches, rehash = verify_and_check_rehash(self.password, password)
+        if rehash:
+            self.password = generate_pw_hash(password)
+        return matches
 
     def create_booking(
             self,
@@ -66,40 +137,70 @@ class User:
             time,
             contact_name,
             contact_email,
-            desc):
+            desc,
+            duration=DEFAULT_DURATION,
+            allow_conflicts=False,
+            recurrence=None):
+        """
+            Creates a booking with a contact, adding the contact to the
+            contact list if they aren't in it yet. The booking is pending
+            until the contact answers or it expires, see
+            confirmation_deadline. With a RecurrenceRule in 'recurrence'
+            the booking repeats.
+            Raises a ValueError if the booking, or any of its dates, overlaps
+            an existing booking, unless 'allow_conflicts' is True.
+            Nothing is added if the contact's name or email is invalid.
+            Returns the new Booking.
+        """
+        validate_string_property(contact_name, 'contact_name')
+        validate_email(contact_email)
         booking = Booking()
         booking.title = title
         booking.date = date
         booking.time = time
         booking.contact = contact_name
         booking.description = desc
-        self.bookings.append(booking)
-        contact_found = False
-
-        from src.contact.contact import Contact
-        for item in self.contacts:
-            if contact_name in item.name:
-                if contact_email in item.email:
-                    contact_found = True
-        if not contact_found:
-            print(f"{contact_name} not found in contact list. " +
-                  "Adding them to your contacts.")
+        booking.duration = duration
+        booking.recurrence = recurrence
+        booking.expires_at = confirmation_deadline(booking.start)
+        conflicts = self.calendar.conflicts(booking)
+        if conflicts and not allow_conflicts:
+            raise ValueError(
+                    "booking overlaps existing bookings: " +
+                    ", ".join(repr(other) for other in conflicts))
+        self.add_booking(booking)
+        log_event(logger, "booking_created", "Booking created. %r", booking,
+                  conflicts=len(conflicts))
+        if self.find_contact(contact_name, contact_email) is None:
+            log_event(logger, "contact_added",
+                      "%s not found in contact list. " +
+                      "Adding them to your contacts.", contact_name)
             new_contact = Contact(contact_name, contact_email)
             self.add_contact(new_contact)
-        print(f"sending email to {contact_email}to confirm booking")
+        log_event(logger, "confirmation_requested",
+                  "sending email to %s to confirm booking", contact_email)
+        return booking
+
+    def get_conflicts(self, booking):
+        return self.calendar.conflicts(booking)
+
+    def get_free_slots(self, day, day_start=(9, 0), day_end=(17, 0),
+                       min_duration=30):
+        return self.calendar.free_slots(
+                day, day_start, day_end, min_duration)
 
     def reset(self):
         self.user_name = str()
         self.password = str()
         self.email = str()
-        self.contacts = []
-        self.bookings = []
+        self._reset_contacts()
+        self._reset_bookings()
 
     @classmethod
     def get_instance(cls):
         """
-            Gets the running instance of the User, or creates a new instance if
-            none exists.
+            Gets the shared User of the desktop application, or creates it
+            if none exists.
         """
         if cls.__instance is None:
             cls.__instance = cls()
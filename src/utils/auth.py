@@ -1,20 +1,107 @@
 # src/utils/auth/py
-from werkzeug.security import check_password_hash, generate_password_hash
-from src.utils.validators import validate_string_property
+import os
+import statistics
+import time
+from functools import lru_cache
+from src.utils.validators import validate_string_property, \
+        validate_int_property
 
 """
     This module will handle the generating and checking of password hashes.
+
+    Hashes are generated with a named cost profile. The active profile is
+    taken from 'set_hash_profile()', then the APPGENIE_HASH_PROFILE
+    environment variable, then DEFAULT_HASH_PROFILE.
+    Werkzeug stores the method and its parameters at the start of every hash
+    ('scrypt:32768:8:1$salt$hash'), so hashes made with another profile can
+    be spotted and rehashed on the next successful login.
 """
 
+DEFAULT_PASSWORD = "password"
+
+HASH_PROFILE_ENV = "APPGENIE_HASH_PROFILE"
+DEFAULT_HASH_PROFILE = "interactive"
+
+# scrypt:N:r:p, memory used is roughly 128 * N * r bytes.
+HASH_PROFILES = {
+        # Werkzeug's scrypt defaults, what every existing hash was made with.
+        "interactive": {"method": "scrypt:32768:8:1", "salt_length": 16},
+        # Cheaper, for creating many accounts at once.
+        "batch-import": {"method": "scrypt:16384:8:1", "salt_length": 16},
+        # Only for test suites, far too cheap for real passwords.
+        "test": {"method": "scrypt:1024:8:1", "salt_length": 16},
+        }
+
+# calibrate() never picks an N that needs more memory than this per hash
+DEFAULT_MAX_MEMORY = 64 * 1024 * 1024  # bytes
+
+_active_profile = None
+
+
+def _security():
+    # werkzeug's package __init__ imports its development server, so it is
+    # only imported once a hash is actually made or checked.
+    from werkzeug import security
+    return security
 
-def generate_pw_hash(password):
+
+def validate_hash_profile(profile):
+    validate_string_property(profile, 'profile')
+    if profile not in HASH_PROFILES:
+        raise ValueError(
+                f"Unknown hash profile '{profile}', expected one of: " +
+                ", ".join(HASH_PROFILES))
+
+
+def get_hash_profile():
+    return _active_profile or os.environ.get(
+            HASH_PROFILE_ENV, DEFAULT_HASH_PROFILE)
+
+
+def set_hash_profile(profile):
+    """
+        Selects the profile used for new hashes, None goes back to the
+        environment variable or the default.
     """
-        Generate a password hash using Werkzeug.
+    global _active_profile
+    if profile is not None:
+        validate_hash_profile(profile)
+    _active_profile = profile
+
+
+def register_hash_profile(profile, method, salt_length=16):
+    validate_string_property(profile, 'profile')
+    validate_string_property(method, 'method')
+    validate_int_property(salt_length, 'salt_length')
+    HASH_PROFILES[profile] = {"method": method, "salt_length": salt_length}
+
+
+def get_profile_settings(profile=None):
+    profile = profile or get_hash_profile()
+    validate_hash_profile(profile)
+    return HASH_PROFILES[profile]
+
+
+def generate_pw_hash_with(password, method, salt_length=16):
+    """
+        Generate a password hash with an explicit Werkzeug 'method' string.
         Returns the password hash as a string.
     """
     validate_string_property(password, 'password')
-    return generate_password_hash(
-            password=password, method="scrypt", salt_length=16)
+    return _security().generate_password_hash(
+            password=password, method=method, salt_length=salt_length)
+
+
+def generate_pw_hash(password, profile=None):
+    """
+        Generate a password hash using Werkzeug and the settings of
+        'profile', the active profile when it is None.
+        Returns the password hash as a string.
+    """
+    validate_string_property(password, 'password')
+    settings = get_profile_settings(profile)
+    return generate_pw_hash_with(
+            password, settings["method"], settings["salt_length"])
 
 
 def verify_password(pw_hash, password):
@@ -26,4 +113,119 @@ def verify_password(pw_hash, password):
     validate_string_property(pw_hash, 'pw_hash')
     # password validation
     validate_string_property(password, 'password')
-    return check_password_hash(pw_hash, password)
+    return _security().check_password_hash(pw_hash, password)
+
+
+def hash_method(pw_hash):
+    """
+        Returns the method prefix of a Werkzeug hash, e.g. 'scrypt:32768:8:1'.
+    """
+    validate_string_property(pw_hash, 'pw_hash')
+    return pw_hash.split("$", 1)[0]
+
+
+def scrypt_cost(method):
+    """
+        Returns the (N, r, p) of a 'scrypt:N:r:p' method, or None for any
+        other method.
+    """
+    name, *params = method.split(":")
+    if name != "scrypt" or len(params) != 3:
+        return None
+    try:
+        return tuple(int(param) for param in params)
+    except ValueError:
+        return None
+
+
+def needs_rehash(pw_hash, profile=None):
+    """
+        Returns True if 'pw_hash' is weaker than the method of 'profile': a
+        scrypt hash with a lower N, r or p and none higher, or a hash made
+        with another method when the profile uses scrypt.
+        A hash stronger than the profile is never flagged, so a cheap
+        profile such as 'test' or 'batch-import' doesn't downgrade it.
+    """
+    method = hash_method(pw_hash)
+    target = get_profile_settings(profile)["method"]
+    if method == target:
+        return False
+    current, wanted = scrypt_cost(method), scrypt_cost(target)
+    if wanted is None:
+        # only scrypt costs can be compared, and scrypt isn't downgraded
+        return current is None
+    if current is None:
+        return True
+    return all(have <= want for have, want in zip(current, wanted))
+
+
+def verify_and_check_rehash(pw_hash, password, profile=None):
+    """
+        Verify that the password and password hash match, and check if the
+        hash should be replaced by one made with the current profile.
+        Returns a (matches, needs_rehash) tuple of bools, needs_rehash is
+        only ever True when the password matched.
+    """
+    matches = verify_password(pw_hash, password)
+    return matches, matches and needs_rehash(pw_hash, profile)
+
+
+def calibrate(target_ms=250, r=8, p=1, min_n=2 ** 10, max_n=2 ** 20,
+              samples=3, profile="calibrated", max_memory=DEFAULT_MAX_MEMORY):
+    """
+        Times scrypt on this machine for N = min_n, 2 * min_n, ... max_n and
+        registers 'profile' with the largest N whose median hash time is
+        within 'target_ms' (min_n if even that is too slow).
+        N values needing more than 'max_memory' bytes (128 * N * r) are not
+        tried, with r = 8 max_n = 2 ** 20 would need 1 GiB per hash.
+        Returns a dict with the profile name, its method and the measured
+        median time in milliseconds.
+        Raises ValueError if min_n is greater than max_n or already needs
+        more than 'max_memory'.
+    """
+    validate_int_property(target_ms, 'target_ms')
+    validate_int_property(samples, 'samples')
+    for name, value in (("r", r), ("p", p), ("min_n", min_n),
+                        ("max_n", max_n), ("max_memory", max_memory)):
+        validate_int_property(value, name)
+    if min_n < 2 or min_n & (min_n - 1):
+        raise ValueError("'min_n' must be a power of 2 greater than 1.")
+    if min_n > max_n:
+        raise ValueError(
+                f"'min_n' ({min_n}) must not be greater than "
+                f"'max_n' ({max_n}).")
+    if 128 * min_n * r > max_memory:
+        raise ValueError(
+                f"'min_n' ({min_n}) needs {128 * min_n * r} bytes, more "
+                f"than 'max_memory' ({max_memory}).")
+    chosen = None
+    n = min_n
+    while n <= max_n and 128 * n * r <= max_memory:
+        method = f"scrypt:{n}:{r}:{p}"
+        timings = []
+        for _ in range(max(samples, 1)):
+            start = time.perf_counter()
+            generate_pw_hash_with("calibration-password", method)
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        if chosen is not None and median > target_ms:
+            break
+        chosen = {"profile": profile, "method": method, "ms": median}
+        if median > target_ms:
+            break
+        n *= 2
+    register_hash_profile(profile, chosen["method"])
+    return chosen
+
+
+@lru_cache(maxsize=None)
+def _default_password_hash(profile):
+    return generate_pw_hash(DEFAULT_PASSWORD, profile)
+
+
+def default_password_hash():
+    """
+        Returns the hash of DEFAULT_PASSWORD, it is only generated the first
+        time it is needed for the active profile and then reused.
+    """
+    return _default_password_hash(get_hash_profile())
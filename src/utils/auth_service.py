@@ -0,0 +1,74 @@
+# src/utils/auth_service.py
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from src.utils.auth import generate_pw_hash_with, verify_password, \
+        get_profile_settings
+from src.utils.validators import validate_string_property
+
+"""
+    This module runs password hashing and verification in a process pool, so
+    the scrypt work doesn't hold up the calling thread or event loop.
+"""
+
+
+class AuthService:
+    """
+    This class hands 'generate_pw_hash' and 'verify_password' calls to a
+    ProcessPoolExecutor that is only started on first use.
+    submit_hash/submit_verify return concurrent.futures.Future objects,
+    hash_password/verify_password are their asyncio coroutine versions.
+    Arguments are validated in the calling process, so bad values raise
+    straight away instead of from the future.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers)
+        return self._executor
+
+    # concurrent.futures API
+    def submit_hash(self, password, profile=None):
+        """
+            The profile settings are resolved here and passed to the worker,
+            so workers follow profile changes made after they started.
+        """
+        validate_string_property(password, 'password')
+        settings = get_profile_settings(profile)
+        return self.executor.submit(
+                generate_pw_hash_with, password, settings["method"],
+                settings["salt_length"])
+
+    def submit_verify(self, pw_hash, password):
+        validate_string_property(pw_hash, 'pw_hash')
+        validate_string_property(password, 'password')
+        return self.executor.submit(verify_password, pw_hash, password)
+
+    # asyncio API
+    async def hash_password(self, password, profile=None):
+        return await asyncio.wrap_future(self.submit_hash(password, profile))
+
+    async def verify_password(self, pw_hash, password):
+        return await asyncio.wrap_future(
+                self.submit_verify(pw_hash, password))
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
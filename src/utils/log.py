@@ -0,0 +1,92 @@
+# src/utils/log.py
+import logging
+from logging.handlers import MemoryHandler
+
+"""
+    This module is the logging and event hook layer used by the model classes
+    instead of printing to stdout.
+    Everything is logged at DEBUG level under the 'appointment_genie' logger,
+    which only has a NullHandler, so nothing is formatted or written unless a
+    sink or hook is installed.
+    Messages use %-style arguments, they are only formatted when a handler
+    actually emits the record.
+"""
+
+ROOT_LOGGER_NAME = "appointment_genie"
+
+root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+root_logger.addHandler(logging.NullHandler())
+
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def log_event(logger, event, message, *args, level=logging.DEBUG, **fields):
+    """
+        Logs 'message' % 'args' as the named 'event'. The event name and the
+        keyword 'fields' are attached to the record as 'record.event' and
+        'record.fields' for structured sinks and hooks.
+        Returns straight away when 'level' is not enabled.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args,
+                   extra={"event": event, "fields": fields})
+
+
+class _HookHandler(logging.Handler):
+    def __init__(self, hook, level):
+        super().__init__(level)
+        self.hook = hook
+
+    def emit(self, record):
+        try:
+            self.hook(getattr(record, "event", None),
+                      getattr(record, "fields", {}), record)
+        except Exception:
+            self.handleError(record)
+
+
+def _enable(level):
+    if root_logger.level == logging.NOTSET or root_logger.level > level:
+        root_logger.setLevel(level)
+
+
+def add_event_hook(hook, level=logging.DEBUG):
+    """
+        Calls hook(event, fields, record) for every record logged at 'level'
+        or above. Returns the handler, pass it to 'remove_sink' to unhook.
+    """
+    handler = _HookHandler(hook, level)
+    root_logger.addHandler(handler)
+    _enable(level)
+    return handler
+
+
+def install_buffered_sink(target, capacity=1000, level=logging.DEBUG,
+                          flush_level=logging.ERROR):
+    """
+        Buffers records in memory and hands them to the 'target' handler in
+        batches of 'capacity' records, or as soon as a record at
+        'flush_level' or above arrives.
+        Returns the buffering handler, pass it to 'remove_sink' to flush and
+        remove it.
+    """
+    handler = MemoryHandler(
+            capacity, flushLevel=flush_level, target=target,
+            flushOnClose=True)
+    handler.setLevel(level)
+    root_logger.addHandler(handler)
+    _enable(level)
+    return handler
+
+
+def remove_sink(handler):
+    """
+        Flushes and removes a sink or hook, logging is switched back off when
+        no handlers other than the NullHandler are left.
+    """
+    root_logger.removeHandler(handler)
+    handler.close()
+    if all(isinstance(h, logging.NullHandler) for h in root_logger.handlers):
+        root_logger.setLevel(logging.NOTSET)
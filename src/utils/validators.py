@@ -1,4 +1,5 @@
 # src/utils/validators.py
+import re
 from datetime import datetime
 
 
@@ -133,12 +134,23 @@ def validate_int_property(value: int, property_name: str):
         raise ValueError("'value' must be greater than 0.")
 
 
+# The first '@', then the last '.' with at least one character after it.
+_EMAIL_PATTERN = re.compile(r"[^@]*@.*\.[^.]+\Z", re.DOTALL)
+
+
+def is_valid_email(email):
+    """
+        Returns True if 'email' is a string with an '@' and a '.' after it,
+        where the last '.' is not the final character.
+    """
+    return isinstance(email, str) and \
+        _EMAIL_PATTERN.match(email) is not None
+
+
 def validate_email(email):
     """
         This function validates an email by checking for '@' and '.' in the
         'email' string passed in.
-        If both symbols exist then it checks for multiple occurances of a '.',
-        if there is more than one occurance it checks their positions.
 
         For a valid email:
         The '.' is not the last character in the 'email' string and the last
@@ -147,24 +159,28 @@ def validate_email(email):
         parameters: email: str
         raises: ValueError, TypeError (via validate_string_property)
     """
+    if is_valid_email(email):
+        return
     validate_string_property(email, 'email')
-    is_email_OK = False
-    if '@' in email and '.' in email:
-        at_index = email.find('@')
-        dot_index = email.find('.')
-        dot_pos = dot_index
-
-        if email.count('.') > 1:
-            for i in range(dot_pos, len(email)):
-                if email[i] == '.':
-                    dot_index = i
-
-        if dot_index != len(email) - 1 and dot_index > at_index:
-            is_email_OK = True
-        else:
-            is_email_OK = False
-    if not is_email_OK:
-        raise ValueError("Invalid 'email' format.")
+    raise ValueError("Invalid 'email' format.")
+
+
+def validate_emails(emails):
+    """
+        Validates every email in the iterable 'emails', e.g. a column of
+        imported addresses, without stopping at the first bad one.
+        Returns a list of (row_index, error_message) tuples for the invalid
+        emails, an empty list when they are all valid.
+    """
+    errors = []
+    for row_index, email in enumerate(emails):
+        if is_valid_email(email):
+            continue
+        try:
+            validate_email(email)
+        except (TypeError, ValueError) as e:
+            errors.append((row_index, str(e)))
+    return errors
 
 
 def validate_string_tuple_property(value, property_name):
@@ -58,17 +58,13 @@ class AddContact(View):
 
     def submit(self):
         print("AddContact.submit()")
-        details = []
-        for component in self.components:
-            for widget in component.values():
-                if isinstance(widget, tk.Entry):
-                    details.append(widget.get())
+        details = [
+                widget.get() for widget in
+                self.get_components_of_type(tk.Entry)]
         self.controller.handle_add_contact(details)
         return details
 
     def clear(self):
         print("AddContact.clear()")
-        for component in self.components:
-            for widget in component.values():
-                if isinstance(widget, tk.Entry):
-                    widget.delete(0, tk.END)
+        for widget in self.get_components_of_type(tk.Entry):
+            widget.delete(0, tk.END)
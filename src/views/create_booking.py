@@ -65,31 +65,30 @@ class CreateBooking(View):
 
     def submit(self):
         details = []
-        for component in self.components:
-            for widget in component.values():
-                if isinstance(widget, ttk.Combobox):
-                    details.append(widget.textvariable.get())
-                if isinstance(widget, tk.Spinbox):
-                    details.append(widget.numvar.get())
-                if isinstance(widget, DateEntry):
-                    details.append(widget.get_date())
+        for widget in self.get_components_of_type(
+                ttk.Combobox, tk.Spinbox, DateEntry):
+            if isinstance(widget, ttk.Combobox):
+                details.append(widget.textvariable.get())
+            if isinstance(widget, tk.Spinbox):
+                details.append(widget.numvar.get())
+            if isinstance(widget, DateEntry):
+                details.append(widget.get_date())
         self.controller.handle_create_booking(details)
         return details
 
     def clear(self):
-        for component in self.components:
-            for widget in component.values():
-                if isinstance(widget, tk.Entry):
-                    widget.delete(0, tk.END)
-                if isinstance(widget, DateEntry):
-                    new_date = datetime.datetime.now()
-                    widget.set_date(datetime.date(
-                        new_date.year,
-                        new_date.month,
-                        new_date.day))
-                if isinstance(widget, tk.Spinbox):
-                    widget.textvariable.set(0)
-                    widget.numvar.set(0)
+        for widget in self.get_components_of_type(tk.Entry, tk.Spinbox):
+            if isinstance(widget, tk.Entry):
+                widget.delete(0, tk.END)
+            if isinstance(widget, DateEntry):
+                new_date = datetime.datetime.now()
+                widget.set_date(datetime.date(
+                    new_date.year,
+                    new_date.month,
+                    new_date.day))
+            if isinstance(widget, tk.Spinbox):
+                widget.textvariable.set(0)
+                widget.numvar.set(0)
 
 
 if __name__ == '__main__':
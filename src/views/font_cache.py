@@ -0,0 +1,98 @@
+# src/views/font_cache.py
+import threading
+from collections import OrderedDict
+import tkinter.font as tkFont
+from src.utils.validators import validate_int_property, \
+        validate_string_property
+
+"""
+    This module keeps the tkinter fonts used by the views, so widgets that
+    share a family, size and style also share one named Tcl font instead of
+    each creating their own.
+"""
+
+DEFAULT_MAX_FONTS = 32
+
+
+class FontCache:
+    """
+    This class is a least recently used cache of tkFont.Font objects keyed by
+    (family, size, weight, slant, underline).
+    A Tcl font belongs to the interpreter it was created in, so a cached font
+    made for another Tk root counts as a miss and is replaced.
+    Evicted fonts are only dropped from the cache, Tk keeps a named font alive
+    while a widget still uses it.
+    'factory' creates the fonts, tkFont.Font unless given.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_FONTS, factory=None):
+        validate_int_property(max_size, 'max_size')
+        if max_size < 1:
+            raise ValueError("'max_size' must be greater than 0.")
+        self.max_size = max_size
+        self.factory = factory or tkFont.Font
+        self._fonts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(family, size, weight="normal", slant="roman", underline=0):
+        validate_string_property(family, 'family')
+        validate_int_property(size, 'size')
+        return (family, size, weight, slant, 1 if underline else 0)
+
+    def get(self, root, family, size, weight="normal", slant="roman",
+            underline=0):
+        """
+            Returns the font for the given settings, creating it for 'root'
+            on a miss.
+        """
+        key = self.make_key(family, size, weight, slant, underline)
+        interpreter = getattr(root, 'tk', root)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None and getattr(font, '_tk', None) is \
+                    interpreter:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+            font = self.factory(
+                    root=root, family=key[0], size=key[1], weight=key[2],
+                    slant=key[3], underline=key[4])
+            self._fonts[key] = font
+            self._fonts.move_to_end(key)
+            while len(self._fonts) > self.max_size:
+                self._fonts.popitem(last=False)
+                self.evictions += 1
+            return font
+
+    def clear(self):
+        with self._lock:
+            self._fonts.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {"size": len(self._fonts), "max_size": self.max_size,
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self._fonts)
+
+    def __contains__(self, key):
+        return key in self._fonts
+
+
+# Shared by every View.
+font_cache = FontCache()
+
+
+if __name__ == '__main__':
+    print("not intended to run in isolation")
@@ -1,31 +1,45 @@
 # src/views/view.py
+import heapq
+import itertools
 import tkinter as tk
 from tkinter import ttk
-import tkinter.font as tkFont
 from tkcalendar import DateEntry
+from src.views.font_cache import font_cache
+from src.views.window_manager import window_manager as default_manager
 from src.utils.validators import validate_string_property, \
     validate_int_tuple_property, validate_int_property, \
     validate_string_tuple_property
 
+DEFAULT_FONT_FAMILY = "Arial"
+DEFAULT_FONT_SIZE = 9
+DEFAULT_FONT_STYLE = ("normal", "roman", "no_underline")
+
 
 class View:
 
     """
     This class will be used a template for creating views or forms and other
     GUI objects.
+    Each view is a Toplevel window of the window manager's single Tk root,
+    closing it hides it so it can be shown again.
+    Widgets are kept in a registry keyed by name, with an index per widget
+    type, so looking a widget up doesn't walk every widget in the view.
+    'components' is a read-only list of {name: widget} dicts built from the
+    registry, kept for compatibility, 'clear_components' empties the
+    registry.
     """
 
-    def __init__(self, title="new_view", size=(300, 400)):
+    def __init__(self, title="new_view", size=(300, 400),
+                 window_manager=None):
         self.title = title if title is not None else "new_view"
         self.size = size if size is not None else (300, 400)
         self._width = size[0]
         self._height = size[1]
-        self.components = []
+        self.clear_components()
 
-        # Set up the Tkinter window
-        self.tk = tk.Tk()
-        self.tk.title(self._title)
-        self.tk.geometry(f"{self._size[0]}x{self._size[1]}")
+        # Set up the window, a Toplevel of the window manager's shared root
+        self.window_manager = window_manager or default_manager
+        self.tk = self.window_manager.create_window(self._title, self._size)
         # create the frame to place widgets
         self.frame = self.create_frame(
                 name="main_frame", x=0, y=0,
@@ -85,6 +99,57 @@ class View:
             self.tk.geometry(f"{self._width}x{self._height}")
             self.frame.place(width=self._width, height=self._height)
 
+    # window
+    @property
+    def visible(self):
+        return self.window_manager.is_visible(self.tk)
+
+    def show(self):
+        self.window_manager.show(self.tk)
+        return self
+
+    def hide(self):
+        self.window_manager.hide(self.tk)
+        return self
+
+    # component registry
+    def clear_components(self):
+        """
+            Forgets every registered widget, the widgets themselves are not
+            destroyed.
+        """
+        self._registry = {}
+        self._by_type = {}
+        self._ordered = []
+        self._sequence = itertools.count()
+
+    def _register(self, name, widget):
+        """
+            Adds 'widget' to the registry. If the name is already taken the
+            first widget keeps it, as it did when 'get_component' searched
+            the 'components' list.
+        """
+        order = next(self._sequence)
+        self._registry.setdefault(name, widget)
+        self._by_type.setdefault(type(widget), []).append((order, widget))
+        self._ordered.append((name, widget))
+
+    @property
+    def components(self):
+        return [{name: widget} for name, widget in self._ordered]
+
+    def get_components_of_type(self, *widget_types):
+        """
+            Returns the widgets that are instances of any of 'widget_types',
+            in the order they were created.
+        """
+        groups = [widgets for widget_type, widgets in self._by_type.items()
+                  if issubclass(widget_type, widget_types)]
+        if len(groups) == 1:
+            return [widget for _, widget in groups[0]]
+        return [widget for _, widget in heapq.merge(
+            *groups, key=lambda entry: entry[0])]
+
     # components
     def create_button(
             self,
@@ -102,29 +167,13 @@ class View:
         button.name = name
         button.command = command
         button.place(x=x, y=y)
-        self.components.append({name: button})
-        font_family = "Arial"
-        font_size = 9
-        font_style = ("normal", "roman", "no_underline")
-        button.font = [
-                {"family": font_family}, {"size": font_size},
-                {"weight": "bold" if font_style[0] == "bold" else "normal"},
-                {"slant": "italic" if font_style[1] == "italic" else "roman"},
-                {"underline": 1 if font_style[2] == "underline" else 0}
-                ]
-        self.set_font(
-                component_name=name, font_family=font_family,
-                font_size=font_size,
-                font_style=font_style)
+        self._register(name, button)
+        self._apply_font(button)
         return button
 
     def get_component(self, component_name):
         validate_string_property(component_name, 'component_name')
-        for component in self.components:
-            for k, v in component.items():
-                if k == component_name:
-                    return v
-        return None
+        return self._registry.get(component_name)
 
     def create_label(
             self, name='label', text="new label", x=0, y=0, parent=None):
@@ -136,17 +185,8 @@ class View:
         label = ttk.Label(parent, text=text)
         label.name = name
         label.place(x=x, y=y)
-        self.components.append({name: label})
-        font_family = "Arial"
-        font_size = 9
-        font_style = ("normal", "roman", "no_underline")
-        label.font = [
-                {"family": font_family}, {"size": font_size},
-                {"weight": "bold" if font_style[0] == "bold" else "normal"},
-                {"slant": "italic" if font_style[1] == "italic" else "roman"},
-                {"underline": 1 if font_style[2] == "underline" else 0}
-                ]
-        self.set_font(name, font_family, font_size, font_style)
+        self._register(name, label)
+        self._apply_font(label)
         return label
 
     def create_entry_text_field(
@@ -164,17 +204,8 @@ class View:
         entry_text_field.name = name
         entry_text_field.show = show
         entry_text_field.place(x=x, y=y, width=width)
-        self.components.append({name: entry_text_field})
-        font_family = "Arial"
-        font_size = 9
-        font_style = ("normal", "roman", "no_underline")
-        entry_text_field.font = [
-                {"family": font_family}, {"size": font_size},
-                {"weight": "bold" if font_style[0] == "bold" else "normal"},
-                {"slant": "italic" if font_style[1] == "italic" else "roman"},
-                {"underline": 1 if font_style[2] == "underline" else 0}
-                ]
-        self.set_font(name, font_family, font_size, font_style)
+        self._register(name, entry_text_field)
+        self._apply_font(entry_text_field)
         return entry_text_field
 
     def create_frame(
@@ -193,7 +224,7 @@ class View:
         frame.y = y
         frame.width = width
         frame.height = height
-        self.components.append({frame.name: frame})
+        self._register(frame.name, frame)
         return frame
 
     def create_dropdown(
@@ -219,7 +250,7 @@ class View:
         dropdown.width = width
         dropdown.values = values
         dropdown.textvariable = var
-        self.components.append({dropdown.name: dropdown})
+        self._register(dropdown.name, dropdown)
         return dropdown
 
     def create_spinbox(
@@ -249,7 +280,7 @@ class View:
         spinbox.width = width
         spinbox.textvariable = var
         spinbox.numvar = numvar
-        self.components.append({spinbox.name: spinbox})
+        self._register(spinbox.name, spinbox)
         return spinbox
 
     def create_calender(self,
@@ -268,7 +299,7 @@ class View:
         calendar.y = y
         calendar.width = width
         calendar.place(x=x, y=y)
-        self.components.append({calendar.name: calendar})
+        self._register(calendar.name, calendar)
         return calendar
 
     def set_font(
@@ -327,26 +358,34 @@ class View:
             raise ValueError(
                     f"Could not find {font_family}, in supported font list.")
 
-        # Define a style
-        font = tkFont.Font(
-                family=font_family, size=font_size,
-                weight=font_style[0],
-                slant=font_style[1],
-                underline=1 if font_style[2] == "underline" else 0
-                )
-
-        # Apply the font
-        if isinstance(component, (tk.Button, ttk.Label, tk.Entry)):
-            component.configure(font=font)
-        else:
+        if not isinstance(component, (tk.Button, ttk.Label, tk.Entry)):
             raise TypeError(
                     f"Font setting not supported for {type(component)}.")
-
+        return self._apply_font(
+                component, font_family, font_size, font_style)
+
+    def _apply_font(
+            self, component,
+            font_family=DEFAULT_FONT_FAMILY,
+            font_size=DEFAULT_FONT_SIZE,
+            font_style=DEFAULT_FONT_STYLE):
+        """
+            Applies an already validated font to 'component'. The font comes
+            from the shared font cache, so widgets with the same font share
+            one tkFont.Font. The create_* methods call this directly instead
+            of going through 'set_font'.
+        """
+        underline = 1 if font_style[2] == "underline" else 0
+        font = font_cache.get(
+                self.tk, font_family, font_size,
+                weight=font_style[0], slant=font_style[1],
+                underline=underline)
+        component.configure(font=font)
         component.font = [
                 {"family": font_family}, {"size": font_size},
                 {"weight": font_style[0]},
                 {"slant": font_style[1]},
-                {"underline": 1 if font_style[2] == "underline" else 0}
+                {"underline": underline}
         ]
         return component
 
@@ -0,0 +1,112 @@
+# src/views/window_manager.py
+import tkinter as tk
+
+"""
+    This module owns the single Tk interpreter used by the application. Every
+    View is a Toplevel window of the one hidden root, so opening or switching
+    views doesn't start a new Tcl interpreter and event loop.
+"""
+
+
+class WindowManager:
+    """
+    This class creates the hidden tk.Tk root on first use and a Toplevel
+    window for each view.
+    Closing a window only hides it so the view can be shown again, once no
+    window is visible the main loop is stopped.
+    If the root has been destroyed a new one is created the next time it is
+    needed.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._windows = []
+
+    @property
+    def root(self):
+        if not self._root_exists():
+            self._root = tk.Tk()
+            self._root.withdraw()
+            self._windows = []
+        return self._root
+
+    def _root_exists(self):
+        if self._root is None:
+            return False
+        try:
+            return bool(self._root.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def create_window(self, title="new_view", size=(300, 400)):
+        """
+            Returns a new Toplevel window of the root, closing it hides it.
+        """
+        window = tk.Toplevel(self.root)
+        window.title(title)
+        window.geometry(f"{size[0]}x{size[1]}")
+        window.protocol("WM_DELETE_WINDOW", lambda: self.hide(window))
+        self._windows.append(window)
+        return window
+
+    @staticmethod
+    def _exists(window):
+        try:
+            return bool(window.winfo_exists())
+        except tk.TclError:
+            return False
+
+    @property
+    def windows(self):
+        self._windows = [
+                window for window in self._windows if self._exists(window)]
+        return list(self._windows)
+
+    def is_visible(self, window):
+        return self._exists(window) and window.state() != "withdrawn"
+
+    @property
+    def visible_windows(self):
+        return [window for window in self.windows if self.is_visible(window)]
+
+    def show(self, window):
+        window.deiconify()
+        window.lift()
+        return window
+
+    def hide(self, window):
+        """
+            Withdraws 'window', stopping the main loop when it was the last
+            visible window.
+        """
+        if self._exists(window):
+            window.withdraw()
+        if self._root_exists() and not self.visible_windows:
+            self._root.quit()
+
+    def switch_to(self, window):
+        """
+            Shows 'window' and hides every other window.
+        """
+        self.show(window)
+        for other in self.windows:
+            if other is not window:
+                other.withdraw()
+        return window
+
+    def mainloop(self):
+        self.root.mainloop()
+
+    def destroy(self):
+        if self._root_exists():
+            self._root.destroy()
+        self._root = None
+        self._windows = []
+
+
+# Shared by every View unless one is given.
+window_manager = WindowManager()
+
+
+if __name__ == '__main__':
+    print("not intended to run in isolation")
@@ -0,0 +1,39 @@
+# tests/test_benchmarks.py
+import unittest
+from benchmarks.run import compare
+from benchmarks.harness import measure, result
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_measure(self):
+        print("=== test_measure ===")
+        calls = []
+        value = measure(lambda: calls.append(1), number=4, repeat=3)
+        self.assertEqual(len(calls), 12)
+        self.assertIsInstance(value, float)
+
+    def test_compare(self):
+        print("=== test_compare ===")
+        baseline = {
+                "same": result(1.0),
+                "slower": result(1.0),
+                "faster": result(1.0),
+                }
+        results = {
+                "same": result(1.05),
+                "slower": result(1.5),
+                "faster": result(0.5),
+                "added": result(2.0),
+                }
+        rows = {row[0]: row for row in compare(results, baseline, 10.0)}
+        self.assertEqual(rows["same"][-1], "ok")
+        self.assertEqual(rows["slower"][-1], "REGRESSION")
+        self.assertAlmostEqual(rows["slower"][3], 50.0)
+        self.assertEqual(rows["faster"][-1], "faster")
+        self.assertEqual(rows["added"][-1], "new")
+        self.assertIsNone(rows["added"][2])
+
+
+if __name__ == '__main__':
+    unittest.main()
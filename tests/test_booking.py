@@ -1,5 +1,6 @@
 # tests/test_booking.py
-from src.booking.booking import Booking
+from src.booking.booking import Booking, PENDING, CONFIRMED, DECLINED, \
+        EXPIRED, CONFIRMATION_WINDOW, confirmation_deadline
 from datetime import datetime
 import unittest
 
@@ -180,6 +181,86 @@ class TestBooking(unittest.TestCase):
                 with self.assertRaises(ValueError):
                     self.booking.description = invalid_value
 
+    def test_set_duration_property(self):
+        print("=== test_set_duration_property ===")
+        self.assertEqual(self.booking.duration, 60)
+        self.booking.duration = 45
+        self.assertEqual(self.booking.duration, 45)
+
+        value_error_input = [None, 0, -15]
+        for invalid_value in value_error_input:
+            with self.subTest(
+                    msg="Test setting 'duration' to None, zero and negative " +
+                    "values.", value=invalid_value):
+                with self.assertRaises(ValueError):
+                    self.booking.duration = invalid_value
+
+        type_error_input = [1.5, "30", (30,), []]
+        for invalid_value in type_error_input:
+            with self.subTest(
+                    msg="Test setting 'duration' to non int values.",
+                    value=invalid_value):
+                with self.assertRaises(TypeError):
+                    self.booking.duration = invalid_value
+
+    def test_start_and_end(self):
+        print("=== test_start_and_end ===")
+        booking = Booking(_date=(2024, 5, 15), _time=(14, 30), _duration=90)
+        self.assertEqual(booking.start, datetime(2024, 5, 15, 14, 30))
+        self.assertEqual(booking.end, datetime(2024, 5, 15, 16, 0))
+        booking.date = datetime(2024, 5, 16, 8, 0)
+        self.assertEqual(booking.start, datetime(2024, 5, 16, 14, 30))
+
+    def test_status_lifecycle(self):
+        print("=== test_status_lifecycle ===")
+        self.assertEqual(self.booking.status, PENDING)
+        self.assertIsNone(self.booking.expires_at)
+        self.booking.status = CONFIRMED
+        self.booking.status = DECLINED
+        self.assertEqual(self.booking.status, DECLINED)
+        for start, invalid in ((DECLINED, CONFIRMED), (EXPIRED, PENDING),
+                               (CONFIRMED, EXPIRED), (CONFIRMED, PENDING)):
+            with self.subTest(start=start, invalid=invalid):
+                booking = Booking(_status=start)
+                with self.assertRaises(ValueError):
+                    booking.status = invalid
+                self.assertEqual(booking.status, start)
+        with self.assertRaises(ValueError):
+            self.booking.status = "maybe"
+        with self.assertRaises(TypeError):
+            self.booking.status = 1
+
+    def test_expires_at(self):
+        print("=== test_expires_at ===")
+        self.booking.expires_at = datetime(2024, 5, 1, 9, 0)
+        self.assertEqual(self.booking.expires_at, datetime(2024, 5, 1, 9, 0))
+        self.booking.expires_at = None
+        with self.assertRaises(TypeError):
+            self.booking.expires_at = (2024, 5, 1)
+        now = datetime(2024, 5, 1, 9, 0)
+        self.assertEqual(
+                confirmation_deadline(datetime(2024, 6, 1), now),
+                now + CONFIRMATION_WINDOW)
+        self.assertEqual(
+                confirmation_deadline(datetime(2024, 5, 2), now),
+                datetime(2024, 5, 2))
+
+    def test_id(self):
+        print("=== test_id ===")
+        self.assertIsNone(self.booking.id)
+        with self.assertRaises(TypeError):
+            self.booking.id = "1"
+        self.booking.id = 7
+        self.assertEqual(self.booking.id, 7)
+        with self.assertRaises(AttributeError):
+            self.booking.id = 8
+
+    def test_compact_representation(self):
+        print("=== test_compact_representation ===")
+        self.assertFalse(hasattr(self.booking, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.booking.location = "not a slot"
+
     def test___repr__with_default_values(self):
         dt = datetime.now()
         expected_repr_str = str(
@@ -0,0 +1,191 @@
+# tests/test_booking_calendar.py
+import unittest
+from datetime import datetime, date, timedelta
+from src.booking.booking import Booking
+from src.booking.booking_calendar import BookingCalendar
+from src.booking.recurrence import RecurrenceRule, Occurrence, WEEKLY
+
+
+class TestBookingCalendar(unittest.TestCase):
+
+    def setUp(self):
+        print("booking calendar setUp")
+        self.morning = Booking("Morning", datetime(2024, 6, 4), (9, 0),
+                               _duration=60)
+        self.lunch = Booking("Lunch", datetime(2024, 6, 4), (12, 0),
+                             _duration=90)
+        self.next_day = Booking("Next Day", (2024, 6, 5), (9, 0))
+        self.calendar = BookingCalendar(
+                [self.lunch, self.next_day, self.morning])
+
+    def test_bookings_are_sorted(self):
+        print("=== test_bookings_are_sorted ===")
+        self.assertEqual(len(self.calendar), 3)
+        self.assertEqual(
+                list(self.calendar),
+                [self.morning, self.lunch, self.next_day])
+        self.assertEqual(
+                self.calendar.bookings_on(date(2024, 6, 4)),
+                [self.morning, self.lunch])
+        self.assertEqual(
+                self.calendar.bookings_on((2024, 6, 5)), [self.next_day])
+
+    def test_overlapping(self):
+        print("=== test_overlapping ===")
+        self.assertEqual(
+                self.calendar.overlapping(
+                    datetime(2024, 6, 4, 13, 0), datetime(2024, 6, 4, 13, 15)),
+                [self.lunch])
+        # Touching intervals don't overlap
+        self.assertEqual(
+                self.calendar.overlapping(
+                    datetime(2024, 6, 4, 10, 0), datetime(2024, 6, 4, 12, 0)),
+                [])
+        with self.assertRaises(ValueError):
+            self.calendar.overlapping(
+                    datetime(2024, 6, 4, 10, 0), datetime(2024, 6, 4, 9, 0))
+
+    def test_conflicts(self):
+        print("=== test_conflicts ===")
+        clash = Booking("Clash", datetime(2024, 6, 4), (9, 30))
+        self.assertEqual(self.calendar.conflicts(clash), [self.morning])
+        self.assertEqual(self.calendar.conflicts(self.morning), [])
+
+    def test_free_slots(self):
+        print("=== test_free_slots ===")
+        slots = self.calendar.free_slots(datetime(2024, 6, 4))
+        self.assertEqual(slots, [
+            (datetime(2024, 6, 4, 10, 0), datetime(2024, 6, 4, 12, 0)),
+            (datetime(2024, 6, 4, 13, 30), datetime(2024, 6, 4, 17, 0)),
+            ])
+        slots = self.calendar.free_slots(
+                (2024, 6, 4), day_start=(8, 0), day_end=(12, 0),
+                min_duration=90)
+        self.assertEqual(slots, [
+            (datetime(2024, 6, 4, 10, 0), datetime(2024, 6, 4, 12, 0))])
+        with self.assertRaises(ValueError):
+            self.calendar.free_slots((2024, 6, 4), (17, 0), (9, 0))
+        with self.assertRaises(TypeError):
+            self.calendar.free_slots("2024-06-04")
+
+    def test_add_and_remove(self):
+        print("=== test_add_and_remove ===")
+        self.calendar.remove(self.lunch)
+        self.assertEqual(len(self.calendar), 2)
+        self.assertEqual(self.calendar.free_slots((2024, 6, 4)), [
+            (datetime(2024, 6, 4, 10, 0), datetime(2024, 6, 4, 17, 0))])
+        with self.assertRaises(ValueError):
+            self.calendar.remove(self.lunch)
+        with self.assertRaises(TypeError):
+            self.calendar.add("booking")
+        self.calendar.clear()
+        self.assertEqual(len(self.calendar), 0)
+
+    def test_longest_after_remove(self):
+        print("=== test_longest_after_remove ===")
+        self.assertEqual(self.calendar._longest, timedelta(minutes=90))
+        retreat = Booking("Retreat", datetime(2024, 6, 1), (9, 0),
+                          _duration=3 * 24 * 60)
+        brunch = Booking("Brunch", datetime(2024, 6, 5), (11, 0),
+                         _duration=90)
+        self.calendar.add(retreat)
+        self.calendar.add(brunch)
+        self.assertEqual(self.calendar._longest, timedelta(days=3))
+        self.assertEqual(
+                self.calendar.overlapping(
+                    datetime(2024, 6, 4, 8, 0), datetime(2024, 6, 4, 8, 30)),
+                [retreat])
+        self.calendar.remove(retreat)
+        self.assertEqual(self.calendar._longest, timedelta(minutes=90))
+        # another booking still has the longest duration
+        self.calendar.remove(self.lunch)
+        self.assertEqual(self.calendar._longest, timedelta(minutes=90))
+        self.calendar.remove(brunch)
+        self.assertEqual(self.calendar._longest, timedelta(minutes=60))
+        self.assertEqual(
+                self.calendar.overlapping(
+                    datetime(2024, 6, 4, 9, 30), datetime(2024, 6, 5, 9, 30)),
+                [self.morning, self.next_day])
+        self.calendar.remove(self.morning)
+        self.calendar.remove(self.next_day)
+        self.assertEqual(self.calendar._longest, timedelta(0))
+
+    def make_standup(self, **rule):
+        # every Tuesday 11:00-11:30 from 2024-06-04
+        standup = Booking("Standup", datetime(2024, 6, 4), (11, 0),
+                          _duration=30)
+        standup.recurrence = RecurrenceRule(WEEKLY, **rule)
+        return standup
+
+    def test_recurring_bookings(self):
+        print("=== test_recurring_bookings ===")
+        standup = self.make_standup(exceptions=[datetime(2024, 6, 18, 11)])
+        self.calendar.add(standup)
+        self.assertEqual(len(self.calendar), 4)
+        self.assertEqual(list(self.calendar),
+                         [self.morning, standup, self.lunch, self.next_day])
+        self.assertEqual(
+                self.calendar.bookings_on((2024, 6, 4)),
+                [self.morning, Occurrence(standup, datetime(2024, 6, 4, 11)),
+                 self.lunch])
+        for day, expected in (((2024, 6, 11), 1), ((2024, 6, 18), 0),
+                              ((2030, 6, 4), 1), ((2030, 6, 5), 0)):
+            with self.subTest(day=day):
+                self.assertEqual(
+                        len(self.calendar.bookings_on(day)), expected)
+        between = self.calendar.iter_between(
+                datetime(2024, 6, 1), datetime(2024, 7, 1))
+        self.assertEqual(
+                [b.start for b in between],
+                [datetime(2024, 6, 4, 9), datetime(2024, 6, 4, 11),
+                 datetime(2024, 6, 4, 12), datetime(2024, 6, 5, 9),
+                 datetime(2024, 6, 11, 11), datetime(2024, 6, 25, 11)])
+        self.calendar.remove(standup)
+        self.assertEqual(len(self.calendar), 3)
+        with self.assertRaises(ValueError):
+            self.calendar.remove(standup)
+
+    def test_recurring_conflicts(self):
+        print("=== test_recurring_conflicts ===")
+        standup = self.make_standup()
+        self.calendar.add(standup)
+        clash = Booking("Clash", datetime(2025, 1, 7), (11, 15))
+        self.assertEqual(
+                self.calendar.conflicts(clash),
+                [Occurrence(standup, datetime(2025, 1, 7, 11))])
+        # touching an occurrence isn't a conflict
+        self.assertEqual(self.calendar.conflicts(
+                Booking("After", datetime(2025, 1, 7), (11, 30))), [])
+        self.assertEqual(self.calendar.conflicts(standup), [])
+        # a new series is checked on each of its dates
+        weekly_lunch = Booking("Lunch", datetime(2024, 5, 28), (12, 30),
+                               _duration=30)
+        weekly_lunch.recurrence = RecurrenceRule(WEEKLY, count=3)
+        self.assertEqual(self.calendar.conflicts(weekly_lunch), [self.lunch])
+        overlapping_series = self.make_standup(interval=2)
+        overlapping_series.time = (11, 20)
+        conflicts = self.calendar.conflicts(overlapping_series)
+        self.assertEqual(len(conflicts), 27)
+        self.assertTrue(all(c.booking is standup for c in conflicts))
+
+    def test_free_slots_with_recurring_bookings(self):
+        print("=== test_free_slots_with_recurring_bookings ===")
+        self.calendar.add(self.make_standup(count=2))
+        self.assertEqual(self.calendar.free_slots(datetime(2024, 6, 11)), [
+            (datetime(2024, 6, 11, 9, 0), datetime(2024, 6, 11, 11, 0)),
+            (datetime(2024, 6, 11, 11, 30), datetime(2024, 6, 11, 17, 0)),
+            ])
+        self.assertEqual(self.calendar.free_slots(datetime(2024, 6, 18)), [
+            (datetime(2024, 6, 18, 9, 0), datetime(2024, 6, 18, 17, 0))])
+        self.assertEqual(
+                self.calendar.overlapping(datetime(2024, 6, 11, 11, 29),
+                                          datetime(2024, 6, 11, 12, 0))[0]
+                .start, datetime(2024, 6, 11, 11, 0))
+
+    def tearDown(self):
+        print("booking calendar tearDown")
+        self.calendar = None
+
+
+if __name__ == '__main__':
+    unittest.main()
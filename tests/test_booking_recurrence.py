@@ -0,0 +1,137 @@
+# tests/test_booking_recurrence.py
+import unittest
+from datetime import date, datetime
+from itertools import islice
+from src.booking.booking import Booking
+from src.booking.recurrence import RecurrenceRule, Occurrence, DAILY, \
+        WEEKLY, MONTHLY
+
+
+class TestRecurrenceRule(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/booking/recurrence.py'")
+        self.start = datetime(2024, 1, 31, 9, 0)
+
+    def test_frequencies(self):
+        print("=== test_frequencies ===")
+        for rule, expected in (
+                (RecurrenceRule(DAILY, count=3),
+                 [datetime(2024, 1, 31, 9), datetime(2024, 2, 1, 9),
+                  datetime(2024, 2, 2, 9)]),
+                (RecurrenceRule(WEEKLY, interval=2, count=3),
+                 [datetime(2024, 1, 31, 9), datetime(2024, 2, 14, 9),
+                  datetime(2024, 2, 28, 9)]),
+                # months without a 31st are skipped and don't count
+                (RecurrenceRule(MONTHLY, count=4),
+                 [datetime(2024, 1, 31, 9), datetime(2024, 3, 31, 9),
+                  datetime(2024, 5, 31, 9), datetime(2024, 7, 31, 9)]),
+                (RecurrenceRule("monthly", interval=6, count=2),
+                 [datetime(2024, 1, 31, 9), datetime(2024, 7, 31, 9)]),
+                ):
+            with self.subTest(rule=rule):
+                self.assertEqual(list(rule.occurrences(self.start)), expected)
+
+    def test_until_and_exceptions(self):
+        print("=== test_until_and_exceptions ===")
+        rule = RecurrenceRule(DAILY, until=datetime(2024, 2, 4, 9, 0),
+                              exceptions=[datetime(2024, 2, 1, 9, 0),
+                                          date(2024, 2, 3)])
+        self.assertEqual(list(rule.occurrences(self.start)), [
+                datetime(2024, 1, 31, 9), datetime(2024, 2, 2, 9),
+                datetime(2024, 2, 4, 9)])
+        # excluded dates still count towards COUNT
+        rule = RecurrenceRule(DAILY, count=3,
+                              exceptions=[datetime(2024, 2, 1, 9, 0)])
+        self.assertEqual(len(list(rule.occurrences(self.start))), 2)
+
+    def test_window(self):
+        print("=== test_window ===")
+        for rule in (RecurrenceRule(DAILY), RecurrenceRule(WEEKLY, count=500),
+                     RecurrenceRule(MONTHLY, interval=2),
+                     RecurrenceRule(MONTHLY, interval=5, count=40)):
+            with self.subTest(rule=rule):
+                window_start = datetime(2030, 3, 1)
+                window_end = datetime(2031, 3, 1)
+                expected = [
+                        occurrence for occurrence in islice(
+                            rule.occurrences(self.start), 200000)
+                        if window_start <= occurrence < window_end]
+                self.assertEqual(
+                        list(rule.occurrences(
+                            self.start, window_start, window_end)),
+                        expected)
+
+    def test_unbounded_series_is_lazy(self):
+        print("=== test_unbounded_series_is_lazy ===")
+        rule = RecurrenceRule(DAILY)
+        occurrences = rule.occurrences(self.start)
+        self.assertEqual(next(occurrences), self.start)
+        self.assertEqual(len(list(islice(occurrences, 1000))), 1000)
+        # a window far away is reached without walking the series
+        far = datetime(9000, 1, 1)
+        self.assertEqual(
+                list(rule.occurrences(self.start, far,
+                                      datetime(9000, 1, 3))),
+                [datetime(9000, 1, 1, 9), datetime(9000, 1, 2, 9)])
+
+    def test_text(self):
+        print("=== test_text ===")
+        rule = RecurrenceRule(
+                WEEKLY, interval=2, count=10,
+                until=datetime(2024, 12, 31, 9, 0),
+                exceptions=[datetime(2024, 2, 14, 9, 0), date(2024, 3, 13)])
+        text = rule.to_text()
+        self.assertEqual(
+                text, "FREQ=WEEKLY;INTERVAL=2;COUNT=10;UNTIL=20241231T090000"
+                ";EXDATE=20240214T090000,20240313")
+        self.assertEqual(RecurrenceRule.from_text(text), rule)
+        self.assertEqual(
+                RecurrenceRule.from_text("FREQ=DAILY;UNTIL=20240201").until,
+                datetime(2024, 2, 1, 23, 59, 59))
+        for invalid in ("INTERVAL=2", "FREQ=WEEKLY;BYDAY=MO",
+                        "FREQ=YEARLY", "FREQ=DAILY;COUNT=0",
+                        "FREQ=DAILY;COUNT=x", "FREQ"):
+            with self.subTest(invalid=invalid):
+                with self.assertRaises(ValueError):
+                    RecurrenceRule.from_text(invalid)
+
+    def test_invalid_properties(self):
+        print("=== test_invalid_properties ===")
+        for kwargs, error in (({"frequency": 1}, TypeError),
+                              ({"frequency": "HOURLY"}, ValueError),
+                              ({"interval": 0}, ValueError),
+                              ({"interval": "2"}, TypeError),
+                              ({"count": 0}, ValueError),
+                              ({"until": date(2024, 1, 1)}, TypeError),
+                              ({"exceptions": ["2024-01-01"]}, TypeError)):
+            with self.subTest(kwargs=kwargs):
+                arguments = {"frequency": DAILY}
+                arguments.update(kwargs)
+                with self.assertRaises(error):
+                    RecurrenceRule(**arguments)
+
+    def test_booking_occurrences(self):
+        print("=== test_booking_occurrences ===")
+        booking = Booking("Standup", datetime(2024, 1, 1), (9, 30),
+                          _duration=15)
+        self.assertEqual(
+                [o.start for o in booking.occurrences()],
+                [datetime(2024, 1, 1, 9, 30)])
+        self.assertEqual(list(booking.occurrences(datetime(2024, 1, 2))), [])
+        booking.recurrence = RecurrenceRule(WEEKLY)
+        occurrence = next(booking.occurrences(datetime(2024, 6, 1)))
+        self.assertIsInstance(occurrence, Occurrence)
+        self.assertEqual(occurrence.start, datetime(2024, 6, 3, 9, 30))
+        self.assertEqual(occurrence.end, datetime(2024, 6, 3, 9, 45))
+        self.assertEqual(occurrence.date, datetime(2024, 6, 3))
+        self.assertEqual(occurrence.time, (9, 30))
+        self.assertEqual(occurrence.title, "Standup")
+        self.assertIs(occurrence.booking, booking)
+        self.assertEqual(occurrence, Occurrence(booking, occurrence.start))
+        with self.assertRaises(TypeError):
+            booking.recurrence = "FREQ=WEEKLY"
+
+
+if __name__ == '__main__':
+    unittest.main()
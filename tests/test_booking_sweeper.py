@@ -0,0 +1,101 @@
+# tests/test_booking_sweeper.py
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+import src.db.repository as repository
+from src.booking.booking import EXPIRED, PENDING
+from src.booking.sweeper import BookingSweeper
+from src.db.pool import ConnectionPool
+from src.user.user import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2024, 5, 1, 12, 0)
+
+    def __call__(self):
+        return self.now
+
+
+class TestBookingSweeper(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/booking/sweeper.py'")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(
+                os.path.join(self.tmp_dir.name, "sweeper_test.db"), size=2)
+        with self.pool.cursor() as cursor:
+            repository.create_tables(cursor)
+        self.clock = FakeClock()
+        self.sweeper = BookingSweeper(
+                self.pool, interval=1, batch_size=3, clock=self.clock)
+        user = User("user", "user@email.com")
+        for day in range(2, 9):
+            booking = user.create_booking(
+                    "Meeting", datetime(2024, 5, day), (9, 0), "Friend",
+                    "friend@email.com", "About things.", 30)
+            # one day to answer each request
+            booking.expires_at = datetime(2024, 5, day - 1, 18, 0)
+        with self.pool.cursor() as cursor:
+            repository.save_user(cursor, 1, user)
+
+    def tearDown(self):
+        self.sweeper.stop(timeout=5)
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_create_booking_sets_deadline(self):
+        print("=== test_create_booking_sets_deadline ===")
+        user = User("user", "user@email.com")
+        start = datetime.now() + timedelta(days=30)
+        booking = user.create_booking(
+                "Meeting", start, (9, 0), "Friend", "friend@email.com",
+                "About things.", 30)
+        self.assertEqual(booking.status, PENDING)
+        self.assertLess(booking.expires_at, booking.start)
+
+    def test_sweep(self):
+        print("=== test_sweep ===")
+        for now, expired, pending in (
+                (datetime(2024, 5, 1, 12, 0), 0, 7),
+                (datetime(2024, 5, 1, 18, 0), 1, 6),
+                (datetime(2024, 5, 6, 0, 0), 4, 2),
+                (datetime(2024, 5, 6, 0, 0), 0, 2),
+                (datetime(2024, 6, 1, 0, 0), 2, 0)):
+            with self.subTest(now=now):
+                self.clock.now = now
+                counts = self.sweeper.sweep()
+                self.assertEqual(
+                        (counts["expired"], counts["pending"]),
+                        (expired, pending))
+                self.assertIs(self.sweeper.last_sweep, counts)
+        with self.pool.cursor() as cursor:
+            self.assertEqual(
+                    repository.count_bookings_by_status(cursor)[EXPIRED], 7)
+
+    def test_background_sweeps(self):
+        print("=== test_background_sweeps ===")
+        self.sweeper.interval = 0
+        self.clock.now = datetime(2024, 6, 1)
+        self.sweeper.start()
+        deadline = time.monotonic() + 5
+        while self.sweeper.last_sweep is None and \
+                time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.sweeper.stop(timeout=5)
+        with self.pool.cursor() as cursor:
+            self.assertEqual(
+                    repository.count_bookings_by_status(cursor)[PENDING], 0)
+
+    def test_invalid_arguments(self):
+        print("=== test_invalid_arguments ===")
+        with self.assertRaises(ValueError):
+            BookingSweeper(batch_size=0)
+        with self.assertRaises(TypeError):
+            BookingSweeper(interval="60")
+
+
+if __name__ == '__main__':
+    unittest.main()
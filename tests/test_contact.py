@@ -97,6 +97,15 @@ class TestContact(unittest.TestCase):
                 with self.assertRaises(AttributeError):
                     self.contact.id = invalid_value
 
+    def test_compact_representation(self):
+        print("=== test_compact_representation ===")
+        self.assertFalse(hasattr(self.contact, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.contact.nickname = "not a slot"
+        # The id is rebuilt from the stored int and stays the same
+        self.assertEqual(self.contact.id, self.contact.id)
+        self.assertEqual(self.contact.id.version, 4)
+
     def tearDown(self):
         print("contact tearDown")
         self.contact = None
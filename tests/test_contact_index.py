@@ -0,0 +1,88 @@
+# tests/test_contact_index.py
+import unittest
+from src.contact.contact import Contact
+from src.contact.contact_index import ContactIndex
+
+
+class TestContactIndex(unittest.TestCase):
+
+    def setUp(self):
+        print("contact index setUp")
+        self.index = ContactIndex()
+        self.contact = Contact("Test Contact", "Test@App_Genie.app")
+        self.index.add(self.contact)
+
+    def test_find(self):
+        print("=== test_find ===")
+        self.assertIs(
+                self.index.find("test contact", " test@app_genie.app "),
+                self.contact)
+        self.assertIsNone(self.index.find("Other", "test@app_genie.app"))
+        self.assertIsNone(self.index.find("Test Contact", "x@app_genie.app"))
+        self.assertEqual(
+                self.index.find_by_email("TEST@app_genie.app"),
+                [self.contact])
+        self.assertEqual(
+                self.index.find_by_name("Test  Contact"), [self.contact])
+        self.assertEqual(len(self.index), 1)
+        self.assertIn(self.contact, self.index)
+
+    def test_index_follows_property_changes(self):
+        print("=== test_index_follows_property_changes ===")
+        self.contact.email = "new@app_genie.app"
+        self.contact.name = "Renamed"
+        self.assertEqual(self.index.find_by_email("test@app_genie.app"), [])
+        self.assertEqual(self.index.find_by_name("Test Contact"), [])
+        self.assertIs(
+                self.index.find("renamed", "new@app_genie.app"), self.contact)
+        # A rejected value leaves the index untouched
+        with self.assertRaises(ValueError):
+            self.contact.email = "not_an_email"
+        self.assertIs(
+                self.index.find("Renamed", "new@app_genie.app"), self.contact)
+
+    def test_remove_and_clear(self):
+        print("=== test_remove_and_clear ===")
+        other = Contact("Other", "other@app_genie.app")
+        self.index.add(other)
+        self.index.remove(self.contact)
+        self.assertEqual(len(self.index), 1)
+        self.assertNotIn(self.contact, self.index)
+        self.assertEqual(self.contact._indexes, ())
+        with self.assertRaises(ValueError):
+            self.index.remove(self.contact)
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(other._indexes, ())
+        # Detached contacts no longer update the index
+        other.email = "moved@app_genie.app"
+        self.assertEqual(self.index.find_by_email("moved@app_genie.app"), [])
+
+    def test_find_failure(self):
+        print("=== test_find_failure ===")
+        raises_value_errors = [None, "", " "]
+        for invalid_value in raises_value_errors:
+            with self.subTest(
+                    msg="Test values which raise a ValueError exception " +
+                    "when searching the index.", value=invalid_value):
+                with self.assertRaises(ValueError):
+                    self.index.find_by_email(invalid_value)
+                with self.assertRaises(ValueError):
+                    self.index.find_by_name(invalid_value)
+        raises_type_errors = [12, 2.0, (), [], {}]
+        for invalid_value in raises_type_errors:
+            with self.subTest(
+                    msg="Test values which raise a TypeError exception " +
+                    "when searching the index.", value=invalid_value):
+                with self.assertRaises(TypeError):
+                    self.index.find(invalid_value, "test@app_genie.app")
+
+    def tearDown(self):
+        print("contact index tearDown")
+        self.index.clear()
+        self.index = None
+        self.contact = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 # tests/test_controller.py
 import unittest
+from unittest import mock
 from src.controller.controller import Controller, Login, User, \
         AddContact, CreateBooking
+from src.user.authenticator import LoginRateLimited
 
 
 class TestController(unittest.TestCase):
@@ -19,6 +21,28 @@ class TestController(unittest.TestCase):
         self.assertEqual(self.controller.add_contact_view, None)
         self.assertEqual(self.controller.create_booking_view, None)
 
+    def test_controller_with_user(self):
+        print("=== test_controller_with_user ===")
+        user = User("session_user")
+        controller = Controller(user=user)
+        self.assertIs(controller.user, user)
+        self.assertEqual(controller.user.user_name, "session_user")
+        self.assertIsNot(controller.user, self.controller.user)
+        with self.assertRaises(TypeError):
+            Controller(user="session_user")
+
+    def test_handle_login_with_authenticator(self):
+        print("=== test_handle_login_with_authenticator ===")
+        authenticator = mock.Mock()
+        session_user = User("db_user")
+        authenticator.authenticate.side_effect = [
+                None, session_user, LoginRateLimited("db_user", 30)]
+        controller = Controller(authenticator=authenticator)
+        self.assertFalse(controller.handle_login("db_user", "wrong"))
+        self.assertTrue(controller.handle_login("db_user", "secret"))
+        self.assertIs(controller.user, session_user)
+        self.assertFalse(controller.handle_login("db_user", "secret"))
+
     def test_handle_login(self):
         print("=== test_handle_login ===")
         user_name = "user"
@@ -49,6 +73,11 @@ class TestController(unittest.TestCase):
         self.assertTrue(self.controller.handle_add_contact(details))
         with self.assertRaises(ValueError):
             self.controller.handle_add_contact(None)
+        for invalid_email in ("notanemail", "test@email", ""):
+            with self.subTest(email=invalid_email):
+                with self.assertRaises(ValueError):
+                    self.controller.add_contact(contact_name, invalid_email)
+        self.assertEqual(len(self.controller.user.contacts), 1)
 
     def test_handle_create_booking(self):
         print("=== test_handle_create_booking ===")
@@ -63,7 +92,15 @@ class TestController(unittest.TestCase):
         day = date.day
         date = datetime.date(year, month, day)
         details = [contact_name, hour, minute, date]
+        with self.assertRaises(ValueError):
+            # not in the contacts yet
+            self.controller.handle_create_booking(details)
+        self.controller.add_contact(contact_name, "test_contact@email.com")
         self.assertTrue(self.controller.handle_create_booking(details))
+        booking, = self.controller.list_bookings()
+        self.assertEqual(booking.start, datetime.datetime(
+            year, month, day, hour, minute))
+        self.assertEqual(booking.contact, contact_name)
         with self.assertRaises(ValueError):
             self.controller.handle_create_booking(None)
 
@@ -90,6 +127,45 @@ class TestController(unittest.TestCase):
                 self.controller.create_booking_view, CreateBooking)
         self.controller.create_booking_view.tk.destroy()
 
+    def test_get_view_after_close(self):
+        print("=== test_get_view_after_close ===")
+        login_view = self.controller.handle_login_view()
+        view = self.controller.handle_add_contact_view()
+        view.hide()
+        self.assertFalse(view.visible)
+        self.assertIs(self.controller.handle_add_contact_view(), view)
+        self.assertTrue(view.visible)
+        view.tk.destroy()
+        login_view.tk.destroy()
+
+    def test_get_view_failure(self):
+        print("=== test_get_view_failure ===")
+        with self.assertRaises(ValueError):
+            self.controller.get_view("settings")
+
+    def test_prewarm_without_window(self):
+        print("=== test_prewarm_without_window ===")
+        self.assertEqual(self.controller.prewarm("create_booking"), ())
+        self.assertIsNone(self.controller.create_booking_view)
+        self.assertEqual(self.controller.view_timings, {})
+
+    def test_prewarm_after_login(self):
+        print("=== test_prewarm_after_login ===")
+        login_view = self.controller.handle_login_view()
+        self.assertIn("login", self.controller.view_timings)
+        self.assertEqual(self.controller.prewarm("create_booking"),
+                         ("create_booking",))
+        self.assertIsNone(self.controller.create_booking_view)
+        login_view.tk.update()
+        view = self.controller.create_booking_view
+        self.assertIsInstance(view, CreateBooking)
+        self.assertFalse(view.visible)
+        self.assertIn("create_booking", self.controller.view_timings)
+        self.assertIs(self.controller.handle_create_booking_view(), view)
+        self.assertTrue(view.visible)
+        view.tk.destroy()
+        login_view.tk.destroy()
+
     def tearDown(self):
         print("=== TestController tearDown ===")
         self.controller.login_view = None
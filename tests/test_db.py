@@ -1,7 +1,9 @@
 # tests/test_db.py
 import unittest
 import sqlite3
+import threading
 from src.db import db
+from src.utils import log
 
 
 class TestDb(unittest.TestCase):
@@ -162,6 +164,21 @@ class TestDb(unittest.TestCase):
         if self.db.connection:
             self.db.close()
 
+    def test_db_close_from_another_thread(self):
+        print("=== test_db_close_from_another_thread ===")
+        self.db.create_connection(self.db_name)
+        connection = self.db.connection
+        results = []
+        thread = threading.Thread(
+                target=lambda: results.append(self.db.close()))
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [True])
+        self.assertIsNone(self.db.connection)
+        self.assertIsNone(self.db.pool)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
     def test_db_get_users(self):
         print("=== test_db_get_users ===")
         self.db.create_connection(self.db_name)
@@ -176,6 +193,57 @@ class TestDb(unittest.TestCase):
         self.assertIsInstance(users, list)
         self.db.close()
 
+    def test_db_insert_many(self):
+        print("=== test_db_insert_many ===")
+        self.db.create_connection(self.db_name)
+        self.db.create_table(self.db.cursor, self.db.create_table_query(
+            "bulk_rows(id INTEGER PRIMARY KEY, value TEXT NOT NULL)"))
+        insert_query = "INSERT INTO bulk_rows(value) VALUES (?)"
+        events = []
+        hook = log.add_event_hook(
+                lambda event, fields, record: events.append((event, fields)))
+        try:
+            rows = ((f"value_{i}",) for i in range(25))
+            written = self.db.insert_many(
+                    self.db.cursor, insert_query, rows, chunk_size=10)
+            self.assertEqual(written, 25)
+            self.db.cursor.execute("SELECT COUNT(*) FROM bulk_rows")
+            self.assertEqual(self.db.cursor.fetchone()[0], 25)
+            self.assertEqual(
+                    [(event, fields["rows"]) for event, fields in events],
+                    [("insert_chunk", 10), ("insert_chunk", 10),
+                     ("insert_chunk", 5)])
+
+            # A failing chunk is rolled back and stops the run, earlier
+            # chunks are kept.
+            events.clear()
+            rows = [("ok",)] * 10 + [(None,)] + [("after",)] * 10
+            written = self.db.insert_many(
+                    self.db.cursor, insert_query, rows, chunk_size=10)
+            self.assertEqual(written, 10)
+            self.db.cursor.execute("SELECT COUNT(*) FROM bulk_rows")
+            self.assertEqual(self.db.cursor.fetchone()[0], 35)
+            self.assertEqual([event for event, _ in events],
+                             ["insert_chunk", "insert_chunk_failed"])
+            self.assertEqual(events[1][1]["chunk"], 2)
+        finally:
+            log.remove_sink(hook)
+
+        # chunk_size ValueError tests
+        raises_value_errors = [None, 0]
+        for invalid_value in raises_value_errors:
+            with self.subTest(
+                msg="Test values that raise a ValueError exception with the " +
+                "'chunk_size' parameter.",
+                value=invalid_value
+            ):
+                with self.assertRaises(ValueError):
+                    self.db.insert_many(
+                            self.db.cursor, insert_query, [], invalid_value)
+        self.db.cursor.execute("DROP TABLE bulk_rows")
+        self.db.commit()
+        self.db.close()
+
     def test_db_show_tables(self):
         print("=== test_db_show_tables ===")
         self.db.create_connection(self.db_name)
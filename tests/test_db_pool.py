@@ -0,0 +1,148 @@
+# tests/test_db_pool.py
+import unittest
+import os
+import sqlite3
+import tempfile
+import threading
+from src.db.pool import ConnectionPool
+from src.db import db
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        print("TestConnectionPool setUp")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "pool_test.db")
+        self.pool = ConnectionPool(self.db_name, size=2, timeout=0.2)
+        with self.pool.cursor() as cursor:
+            cursor.execute(
+                    "CREATE TABLE items(id INTEGER PRIMARY KEY, value TEXT)")
+
+    def test_create_pool_failure(self):
+        print("=== test_create_pool_failure ===")
+        raises_value_errors = [None, "", " "]
+        for invalid_value in raises_value_errors:
+            with self.subTest(
+                msg="Test values that raise a ValueError exception with the " +
+                "'db_name' parameter.",
+                value=invalid_value
+            ):
+                with self.assertRaises(ValueError):
+                    ConnectionPool(invalid_value)
+        raises_type_errors = [1, 2.2, [], {}, ()]
+        for invalid_value in raises_type_errors:
+            with self.subTest(
+                msg="Test values that raise a TypeError exception with the " +
+                "'db_name' parameter.",
+                value=invalid_value
+            ):
+                with self.assertRaises(TypeError):
+                    ConnectionPool(invalid_value)
+        with self.assertRaises(ValueError):
+            ConnectionPool(self.db_name, size=0)
+
+    def test_wal_journal_mode(self):
+        print("=== test_wal_journal_mode ===")
+        with self.pool.connection() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_nested_checkout_reuses_connection(self):
+        print("=== test_nested_checkout_reuses_connection ===")
+        with self.pool.connection() as outer:
+            with self.pool.connection() as inner:
+                self.assertIs(outer, inner)
+        # The connection went back to the pool and is handed out again.
+        with self.pool.connection() as conn:
+            self.assertIs(conn, outer)
+
+    def test_cursor_commit_and_rollback(self):
+        print("=== test_cursor_commit_and_rollback ===")
+        with self.pool.cursor() as cursor:
+            cursor.execute("INSERT INTO items(value) VALUES ('kept')")
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.pool.cursor() as cursor:
+                cursor.execute("INSERT INTO items(value) VALUES ('lost')")
+                cursor.execute("INSERT INTO items(id) VALUES (1)")
+        with self.pool.cursor() as cursor:
+            cursor.execute("SELECT value FROM items")
+            self.assertEqual(cursor.fetchall(), [("kept",)])
+
+    def test_checkout_timeout_when_exhausted(self):
+        print("=== test_checkout_timeout_when_exhausted ===")
+        held = []
+        ready = threading.Event()
+        done = threading.Event()
+
+        def hold_one():
+            conn = self.pool.checkout()
+            held.append(conn)
+            if len(held) == 2:
+                ready.set()
+            done.wait()
+            self.pool.release(conn)
+
+        workers = [threading.Thread(target=hold_one) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        self.assertTrue(ready.wait(2))
+        with self.assertRaises(TimeoutError):
+            self.pool.checkout()
+        done.set()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(set(map(id, held))), 2)
+
+    def test_concurrent_writers(self):
+        print("=== test_concurrent_writers ===")
+
+        def write(n):
+            for i in range(20):
+                with self.pool.cursor() as cursor:
+                    cursor.execute(
+                            "INSERT INTO items(value) VALUES (?)",
+                            (f"{n}-{i}",))
+
+        workers = [
+                threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        with self.pool.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM items")
+            self.assertEqual(cursor.fetchone()[0], 80)
+
+    def test_release_from_wrong_thread(self):
+        print("=== test_release_from_wrong_thread ===")
+        conn = sqlite3.connect(":memory:")
+        with self.assertRaises(ValueError):
+            self.pool.release(conn)
+        conn.close()
+
+    def test_db_module_wrappers(self):
+        print("=== test_db_module_wrappers ===")
+        db.create_connection(self.db_name)
+        self.assertIsInstance(db.get_pool(), ConnectionPool)
+        with db.pooled_cursor() as cursor:
+            cursor.execute("INSERT INTO items(value) VALUES ('wrapped')")
+        db.cursor.execute("SELECT value FROM items")
+        self.assertEqual(db.cursor.fetchall(), [("wrapped",)])
+        self.assertTrue(db.close())
+        self.assertIsNone(db.get_pool())
+        with self.assertRaises(RuntimeError):
+            with db.pooled_cursor():
+                pass
+
+    def tearDown(self):
+        print("TestConnectionPool tearDown")
+        if db.connection:
+            db.close()
+        self.pool.close()
+        self.pool = None
+        self.tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,353 @@
+# tests/test_db_repository.py
+import unittest
+import sqlite3
+from datetime import datetime
+import src.db.repository as repository
+from src.contact.contact import Contact
+from src.booking.booking import Booking, PENDING, CONFIRMED, DECLINED, \
+        EXPIRED
+from src.booking.recurrence import RecurrenceRule, DAILY
+
+
+class TestRepository(unittest.TestCase):
+
+    def setUp(self):
+        print("TestRepository setUp")
+        self.conn = sqlite3.connect(":memory:")
+        self.cursor = self.conn.cursor()
+        repository.create_tables(self.cursor)
+        self.user_id = 1
+
+    def make_bookings(self):
+        return [
+                Booking("Dentist", datetime(2024, 6, 3), (9, 30),
+                        "Dr Smith", "Check-up"),
+                Booking("Lunch", datetime(2024, 6, 3), (12, 0),
+                        "My Friend", "Catch up"),
+                Booking("Review", datetime(2024, 6, 5), (15, 15),
+                        "Boss", "Quarterly review"),
+                ]
+
+    def test_create_tables(self):
+        print("=== test_create_tables ===")
+        for table in ("users", "contacts", "bookings"):
+            self.cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' " +
+                    "AND name=?", (table,))
+            self.assertIsNotNone(self.cursor.fetchone())
+        self.cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='index' " +
+                "AND name LIKE 'idx_%'")
+        indexes = {row[0] for row in self.cursor.fetchall()}
+        self.assertEqual(indexes, {
+            "idx_users_username", "idx_contacts_user_email",
+            "idx_contacts_user_lower_email", "idx_contacts_name",
+            "idx_bookings_user_uid", "idx_bookings_user_date_time",
+            "idx_bookings_user_revision",
+            "idx_booking_deletions_user_revision",
+            "idx_bookings_status_expires_at",
+            "idx_outbox_status_next_attempt"})
+
+    def test_booking_revisions(self):
+        print("=== test_booking_revisions ===")
+        repository.save_bookings(self.cursor, 1, [
+            Booking("First", datetime(2024, 5, 1), (9, 0)),
+            Booking("Second", datetime(2024, 5, 1), (11, 0))])
+        self.cursor.execute("SELECT title, revision FROM bookings")
+        self.assertEqual(self.cursor.fetchall(),
+                         [("First", 1), ("Second", 2)])
+        self.cursor.execute(
+                "UPDATE bookings SET title = 'Renamed' WHERE title = 'First'")
+        self.cursor.execute("DELETE FROM bookings WHERE title = 'Second'")
+        self.cursor.execute("SELECT title, revision FROM bookings")
+        self.assertEqual(self.cursor.fetchall(), [("Renamed", 3)])
+        self.cursor.execute("SELECT user_id, revision FROM booking_deletions")
+        self.assertEqual(self.cursor.fetchall(), [(1, 4)])
+        for column, value in (("status", "confirmed"),
+                              ("expires_at", "2024-05-01 09:00"),
+                              ("rrule", "FREQ=DAILY")):
+            with self.subTest(column=column):
+                self.cursor.execute(
+                        f"UPDATE bookings SET {column} = ?", (value,))
+                self.cursor.execute("SELECT MAX(revision) FROM bookings")
+                revision = self.cursor.fetchone()[0]
+                self.cursor.execute(
+                        "SELECT value FROM sync_state WHERE name = 'bookings'")
+                self.assertEqual(self.cursor.fetchone()[0], revision)
+
+    def test_update_trigger_upgrade(self):
+        print("=== test_update_trigger_upgrade ===")
+        # databases made before status was tracked have the old trigger
+        self.cursor.execute("DROP TRIGGER trg_bookings_update_revision")
+        self.cursor.execute(
+                "CREATE TRIGGER trg_bookings_update_revision AFTER UPDATE " +
+                "OF title ON bookings BEGIN SELECT 1; END")
+        repository.create_tables(self.cursor)
+        repository.save_bookings(self.cursor, 1, [
+            Booking("First", datetime(2024, 5, 1), (9, 0))])
+        self.cursor.execute("UPDATE bookings SET status = 'declined'")
+        self.cursor.execute("SELECT revision FROM bookings")
+        self.assertEqual(self.cursor.fetchone()[0], 2)
+
+    def test_accounts(self):
+        print("=== test_accounts ===")
+        user_id = repository.create_account(
+                self.cursor, "account", "hash-1", "account@email.com")
+        self.assertEqual(repository.find_account(self.cursor, "account"),
+                         (user_id, "account", "hash-1", "account@email.com"))
+        self.assertIsNone(repository.find_account(self.cursor, "nobody"))
+        self.assertEqual(
+                repository.update_password(self.cursor, user_id, "hash-2"), 1)
+        self.assertEqual(
+                repository.find_account(self.cursor, "account")[2], "hash-2")
+        with self.assertRaises(ValueError):
+            repository.create_account(self.cursor, "", "hash", "a@b.com")
+        for username, email in (("account", "other@email.com"),
+                                ("other", "account@email.com")):
+            with self.subTest(username=username, email=email):
+                with self.assertRaises(ValueError):
+                    repository.create_account(
+                            self.cursor, username, "hash", email)
+
+    def test_unique_username_index_upgrade(self):
+        print("=== test_unique_username_index_upgrade ===")
+        # databases made before usernames were unique have a plain index
+        self.cursor.execute("DROP INDEX idx_users_username")
+        self.cursor.execute(
+                "CREATE INDEX idx_users_username ON users(username)")
+        repository.create_tables(self.cursor)
+        self.cursor.execute("PRAGMA index_list(users)")
+        unique = {row[1]: row[2] for row in self.cursor.fetchall()}
+        self.assertEqual(unique["idx_users_username"], 1)
+
+    def test_save_and_load_contacts(self):
+        print("=== test_save_and_load_contacts ===")
+        contacts = [Contact(f"contact_{i}", f"contact_{i}@email.com")
+                    for i in range(7)]
+        written = repository.save_contacts(
+                self.cursor, self.user_id, iter(contacts), chunk_size=3)
+        self.assertEqual(written, 7)
+        loaded = list(repository.load_contacts(
+            self.cursor, self.user_id, batch_size=2))
+        self.assertEqual(len(loaded), 7)
+        self.assertEqual(
+                [(c.id, c.name, c.email) for c in loaded],
+                [(c.id, c.name, c.email) for c in contacts])
+        # Saving the same contacts again replaces instead of duplicating
+        repository.save_contacts(self.cursor, self.user_id, contacts)
+        self.assertEqual(
+                len(list(repository.load_contacts(
+                    self.cursor, self.user_id))), 7)
+        # Other users' contacts are not loaded
+        self.assertEqual(list(repository.load_contacts(self.cursor, 2)), [])
+
+    def test_find_contact(self):
+        print("=== test_find_contact ===")
+        contact = Contact("Test Contact", "test@email.com")
+        repository.save_contacts(self.cursor, self.user_id, [contact])
+        found = repository.find_contact(
+                self.cursor, self.user_id, "test@email.com")
+        self.assertEqual(found.id, contact.id)
+        self.assertIsNone(repository.find_contact(
+            self.cursor, self.user_id, "missing@email.com"))
+        by_name = repository.find_contacts_by_name(
+                self.cursor, self.user_id, "Test Contact")
+        self.assertEqual([c.id for c in by_name], [contact.id])
+
+    def test_save_and_load_bookings(self):
+        print("=== test_save_and_load_bookings ===")
+        bookings = self.make_bookings()
+        written = repository.save_bookings(
+                self.cursor, self.user_id, reversed(bookings))
+        self.assertEqual(written, 3)
+        loaded = list(repository.load_bookings(self.cursor, self.user_id))
+        self.assertEqual(
+                [repr(b) for b in loaded], [repr(b) for b in bookings])
+        self.assertEqual([b.id for b in loaded], [b.id for b in bookings])
+
+    def test_save_bookings_twice(self):
+        print("=== test_save_bookings_twice ===")
+        bookings = self.make_bookings()
+        repository.save_bookings(self.cursor, self.user_id, bookings)
+        ids = [booking.id for booking in bookings]
+        self.assertNotIn(None, ids)
+        bookings[0].title = "Dentist again"
+        self.assertEqual(repository.save_bookings(
+                self.cursor, self.user_id, bookings), 3)
+        loaded = list(repository.load_bookings(self.cursor, self.user_id))
+        self.assertEqual([b.id for b in loaded], ids)
+        self.assertEqual(loaded[0].title, "Dentist again")
+        # loaded bookings are updated in place too
+        loaded[1].description = "Changed"
+        repository.save_bookings(self.cursor, self.user_id, loaded)
+        self.cursor.execute("SELECT COUNT(*) FROM bookings")
+        self.assertEqual(self.cursor.fetchone()[0], 3)
+        self.assertTrue(repository.set_booking_status(
+                self.cursor, self.user_id, loaded[2].id, CONFIRMED))
+        with self.assertRaises(AttributeError):
+            loaded[0].id = 99
+
+    def test_save_bookings_of_another_user(self):
+        print("=== test_save_bookings_of_another_user ===")
+        bookings = self.make_bookings()
+        repository.save_bookings(self.cursor, self.user_id, bookings)
+        bookings[0].title = "Taken over"
+        # ids of another user's rows don't move or change them
+        self.assertEqual(repository.save_bookings(
+                self.cursor, self.user_id + 1, bookings), 0)
+        self.assertEqual(
+                list(repository.load_bookings(self.cursor, self.user_id + 1)),
+                [])
+        loaded = list(repository.load_bookings(self.cursor, self.user_id))
+        self.assertEqual([b.id for b in loaded], [b.id for b in bookings])
+        self.assertEqual(loaded[0].title, "Dentist")
+
+    def test_save_bookings_failed_chunk(self):
+        print("=== test_save_bookings_failed_chunk ===")
+        bookings = self.make_bookings()
+        bookings[2]._title = None  # breaks NOT NULL
+        written = repository.save_bookings(
+                self.cursor, self.user_id, bookings, chunk_size=2)
+        self.assertEqual(written, 2)
+        self.assertIsNotNone(bookings[1].id)
+        self.assertIsNone(bookings[2].id)
+
+    def test_booking_status(self):
+        print("=== test_booking_status ===")
+        bookings = self.make_bookings()
+        bookings[0].expires_at = datetime(2024, 6, 1, 9, 30)
+        bookings[1].status = CONFIRMED
+        repository.save_bookings(self.cursor, self.user_id, bookings)
+        loaded = list(repository.load_bookings(self.cursor, self.user_id))
+        self.assertEqual([b.status for b in loaded],
+                         [PENDING, CONFIRMED, PENDING])
+        self.assertEqual(loaded[0].expires_at, datetime(2024, 6, 1, 9, 30))
+        self.assertIsNone(loaded[2].expires_at)
+        self.assertEqual(
+                repository.count_bookings_by_status(self.cursor),
+                {PENDING: 2, CONFIRMED: 1, DECLINED: 0, EXPIRED: 0})
+        first, second, third = (booking.id for booking in loaded)
+        for booking_id, status, changed in (
+                (first, CONFIRMED, True), (first, CONFIRMED, False),
+                (first, PENDING, False), (second, DECLINED, True),
+                (second, CONFIRMED, False), (third, EXPIRED, True),
+                (third, DECLINED, False), (999, CONFIRMED, False)):
+            with self.subTest(booking_id=booking_id, status=status):
+                self.assertEqual(repository.set_booking_status(
+                        self.cursor, self.user_id, booking_id, status),
+                        changed)
+        self.assertFalse(repository.set_booking_status(
+                self.cursor, 2, first, DECLINED))
+        self.assertEqual(
+                repository.count_bookings_by_status(self.cursor),
+                {PENDING: 0, CONFIRMED: 1, DECLINED: 1, EXPIRED: 1})
+        self.assertEqual(repository.count_bookings_by_status(
+                self.cursor, 2)[CONFIRMED], 0)
+
+    def test_recurring_booking(self):
+        print("=== test_recurring_booking ===")
+        booking = Booking("Standup", datetime(2024, 6, 3), (9, 0))
+        booking.recurrence = RecurrenceRule(
+                DAILY, count=5, exceptions=[datetime(2024, 6, 4, 9, 0)])
+        repository.save_bookings(self.cursor, self.user_id, [booking])
+        self.cursor.execute("SELECT COUNT(*), rrule FROM bookings")
+        self.assertEqual(self.cursor.fetchone(),
+                         (1, "FREQ=DAILY;COUNT=5;EXDATE=20240604T090000"))
+        loaded, = repository.load_bookings(self.cursor, self.user_id)
+        self.assertEqual(loaded.recurrence, booking.recurrence)
+        self.assertEqual(len(list(loaded.occurrences())), 4)
+
+    def test_expire_bookings(self):
+        print("=== test_expire_bookings ===")
+        bookings = []
+        for day in range(1, 11):
+            booking = Booking("Meeting", datetime(2024, 6, day), (9, 0))
+            booking.expires_at = datetime(2024, 5, day, 12, 0)
+            bookings.append(booking)
+        bookings[0].status = CONFIRMED
+        bookings.append(Booking("No expiry", datetime(2024, 6, 1), (9, 0)))
+        repository.save_bookings(self.cursor, self.user_id, bookings)
+        self.assertEqual(repository.expire_bookings(
+                self.cursor, datetime(2024, 5, 7, 12, 0), batch_size=2), 6)
+        self.assertEqual(
+                repository.count_bookings_by_status(self.cursor),
+                {PENDING: 4, CONFIRMED: 1, DECLINED: 0, EXPIRED: 6})
+        self.assertEqual(repository.expire_bookings(
+                self.cursor, datetime(2024, 5, 7, 12, 0)), 0)
+        self.cursor.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM bookings " +
+                "WHERE status = 'pending' AND expires_at <= ?", ("x",))
+        plan = " ".join(row[-1] for row in self.cursor.fetchall())
+        self.assertIn("idx_bookings_status_expires_at", plan)
+
+    def test_save_bookings_with_tuple_dates(self):
+        print("=== test_save_bookings_with_tuple_dates ===")
+        booking = Booking(_date=(2024, 7, 1), _time=(8, 5))
+        repository.save_bookings(self.cursor, self.user_id, [booking])
+        loaded = repository.find_bookings(
+                self.cursor, self.user_id, (2024, 7, 1))
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].date, datetime(2024, 7, 1))
+        self.assertEqual(loaded[0].time, (8, 5))
+
+    def test_find_bookings(self):
+        print("=== test_find_bookings ===")
+        repository.save_bookings(
+                self.cursor, self.user_id, self.make_bookings())
+        on_day = repository.find_bookings(
+                self.cursor, self.user_id, datetime(2024, 6, 3))
+        self.assertEqual([b.title for b in on_day], ["Dentist", "Lunch"])
+        at_time = repository.find_bookings(
+                self.cursor, self.user_id, datetime(2024, 6, 3), (12, 0))
+        self.assertEqual([b.title for b in at_time], ["Lunch"])
+        between = repository.find_bookings_between(
+                self.cursor, self.user_id,
+                datetime(2024, 6, 4), datetime(2024, 6, 30))
+        self.assertEqual([b.title for b in between], ["Review"])
+        # The lookup is served by the index, not a table scan
+        self.cursor.execute(
+                "EXPLAIN QUERY PLAN " + repository.SELECT_BOOKINGS +
+                " WHERE user_id = ? AND date = ?", (1, "2024-06-03"))
+        plan = " ".join(str(row[-1]) for row in self.cursor.fetchall())
+        self.assertIn("idx_bookings_user_date_time", plan)
+
+    def test_save_and_load_user(self):
+        print("=== test_save_and_load_user ===")
+        from src.user.user import User
+        user = User()
+        user.add_contact(Contact("Test Contact", "test@email.com"))
+        for booking in self.make_bookings():
+            user.add_booking(booking)
+        self.assertEqual(
+                repository.save_user(self.cursor, self.user_id, user), (1, 3))
+        user.reset()
+        repository.load_user(self.cursor, self.user_id, user)
+        self.assertEqual(len(user.contacts), 1)
+        self.assertEqual(len(user.bookings), 3)
+        self.assertEqual(len(user.calendar), 3)
+        user.reset()
+
+    def test_conversion_failure(self):
+        print("=== test_conversion_failure ===")
+        raises_type_errors = ["2024-06-03", 2024, [2024, 6, 3], (2024, 6)]
+        for invalid_value in raises_type_errors:
+            with self.subTest(
+                    msg="Test values that raise a TypeError exception " +
+                    "when converting a date.",
+                    value=invalid_value):
+                with self.assertRaises(TypeError):
+                    repository.date_to_text(invalid_value)
+        with self.assertRaises(TypeError):
+            repository.time_to_text("12:30")
+        with self.assertRaises(ValueError):
+            list(repository.load_contacts(self.cursor, None))
+
+    def tearDown(self):
+        print("TestRepository tearDown")
+        self.cursor.close()
+        self.conn.close()
+        self.conn = None
+
+
+if __name__ == '__main__':
+    unittest.main()
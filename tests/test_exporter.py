@@ -0,0 +1,162 @@
+# tests/test_exporter.py
+import io
+import sqlite3
+import unittest
+from datetime import date, datetime
+import src.db.repository as repository
+from src.booking.booking import Booking, PENDING, CONFIRMED, DECLINED
+from src.booking.recurrence import RecurrenceRule, WEEKLY
+from src.exporter import exporter
+from src.importer import importer
+
+
+class TestExporter(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/exporter/exporter.py'")
+        self.connection = sqlite3.connect(":memory:")
+        self.cursor = self.connection.cursor()
+        repository.create_tables(self.cursor)
+        repository.save_bookings(self.cursor, 1, [
+            Booking("Catch up, coffee", datetime(2024, 5, 1), (9, 30),
+                    "Jane", "Line one\nline two", 30),
+            Booking("Planning", datetime(2024, 5, 2), (14, 0), "John",
+                    "Quarterly; all day", 90)])
+        repository.save_bookings(self.cursor, 2, [
+            Booking("Other user", datetime(2024, 5, 1), (9, 30))])
+
+    def events(self, text):
+        return text.count("BEGIN:VEVENT")
+
+    def test_full_export(self):
+        print("=== test_full_export ===")
+        output = io.StringIO()
+        token = exporter.export_bookings(self.cursor, 1, output)
+        text = output.getvalue()
+        self.assertEqual(token, 3)
+        self.assertTrue(text.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(text.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(self.events(text), 2)
+        self.assertIn("DTSTART:20240501T093000\r\n", text)
+        self.assertIn("DURATION:PT90M\r\n", text)
+        self.assertIn("SUMMARY:Catch up\\, coffee\r\n", text)
+        self.assertIn("DESCRIPTION:Line one\\nline two\r\n", text)
+        self.assertIn("X-APPGENIE-SYNC-TOKEN:3\r\n", text)
+
+    def test_incremental_export(self):
+        print("=== test_incremental_export ===")
+        token = exporter.export_bookings(self.cursor, 1, io.StringIO())
+        output = io.StringIO()
+        self.assertEqual(
+                exporter.export_bookings(self.cursor, 1, output, token),
+                token)
+        self.assertEqual(self.events(output.getvalue()), 0)
+        self.cursor.execute(
+                "UPDATE bookings SET title = 'Renamed' WHERE title = ?",
+                ("Planning",))
+        self.cursor.execute(
+                "DELETE FROM bookings WHERE title = ?", ("Catch up, coffee",))
+        output = io.StringIO()
+        new_token = exporter.export_bookings(self.cursor, 1, output, token)
+        text = output.getvalue()
+        self.assertEqual(new_token, token + 2)
+        self.assertEqual(self.events(text), 2)
+        self.assertIn("SUMMARY:Renamed\r\n", text)
+        self.assertIn("STATUS:TENTATIVE\r\n", text)
+        self.assertEqual(text.count("STATUS:CANCELLED"), 1)
+
+    def test_declined_bookings_are_cancelled(self):
+        print("=== test_declined_bookings_are_cancelled ===")
+        token = exporter.export_bookings(self.cursor, 1, io.StringIO())
+        first, second = repository.load_bookings(self.cursor, 1)
+        repository.set_booking_status(self.cursor, 1, first.id, CONFIRMED)
+        repository.set_booking_status(self.cursor, 1, second.id, DECLINED)
+        output = io.StringIO()
+        self.assertEqual(
+                exporter.export_bookings(self.cursor, 1, output, token),
+                token + 2)
+        text = output.getvalue()
+        self.assertEqual(self.events(text), 2)
+        self.assertIn("STATUS:CONFIRMED\r\n", text)
+        self.assertIn("STATUS:CANCELLED\r\n", text)
+
+    def test_streams_in_pieces(self):
+        print("=== test_streams_in_pieces ===")
+        pieces = list(exporter.iter_calendar(self.cursor, 1, batch_size=1))
+        # header, one piece per booking, footer
+        self.assertEqual(len(pieces), 4)
+
+    def test_fold_line(self):
+        print("=== test_fold_line ===")
+        line = "DESCRIPTION:" + "é" * 100
+        folded = exporter.fold_line(line)
+        parts = folded[:-2].split("\r\n")
+        self.assertTrue(all(len(part.encode()) <= 75 for part in parts))
+        self.assertEqual("".join(part[1:] if i else part
+                                 for i, part in enumerate(parts)), line)
+        self.assertEqual(exporter.fold_line("SHORT:x"), "SHORT:x\r\n")
+
+    def test_round_trip(self):
+        print("=== test_round_trip ===")
+        output = io.StringIO()
+        exporter.export_bookings(self.cursor, 1, output)
+        output.seek(0)
+        counts = importer.import_bookings(self.cursor, 3, output)
+        self.assertEqual(counts["imported"], 2)
+        original = list(repository.load_bookings(self.cursor, 1))
+        imported = list(repository.load_bookings(self.cursor, 3))
+        self.assertEqual([repr(b) for b in imported],
+                         [repr(b) for b in original])
+        self.assertEqual([b.duration for b in imported], [30, 90])
+
+    def test_status_round_trip(self):
+        print("=== test_status_round_trip ===")
+        first, second = repository.load_bookings(self.cursor, 1)
+        repository.set_booking_status(self.cursor, 1, second.id, DECLINED)
+        output = io.StringIO()
+        exporter.export_bookings(self.cursor, 1, output)
+        output.seek(0)
+        importer.import_bookings(self.cursor, 3, output)
+        imported = list(repository.load_bookings(self.cursor, 3))
+        self.assertEqual([b.status for b in imported], [PENDING, DECLINED])
+        # a tentative event waits for the contact again
+        self.assertIsNotNone(imported[0].expires_at)
+        self.assertIsNone(imported[1].expires_at)
+        output = io.StringIO()
+        exporter.export_bookings(self.cursor, 3, output)
+        self.assertIn("STATUS:CANCELLED\r\n", output.getvalue())
+
+    def test_recurring_round_trip(self):
+        print("=== test_recurring_round_trip ===")
+        standup = Booking("Standup", datetime(2024, 5, 6), (9, 0),
+                          _duration=15)
+        standup.recurrence = RecurrenceRule(
+                WEEKLY, count=10, exceptions=[datetime(2024, 5, 13, 9, 0),
+                                              date(2024, 5, 20)])
+        repository.save_bookings(self.cursor, 4, [standup])
+        output = io.StringIO()
+        exporter.export_bookings(self.cursor, 4, output)
+        text = output.getvalue()
+        self.assertEqual(self.events(text), 1)
+        self.assertIn("RRULE:FREQ=WEEKLY;COUNT=10\r\n", text)
+        self.assertIn("EXDATE:20240513T090000\r\n", text)
+        self.assertIn("EXDATE;VALUE=DATE:20240520\r\n", text)
+        output.seek(0)
+        importer.import_bookings(self.cursor, 5, output)
+        imported, = repository.load_bookings(self.cursor, 5)
+        self.assertEqual(imported.recurrence, standup.recurrence)
+
+    def test_failure(self):
+        print("=== test_failure ===")
+        with self.assertRaises(TypeError):
+            list(exporter.iter_calendar(self.cursor, "1"))
+        with self.assertRaises(TypeError):
+            list(exporter.iter_calendar(self.cursor, 1, since="3"))
+
+    def tearDown(self):
+        print("End of testing 'src/exporter/exporter.py'")
+        self.connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# tests/test_import_time.py
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loose budget in microseconds, the modules below load in well under 100ms,
+# this only catches something heavy being imported again.
+IMPORT_BUDGET_US = 500000
+GUI_MODULES = ("tkinter", "tkcalendar", "babel")
+
+
+def import_times(module_name):
+    """
+        Runs 'python -X importtime -c "import module_name"' in a fresh
+        interpreter and returns {module: cumulative microseconds}.
+    """
+    completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c",
+             f"import {module_name}"],
+            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing import times")
+        self.modules = ["src.user.user", "src.db.db",
+                        "src.controller.controller"]
+
+    def test_no_gui_imports(self):
+        print("=== test_no_gui_imports ===")
+        for module_name in self.modules:
+            with self.subTest(
+                    msg="Test that the module loads without any GUI module.",
+                    value=module_name):
+                times = import_times(module_name)
+                for gui_module in GUI_MODULES:
+                    self.assertNotIn(gui_module, times)
+
+    def test_import_budget(self):
+        print("=== test_import_budget ===")
+        for module_name in self.modules:
+            with self.subTest(
+                    msg="Test that the module loads within the budget.",
+                    value=module_name):
+                times = import_times(module_name)
+                self.assertLess(times[module_name], IMPORT_BUDGET_US)
+
+    def test_views_load_on_demand(self):
+        print("=== test_views_load_on_demand ===")
+        completed = subprocess.run(
+                [sys.executable, "-c",
+                 "import sys, src.controller.controller as c; "
+                 "c.Login; print('tkinter' in sys.modules)"],
+                cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(completed.stdout.strip(), "True")
+
+    def tearDown(self):
+        print("End of testing import times")
+        self.modules = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+# tests/test_importer.py
+import csv
+import io
+import os
+import sqlite3
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime, timezone
+import src.db.repository as repository
+from src.booking.booking import PENDING, CONFIRMED, DECLINED
+from src.importer import importer
+
+ICS = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VEVENT\r
+UID:1@test\r
+SUMMARY:Catch up\\, coffee\r
+DTSTART:20240501T093000\r
+DTEND:20240501T100000\r
+ATTENDEE;CN="Jane: Doe";ROLE=REQ-PARTICIPANT:mailto:jane@email.com\r
+DESCRIPTION:First line\\nsecond line that is folded\r
+  across two lines\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:No start\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:Planning\r
+DTSTART:20240502T140000Z\r
+DURATION:PT1H30M\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:Bad date\r
+DTSTART:20241340T140000\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+class TestImporter(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/importer/importer.py'")
+        self.connection = sqlite3.connect(":memory:")
+        self.cursor = self.connection.cursor()
+        repository.create_tables(self.cursor)
+
+    def make_csv(self, rows):
+        f = io.StringIO()
+        writer = csv.writer(f)
+        writer.writerow(["Email", "Name"])
+        writer.writerows(rows)
+        f.seek(0)
+        return f
+
+    def test_chunked(self):
+        print("=== test_chunked ===")
+        self.assertEqual(list(importer.chunked(range(5), 2)),
+                         [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(importer.chunked([], 2)), [])
+
+    def test_import_contacts(self):
+        print("=== test_import_contacts ===")
+        source = self.make_csv([
+                ["jane@email.com", "Jane"],
+                ["not-an-email", "Bad Email"],
+                [],
+                ["john@email.com", " "],
+                ["john@email.com", "John"],
+                ])
+        rejects = io.StringIO()
+        counts = importer.import_contacts(
+                self.cursor, 1, source, rejects, chunk_size=2)
+        self.assertEqual(counts, {"read": 4, "imported": 2, "skipped": 0,
+                                  "rejected": 2, "failed": 0})
+        contacts = list(repository.load_contacts(self.cursor, 1))
+        self.assertEqual(sorted(c.name for c in contacts), ["Jane", "John"])
+        rows = list(csv.reader(io.StringIO(rejects.getvalue())))
+        self.assertEqual(rows[0], list(importer.REJECTS_HEADER))
+        self.assertEqual([row[0] for row in rows[1:]], ["3", "5"])
+        self.assertEqual(rows[1][1], "Invalid 'email' format.")
+
+    def test_missing_column(self):
+        print("=== test_missing_column ===")
+        with self.assertRaises(ValueError):
+            importer.import_contacts(
+                    self.cursor, 1, io.StringIO("name,phone\nJane,123\n"))
+
+    def test_import_bookings(self):
+        print("=== test_import_bookings ===")
+        rejects = io.StringIO()
+        counts = importer.import_bookings(
+                self.cursor, 1, io.StringIO(ICS), rejects)
+        self.assertEqual(counts, {"read": 4, "imported": 2, "skipped": 0,
+                                  "rejected": 2, "failed": 0})
+        bookings = list(repository.load_bookings(self.cursor, 1))
+        first, second = bookings
+        self.assertEqual(first.title, "Catch up, coffee")
+        self.assertEqual(first.time, (9, 30))
+        self.assertEqual(first.duration, 30)
+        self.assertEqual(first.contact, "Jane: Doe")
+        self.assertEqual(first.description,
+                         "First line\nsecond line that is folded across " +
+                         "two lines")
+        self.assertEqual(second.duration, 90)
+        self.assertEqual(second.contact, importer.DEFAULT_CONTACT)
+        errors = [row[1] for row in
+                  csv.reader(io.StringIO(rejects.getvalue()))][1:]
+        self.assertEqual(errors[0], "VEVENT has no DTSTART.")
+
+    def test_import_twice(self):
+        print("=== test_import_twice ===")
+        rows = [["jane@email.com", "Jane"], ["JANE@email.com", "jane"],
+                ["jane@email.com", "Jane Doe"]]
+        first = importer.import_contacts(self.cursor, 1, self.make_csv(rows))
+        second = importer.import_contacts(self.cursor, 1, self.make_csv(rows))
+        other = importer.import_contacts(self.cursor, 2, self.make_csv(rows))
+        self.assertEqual((first["imported"], first["skipped"]), (2, 1))
+        self.assertEqual((second["imported"], second["skipped"]), (0, 3))
+        self.assertEqual(other["imported"], 2)
+        self.assertEqual(
+                sorted(c.name for c in repository.load_contacts(
+                    self.cursor, 1)), ["Jane", "Jane Doe"])
+        importer.import_bookings(self.cursor, 1, io.StringIO(ICS))
+        ids = [b.id for b in repository.load_bookings(self.cursor, 1)]
+        # the event with a UID is updated, the one without is added again
+        counts = importer.import_bookings(
+                self.cursor, 1, io.StringIO(ICS.replace(
+                    "Catch up\\, coffee", "Catch up")))
+        self.assertEqual(counts["imported"], 2)
+        bookings = list(repository.load_bookings(self.cursor, 1))
+        self.assertEqual(len(bookings), 3)
+        self.assertEqual(bookings[0].id, ids[0])
+        self.assertEqual(bookings[0].title, "Catch up")
+        # another user importing the same UID gets a booking of their own
+        importer.import_bookings(self.cursor, 2, io.StringIO(ICS))
+        self.assertEqual(
+                len(list(repository.load_bookings(self.cursor, 1))), 3)
+        self.assertEqual(
+                len(list(repository.load_bookings(self.cursor, 2))), 2)
+
+    def test_failed_chunk(self):
+        print("=== test_failed_chunk ===")
+        self.cursor.execute(
+                "CREATE TRIGGER refuse_planning BEFORE INSERT ON bookings " +
+                "WHEN NEW.title = 'Planning' " +
+                "BEGIN SELECT RAISE(ABORT, 'refused'); END")
+        counts = importer.import_bookings(
+                self.cursor, 1, io.StringIO(ICS), chunk_size=2)
+        self.assertEqual(counts, {"read": 4, "imported": 1, "skipped": 0,
+                                  "rejected": 2, "failed": 1})
+        self.assertEqual(
+                [b.title for b in repository.load_bookings(self.cursor, 1)],
+                ["Catch up, coffee"])
+
+    def test_time_zones(self):
+        print("=== test_time_zones ===")
+        # (value, params, the same time in UTC)
+        for value, params, utc in (
+                ("20240501T073000Z", None, (7, 30)),
+                ("20240501T093000", {"TZID": "Europe/Paris"}, (7, 30)),
+                ("20240101T093000", {"TZID": "Europe/Paris"}, (8, 30)),
+                # a UTC time has no TZID
+                ("20240501T093000Z", {"TZID": "Europe/Paris"}, (9, 30))):
+            with self.subTest(value=value, params=params):
+                expected = datetime.strptime(value[:9], "%Y%m%dT").replace(
+                        hour=utc[0], minute=utc[1], tzinfo=timezone.utc)
+                self.assertEqual(
+                        importer.parse_ics_datetime(value, params),
+                        expected.astimezone().replace(tzinfo=None))
+        self.assertEqual(importer.parse_ics_datetime("20240501T093000"),
+                         datetime(2024, 5, 1, 9, 30))
+        self.assertEqual(importer.parse_ics_datetime("20240501"),
+                         datetime(2024, 5, 1))
+        with self.assertRaises(ValueError):
+            importer.parse_ics_datetime(
+                    "20240501T093000", {"TZID": "Nowhere/Special"})
+
+    def test_event_status(self):
+        print("=== test_event_status ===")
+        event = {"SUMMARY": ({}, "Meeting"),
+                 "DTSTART": ({}, "20240501T093000")}
+        for status, expected in ((None, CONFIRMED),
+                                 ("TENTATIVE", PENDING),
+                                 ("confirmed", CONFIRMED),
+                                 ("CANCELLED", DECLINED)):
+            with self.subTest(status=status):
+                if status is not None:
+                    event["STATUS"] = ({}, status)
+                record = importer.event_to_record(event)
+                self.assertEqual(record["status"], expected)
+                self.assertEqual(record["expires_at"] is None,
+                                 expected != PENDING)
+        event["STATUS"] = ({}, "DRAFT")
+        with self.assertRaises(ValueError):
+            importer.event_to_record(event)
+
+    def test_parse_helpers(self):
+        print("=== test_parse_helpers ===")
+        self.assertEqual(importer.parse_ics_duration("P1DT2H"), 26 * 60)
+        self.assertEqual(importer.parse_ics_duration("PT45M"), 45)
+        self.assertEqual(importer.parse_ics_duration("P1W"), 7 * 24 * 60)
+        for invalid_value in ["P", "1H", "PT1X"]:
+            with self.subTest(
+                    msg="Test values that will raise a ValueError exception.",
+                    value=invalid_value):
+                with self.assertRaises(ValueError):
+                    importer.parse_ics_duration(invalid_value)
+        self.assertEqual(
+                importer.parse_property('ATTENDEE;CN="A:B":mailto:a@b.c'),
+                ("ATTENDEE", {"CN": "A:B"}, "mailto:a@b.c"))
+
+    def test_import_from_path(self):
+        print("=== test_import_from_path ===")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, "contacts.csv")
+            rejects = os.path.join(tmp_dir, "rejects.csv")
+            with open(source, "w", newline="") as f:
+                f.write("name,email\nJane,jane@email.com\nBad,bad\n")
+            counts = importer.import_contacts(
+                    self.cursor, 1, source, rejects)
+            with open(rejects) as f:
+                self.assertEqual(len(f.readlines()), 2)
+        self.assertEqual(counts["imported"], 1)
+
+    def test_memory_does_not_grow_with_file_size(self):
+        print("=== test_memory_does_not_grow_with_file_size ===")
+
+        def rows(count):
+            for i in range(count):
+                yield (f"Contact {i}",
+                       f"contact{i}@email.com" if i % 10 else "bad")
+
+        def peak(count):
+            records = ((i, {"name": name, "email": email})
+                       for i, (name, email) in enumerate(rows(count)))
+            tracemalloc.start()
+            importer.run_import(
+                    self.cursor, 1, records, importer.validate_contact_chunk,
+                    repository.IMPORT_CONTACT, io.StringIO(), chunk_size=200)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak
+
+        small = peak(2000)
+        large = peak(20000)
+        self.assertLess(large, small * 2)
+
+    def tearDown(self):
+        print("End of testing 'src/importer/importer.py'")
+        self.connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,342 @@
+# tests/test_mail_outbox.py
+import os
+import smtplib
+import socketserver
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from email import message_from_bytes
+import src.db.repository as repository
+from src.booking.booking import Booking
+from src.controller.controller import Controller
+from src.db.pool import ConnectionPool
+from src.mail.outbox import Outbox, MailWorker, confirmation_key, \
+        retry_delay, PENDING, SENT, FAILED
+from src.user.authenticator import Authenticator
+from src.user.user import User
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Just enough SMTP for smtplib.send_message, replies can be changed per
+    recipient through the server's 'rcpt_replies'.
+    """
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost test SMTP")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO", "NOOP"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                with server.lock:
+                    replies = server.rcpt_replies.get(address)
+                    reply = replies.pop(0) if replies else "250 OK"
+                if reply.startswith("250"):
+                    recipients.append(address)
+                self.reply(reply)
+            elif verb == "RSET":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    line = self.rfile.readline()
+                    if line in (b".\r\n", b""):
+                        break
+                    data.append(line)
+                with server.lock:
+                    server.messages.append(
+                            (recipients, message_from_bytes(b"".join(data))))
+                self.reply("250 OK queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.rcpt_replies = {}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_booking(title="Meeting", hour=9, booking_id=None):
+    # a saved booking, its id is the hour unless given
+    booking = Booking()
+    booking.id = hour if booking_id is None else booking_id
+    booking.title = title
+    booking.date = datetime(2024, 5, 1)
+    booking.time = (hour, 0)
+    booking.contact = "Friend"
+    booking.description = "About things."
+    booking.duration = 30
+    return booking
+
+
+class TestMailOutbox(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/mail/outbox.py'")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(
+                os.path.join(self.tmp_dir.name, "mail_test.db"), size=2)
+        with self.pool.cursor() as cursor:
+            repository.create_tables(cursor)
+        self.clock = FakeClock()
+        self.outbox = Outbox(self.pool, clock=self.clock)
+        self.smtp = SMTPStub()
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+        self.worker = MailWorker(
+                self.outbox, port=self.smtp.server_address[1], batch_size=10,
+                max_attempts=3, retry_delay=30, poll_interval=0.05)
+
+    def tearDown(self):
+        self.worker.stop(timeout=5)
+        self.worker.close_connection()
+        self.smtp.shutdown()
+        self.smtp.server_close()
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def make_controller(self):
+        user = User("user", "user@email.com")
+        user.id = 1
+        return Controller(user=user, authenticator=Authenticator(self.pool),
+                          mailer=self.worker)
+
+    def test_confirmation_key(self):
+        print("=== test_confirmation_key ===")
+        key = confirmation_key(make_booking())
+        # the same booking after an edit keeps its key
+        self.assertEqual(key, confirmation_key(make_booking("Lunch", 9)))
+        self.assertNotEqual(key, confirmation_key(make_booking(hour=10)))
+        with self.assertRaises(ValueError):
+            confirmation_key(Booking())
+
+    def test_retry_delay(self):
+        print("=== test_retry_delay ===")
+        for attempts, expected in ((1, 30), (2, 60), (3, 120), (10, 3600)):
+            with self.subTest(attempts=attempts):
+                self.assertEqual(retry_delay(attempts, 30, 3600), expected)
+
+    def test_batch_over_one_connection(self):
+        print("=== test_batch_over_one_connection ===")
+        for hour in range(9, 14):
+            self.worker.request_confirmation(
+                    "user", make_booking(hour=hour), "Friend",
+                    "friend@email.com")
+        self.assertEqual(self.outbox.counts()[PENDING], 5)
+        counts = self.worker.run_once()
+        self.assertEqual(counts, {"sent": 5, "retried": 0, "failed": 0})
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 5)
+        recipients, message = self.smtp.messages[0]
+        self.assertEqual(recipients, ["friend@email.com"])
+        self.assertEqual(message["Subject"], "Booking confirmation: Meeting")
+        self.assertIn("2024-05-01 at 09:00", message.get_payload())
+        self.assertEqual(self.outbox.counts(),
+                         {PENDING: 0, SENT: 5, FAILED: 0})
+        # the next round reuses the open connection
+        self.worker.request_confirmation(
+                "user", make_booking("Lunch", 14), "Friend",
+                "friend@email.com")
+        self.worker.run_once()
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(self.worker.connections, 1)
+
+    def test_deduplication(self):
+        print("=== test_deduplication ===")
+        booking = make_booking()
+        for _ in range(3):
+            self.worker.request_confirmation(
+                    "user", booking, "Friend", "friend@email.com")
+        self.assertEqual(self.outbox.counts()[PENDING], 1)
+        self.assertEqual(self.worker.run_once()["sent"], 1)
+        self.worker.request_confirmation(
+                "user", booking, "Friend", "friend@email.com")
+        self.assertEqual(self.outbox.counts(),
+                         {PENDING: 0, SENT: 1, FAILED: 0})
+        self.assertEqual(len(self.smtp.messages), 1)
+
+    def test_retry_with_backoff(self):
+        print("=== test_retry_with_backoff ===")
+        self.smtp.rcpt_replies["busy@email.com"] = [
+                "451 Try again later", "451 Try again later"]
+        self.worker.request_confirmation(
+                "user", make_booking(hour=9), "Busy", "busy@email.com")
+        self.worker.request_confirmation(
+                "user", make_booking(hour=10), "Friend", "friend@email.com")
+        counts = self.worker.run_once()
+        self.assertEqual((counts["sent"], counts["retried"]), (1, 1))
+        # not due until the delay has passed
+        self.clock.now += 29
+        self.assertEqual(self.worker.run_once()["retried"], 0)
+        self.clock.now += 1
+        self.assertEqual(self.worker.run_once()["retried"], 1)
+        self.clock.now += 59
+        self.assertEqual(self.worker.run_once()["sent"], 0)
+        self.clock.now += 1
+        self.assertEqual(self.worker.run_once()["sent"], 1)
+        self.assertEqual(self.outbox.counts(),
+                         {PENDING: 0, SENT: 2, FAILED: 0})
+
+    def test_failures(self):
+        print("=== test_failures ===")
+        self.smtp.rcpt_replies["gone@email.com"] = ["550 No such user"]
+        self.smtp.rcpt_replies["busy@email.com"] = ["451 Busy"] * 3
+        for hour, name in ((9, "gone"), (10, "busy")):
+            self.worker.request_confirmation(
+                    "user", make_booking(hour=hour), name,
+                    f"{name}@email.com")
+        counts = self.worker.run_once()
+        self.assertEqual((counts["failed"], counts["retried"]), (1, 1))
+        for _ in range(2):
+            self.clock.now += 3600
+            self.worker.run_once()
+        self.assertEqual(self.outbox.counts(),
+                         {PENDING: 0, SENT: 0, FAILED: 2})
+
+    def test_server_down(self):
+        print("=== test_server_down ===")
+        self.worker.port = 1
+        for hour in (9, 10):
+            self.worker.request_confirmation(
+                    "user", make_booking(hour=hour), "Friend",
+                    "friend@email.com")
+        counts = self.worker.run_once()
+        self.assertEqual((counts["sent"], counts["retried"]), (0, 2))
+        # the emails keep their attempts, the worker waits to reconnect
+        self.assertEqual([row[4] for row in self.outbox.due(10)], [0, 0])
+        self.worker.port = self.smtp.server_address[1]
+        self.clock.now += 29
+        self.assertEqual(self.worker.run_once()["sent"], 0)
+        self.clock.now += 1
+        self.assertEqual(self.worker.run_once()["sent"], 2)
+
+    def test_connection_refused(self):
+        print("=== test_connection_refused ===")
+        calls = []
+
+        def refuse_once(host, port, timeout):
+            calls.append(port)
+            if len(calls) == 1:
+                raise smtplib.SMTPConnectError(554, b"No service")
+            return smtplib.SMTP(host, port, timeout=timeout)
+
+        self.worker.smtp_factory = refuse_once
+        for hour in (9, 10, 11):
+            self.worker.request_confirmation(
+                    "user", make_booking(hour=hour), "Friend",
+                    "friend@email.com")
+        counts = self.worker.run_once()
+        # one refused connection is not a permanent failure of each email
+        self.assertEqual(counts, {"sent": 0, "retried": 3, "failed": 0})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.outbox.counts(),
+                         {PENDING: 3, SENT: 0, FAILED: 0})
+        self.clock.now += 30
+        self.assertEqual(self.worker.run_once()["sent"], 3)
+        self.assertEqual(len(calls), 2)
+
+    def test_background_worker(self):
+        print("=== test_background_worker ===")
+        self.outbox.clock = time.time
+        self.worker.start()
+        self.assertTrue(self.worker.running)
+        controller = self.make_controller()
+        for hour in range(9, 12):
+            controller.create_booking(
+                    "Meeting", datetime(2024, 5, 1), (hour, 0), "Friend",
+                    "friend@email.com", "About things.", 30)
+        deadline = time.monotonic() + 5
+        while self.outbox.counts()[SENT] < 3 and \
+                time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.worker.stop(timeout=5)
+        self.assertFalse(self.worker.running)
+
+    def test_booking_does_not_wait_for_mail(self):
+        print("=== test_booking_does_not_wait_for_mail ===")
+        # the email is stored straight away but nothing is sent until the
+        # worker runs
+        controller = self.make_controller()
+        booking = controller.create_booking(
+                "Meeting", datetime(2024, 5, 1), (9, 0), "Friend",
+                "friend@email.com", "About things.", 30)
+        self.assertIsNotNone(booking.id)
+        self.assertEqual(self.outbox.counts()[PENDING], 1)
+        self.assertEqual(self.smtp.connections, 0)
+        # a worker started later, e.g. after a restart, still sends it
+        worker = MailWorker(self.outbox, port=self.smtp.server_address[1])
+        try:
+            self.assertEqual(worker.run_once()["sent"], 1)
+        finally:
+            worker.close_connection()
+        with self.pool.cursor() as cursor:
+            stored, = repository.load_bookings(cursor, 1)
+        self.assertEqual(stored.id, booking.id)
+
+    def test_unsaved_user(self):
+        print("=== test_unsaved_user ===")
+        controller = Controller(user=User("user", "user@email.com"),
+                                mailer=self.worker)
+        with self.assertRaises(ValueError):
+            controller.create_booking(
+                    "Meeting", datetime(2024, 5, 1), (9, 0), "Friend",
+                    "friend@email.com", "About things.", 30)
+        self.assertEqual(controller.user.bookings, [])
+
+    def test_failed_save(self):
+        print("=== test_failed_save ===")
+        with self.pool.cursor() as cursor:
+            cursor.execute("CREATE TRIGGER fail_bookings BEFORE INSERT ON "
+                           "bookings BEGIN SELECT RAISE(ABORT, 'full'); END")
+        controller = self.make_controller()
+        with self.assertRaises(RuntimeError):
+            controller.create_booking(
+                    "Meeting", datetime(2024, 5, 1), (9, 0), "Friend",
+                    "friend@email.com", "About things.", 30)
+        # the booking isn't left behind and nothing was queued
+        self.assertEqual(controller.user.bookings, [])
+        self.assertEqual(list(controller.user.calendar.bookings_on(
+                datetime(2024, 5, 1))), [])
+        self.assertEqual(sum(self.outbox.counts().values()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
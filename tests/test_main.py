@@ -1,12 +1,50 @@
 # tests/test_main.py
+import os
+import tempfile
+import src.db.db as db
+import src.db.repository as repository
 import src.main
 import unittest
+from src.utils.auth import set_hash_profile
 
 
 class TestMain(unittest.TestCase):
     def test_run_main_successful(self):
         print("TestMain is running")
-        src.main.main()
+        src.main.main([])
+
+    def test_create_user(self):
+        print("=== test_create_user ===")
+        set_hash_profile("test")
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_name = os.path.join(tmp_dir.name, "main_test.db")
+
+        def create(username, email, *passwords):
+            answers = iter(passwords)
+            return src.main.main(
+                    ["--db", db_name, "--create-user", username, email],
+                    ask=lambda prompt: next(answers))
+
+        try:
+            for username, email, passwords, expected in (
+                    ("ann", "ann@email.com", ("secret", "secret"), 0),
+                    ("ann", "other@email.com", ("secret", "secret"), 1),
+                    ("bob", "bob@email.com", ("secret", "typo"), 1),
+                    ("bob", "bob@email.com", ("",), 1),
+                    ("bob", "not-an-email", ("secret", "secret"), 1)):
+                with self.subTest(username=username, email=email,
+                                  passwords=passwords):
+                    self.assertEqual(create(username, email, *passwords),
+                                     expected)
+            db.create_connection(_db_name=db_name)
+            ann = repository.find_account(db.cursor, "ann")
+            bob = repository.find_account(db.cursor, "bob")
+            db.close()
+        finally:
+            set_hash_profile(None)
+            tmp_dir.cleanup()
+        self.assertIsNotNone(ann)
+        self.assertIsNone(bob)
 
 
 if __name__ == '__main__':
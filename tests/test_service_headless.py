@@ -0,0 +1,139 @@
+# tests/test_service_headless.py
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+from src.service.headless import HeadlessService, main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestHeadlessService(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/service/headless.py'")
+        self.service = HeadlessService(batch_size=2)
+        self.service.controller.reset_user()
+        self.booking = {
+                "op": "create_booking", "title": "Catch up",
+                "date": "2024-05-01", "time": "09:30",
+                "contact_name": "Jane", "contact_email": "jane@email.com",
+                "description": "Coffee", "duration": 30}
+
+    def test_no_gui_imports(self):
+        print("=== test_no_gui_imports ===")
+        completed = subprocess.run(
+                [sys.executable, "-c",
+                 "import sys, src.service.headless; "
+                 "print('tkinter' in sys.modules)"],
+                cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(completed.stdout.strip(), "False")
+
+    def test_add_contact(self):
+        print("=== test_add_contact ===")
+        command = {"op": "add_contact", "id": 7, "name": "Jane",
+                   "email": "jane@email.com"}
+        first = self.service.handle(command)
+        second = self.service.handle(command)
+        self.assertTrue(first["ok"])
+        self.assertEqual(first["id"], 7)
+        self.assertEqual(first["result"]["email"], "jane@email.com")
+        self.assertEqual(first["result"]["id"], second["result"]["id"])
+        self.assertEqual(len(self.service.controller.user.contacts), 1)
+
+    def test_create_and_list_bookings(self):
+        print("=== test_create_and_list_bookings ===")
+        response = self.service.handle(self.booking)
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["result"]["time"], "09:30")
+        conflict = self.service.handle(self.booking)
+        self.assertFalse(conflict["ok"])
+        self.assertIn("overlaps", conflict["error"])
+        listed = self.service.handle(
+                {"op": "list_bookings", "date": "2024-05-01"})
+        self.assertEqual(len(listed["result"]), 1)
+        self.assertEqual(listed["result"][0]["duration"], 30)
+        other_day = self.service.handle(
+                {"op": "list_bookings", "date": "2024-05-02"})
+        self.assertEqual(other_day["result"], [])
+
+    def test_recurring_booking(self):
+        print("=== test_recurring_booking ===")
+        self.booking["recurrence"] = "FREQ=WEEKLY;COUNT=4"
+        response = self.service.handle(self.booking)
+        self.assertEqual(response["result"]["recurrence"],
+                         "FREQ=WEEKLY;COUNT=4")
+        listed = self.service.handle(
+                {"op": "list_bookings", "date": "2024-05-22"})
+        self.assertEqual(listed["result"][0]["date"], "2024-05-22")
+        self.booking["recurrence"] = "FREQ=WEEKLY;BYDAY=MO"
+        self.booking["time"] = "15:00"
+        self.assertIn("BYDAY", self.service.handle(self.booking)["error"])
+
+    def test_errors(self):
+        print("=== test_errors ===")
+        bad_commands = [
+                "not json",
+                "[1, 2]",
+                json.dumps({"op": "fly"}),
+                json.dumps({"op": "add_contact", "name": "Jane"}),
+                json.dumps({"op": "add_contact", "name": "",
+                            "email": "jane@email.com"}),
+                ]
+        for line in bad_commands:
+            with self.subTest(
+                    msg="Test commands that are answered with an error.",
+                    value=line):
+                response = self.service.handle_line(line)
+                self.assertFalse(response["ok"])
+                self.assertIn("error", response)
+
+    def test_unexpected_errors(self):
+        print("=== test_unexpected_errors ===")
+        lines = [json.dumps(dict(self.booking, date=5)),
+                 json.dumps({"op": "add_contact", "name": "Jane",
+                             "email": "notanemail"}),
+                 json.dumps(self.booking)]
+        output = io.StringIO()
+        counts = self.service.run(lines, output)
+        self.assertEqual(counts, {"commands": 3, "failed": 2})
+        responses = [json.loads(line)
+                     for line in output.getvalue().splitlines()]
+        self.assertIn("AttributeError", responses[0]["error"])
+        self.assertIn("email", responses[1]["error"])
+        self.assertTrue(responses[2]["ok"])
+
+    def test_run_in_batches(self):
+        print("=== test_run_in_batches ===")
+        lines = [json.dumps(dict(self.booking, time=f"{hour:02d}:00"))
+                 for hour in range(9, 14)] + ["", "oops"]
+        output = io.StringIO()
+        counts = self.service.run(lines, output)
+        self.assertEqual(counts, {"commands": 6, "failed": 1})
+        responses = [json.loads(line)
+                     for line in output.getvalue().splitlines()]
+        self.assertEqual(len(responses), 6)
+        self.assertEqual(len(self.service.controller.list_bookings()), 5)
+
+    def test_main(self):
+        print("=== test_main ===")
+        stdin = io.StringIO(json.dumps({"op": "list_bookings"}) + "\n")
+        stdout = io.StringIO()
+        self.assertEqual(main([], stdin=stdin, stdout=stdout), 0)
+        self.assertEqual(json.loads(stdout.getvalue())["result"], [])
+
+    def test_batch_size_failure(self):
+        print("=== test_batch_size_failure ===")
+        with self.assertRaises(ValueError):
+            HeadlessService(batch_size=0)
+
+    def tearDown(self):
+        print("End of testing 'src/service/headless.py'")
+        self.service.controller.reset_user()
+        self.service = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,281 @@
+# tests/test_service_http_server.py
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import src.db.repository as repository
+from src.db.pool import ConnectionPool
+from src.service.http_server import HTTPServer
+from src.user.authenticator import Authenticator
+from src.utils.auth import generate_pw_hash, set_hash_profile
+
+
+async def send(port, method, path, payload=None, body=None, close=False,
+               token=None):
+    """
+        Sends one request on a new connection and returns (status, response).
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if body is None:
+        body = json.dumps(payload).encode() if payload is not None else b""
+    connection = "Connection: close\r\n" if close else ""
+    if token is not None:
+        connection += f"Authorization: Bearer {token}\r\n"
+    writer.write((f"{method} {path} HTTP/1.1\r\n{connection}"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    response = json.loads(
+            await reader.readexactly(int(headers["content-length"])))
+    writer.close()
+    return status, response
+
+
+class TestHTTPServer(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/service/http_server.py'")
+        self.booking = {
+                "title": "Catch up", "date": "2024-05-01", "time": "09:30",
+                "contact_name": "Jane", "contact_email": "jane@email.com",
+                "description": "Coffee", "duration": 30}
+
+    def run_with_server(self, scenario):
+        async def run():
+            server = HTTPServer(port=0, max_workers=2)
+            server.service.controller.reset_user()
+            await server.start()
+            try:
+                return await scenario(server)
+            finally:
+                server.service.controller.reset_user()
+                await server.close()
+        return asyncio.run(run())
+
+    def test_contacts_and_bookings(self):
+        print("=== test_contacts_and_bookings ===")
+
+        async def scenario(server):
+            contact = await send(server.port, "POST", "/contacts",
+                                 {"name": "Jane", "email": "jane@email.com"})
+            created = await send(server.port, "POST", "/bookings",
+                                 self.booking)
+            conflict = await send(server.port, "POST", "/bookings",
+                                  self.booking)
+            listed = await send(server.port, "GET",
+                                "/bookings?date=2024-05-01")
+            return contact, created, conflict, listed
+
+        contact, created, conflict, listed = self.run_with_server(scenario)
+        self.assertEqual(contact[0], 200)
+        self.assertEqual(contact[1]["result"]["name"], "Jane")
+        self.assertEqual(created[0], 200)
+        self.assertEqual(created[1]["result"]["time"], "09:30")
+        self.assertEqual(conflict[0], 400)
+        self.assertIn("overlaps", conflict[1]["error"])
+        self.assertEqual(listed[0], 200)
+        self.assertEqual(len(listed[1]["result"]), 1)
+
+    def test_login(self):
+        print("=== test_login ===")
+
+        async def scenario(server):
+            user = server.service.controller.user
+            user.user_name = "user"
+            user.password = generate_pw_hash("secret", "test")
+            good = await send(server.port, "POST", "/login",
+                              {"username": "user", "password": "secret"})
+            bad = await send(server.port, "POST", "/login",
+                             {"username": "user", "password": "wrong"})
+            return good, bad
+
+        good, bad = self.run_with_server(scenario)
+        self.assertEqual(good, (200, {"id": None, "ok": True,
+                                      "result": True}))
+        self.assertEqual(bad[1]["result"], False)
+
+    def test_keep_alive(self):
+        print("=== test_keep_alive ===")
+
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", server.port)
+            statuses = []
+            for _ in range(3):
+                writer.write(b"GET /bookings HTTP/1.1\r\n\r\n")
+                await writer.drain()
+                statuses.append(int((await reader.readline()).split()[1]))
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line == b"\r\n":
+                        break
+                    if line.lower().startswith(b"content-length"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+            writer.close()
+            return statuses
+
+        self.assertEqual(self.run_with_server(scenario), [200, 200, 200])
+
+    def test_errors(self):
+        print("=== test_errors ===")
+        requests = [
+                (("GET", "/nowhere"), 404),
+                (("DELETE", "/bookings"), 405),
+                (("POST", "/contacts", None, b"{oops"), 400),
+                (("POST", "/contacts", None, b"[1, 2]"), 400),
+                (("POST", "/contacts", {"name": "Jane"}), 400),
+                ]
+
+        async def scenario(server):
+            return [await send(server.port, *args, close=True)
+                    for args, _ in requests]
+
+        responses = self.run_with_server(scenario)
+        for (args, expected), (status, response) in zip(requests, responses):
+            with self.subTest(
+                    msg="Test requests that are answered with an error.",
+                    value=args):
+                self.assertEqual(status, expected)
+                self.assertFalse(response["ok"])
+
+    def test_sessions(self):
+        print("=== test_sessions ===")
+        set_hash_profile("test")
+        tmp_dir = tempfile.TemporaryDirectory()
+        pool = ConnectionPool(os.path.join(tmp_dir.name, "http_test.db"))
+        with pool.cursor() as cursor:
+            repository.create_tables(cursor)
+        authenticator = Authenticator(pool, max_failures=2)
+        authenticator.register("ann", "ann-secret", "ann@email.com")
+        authenticator.register("bob", "bob-secret", "bob@email.com")
+
+        async def run():
+            server = HTTPServer(port=0, authenticator=authenticator)
+            await server.start()
+            try:
+                port = server.port
+                ann = (await send(port, "POST", "/login", {
+                    "username": "ann", "password": "ann-secret"}))[1]
+                bob = (await send(port, "POST", "/login", {
+                    "username": "bob", "password": "bob-secret"}))[1]
+                ann_token = ann["result"]["session"]
+                bob_token = bob["result"]["session"]
+                created = await send(port, "POST", "/bookings", self.booking,
+                                     token=ann_token)
+                ann_list = await send(port, "GET", "/bookings",
+                                      token=ann_token)
+                bob_list = await send(port, "GET", "/bookings",
+                                      token=bob_token)
+                anonymous = await send(port, "GET", "/bookings")
+                unknown = await send(port, "GET", "/bookings", token="nope")
+                failures = [(await send(port, "POST", "/login", {
+                    "username": "bob", "password": "wrong"}))[0]
+                    for _ in range(3)]
+                return (created, ann_list, bob_list, anonymous, unknown,
+                        failures)
+            finally:
+                await server.close()
+
+        try:
+            (created, ann_list, bob_list, anonymous, unknown,
+             failures) = asyncio.run(run())
+            # the session's booking and contact were saved
+            with pool.cursor() as cursor:
+                ann_id = repository.find_account(cursor, "ann")[0]
+                stored = list(repository.load_bookings(cursor, ann_id))
+                contacts = list(repository.load_contacts(cursor, ann_id))
+        finally:
+            set_hash_profile(None)
+            pool.close()
+            tmp_dir.cleanup()
+        self.assertEqual(created[0], 200)
+        self.assertEqual(len(ann_list[1]["result"]), 1)
+        self.assertEqual(bob_list[1]["result"], [])
+        self.assertEqual(anonymous[0], 401)
+        self.assertEqual(unknown[0], 401)
+        self.assertEqual(failures, [401, 401, 429])
+        self.assertEqual([booking.title for booking in stored], ["Catch up"])
+        self.assertEqual([contact.email for contact in contacts],
+                         ["jane@email.com"])
+
+    def test_failed_save(self):
+        print("=== test_failed_save ===")
+        set_hash_profile("test")
+        tmp_dir = tempfile.TemporaryDirectory()
+        pool = ConnectionPool(os.path.join(tmp_dir.name, "http_test.db"))
+        with pool.cursor() as cursor:
+            repository.create_tables(cursor)
+            cursor.execute("CREATE TRIGGER fail_bookings BEFORE INSERT ON "
+                           "bookings BEGIN SELECT RAISE(ABORT, 'full'); END")
+        authenticator = Authenticator(pool)
+        authenticator.register("ann", "ann-secret", "ann@email.com")
+
+        async def run():
+            server = HTTPServer(port=0, authenticator=authenticator)
+            await server.start()
+            try:
+                port = server.port
+                token = (await send(port, "POST", "/login", {
+                    "username": "ann", "password": "ann-secret"})
+                    )[1]["result"]["session"]
+                created = await send(port, "POST", "/bookings", self.booking,
+                                     token=token)
+                listed = await send(port, "GET", "/bookings", token=token)
+                return created, listed
+            finally:
+                await server.close()
+
+        try:
+            created, listed = asyncio.run(run())
+            with pool.cursor() as cursor:
+                ann_id = repository.find_account(cursor, "ann")[0]
+                stored = list(repository.load_bookings(cursor, ann_id))
+        finally:
+            set_hash_profile(None)
+            pool.close()
+            tmp_dir.cleanup()
+        self.assertEqual(created[0], 500)
+        self.assertFalse(created[1]["ok"])
+        # the unsaved booking isn't left in the session
+        self.assertEqual(listed[1]["result"], [])
+        self.assertEqual(stored, [])
+
+    def test_internal_errors(self):
+        print("=== test_internal_errors ===")
+
+        async def scenario(server):
+            def fail(command):
+                raise RuntimeError("boom")
+            server.service.handle = fail
+            broken = await send(server.port, "GET", "/bookings", close=True)
+            reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", server.port)
+            writer.write(b"GET /bookings HTTP/1.1\r\n"
+                         b"Content-Length: -1\r\n\r\n")
+            await writer.drain()
+            negative = int((await reader.readline()).split()[1])
+            writer.close()
+            return broken, negative
+
+        (status, response), negative = self.run_with_server(scenario)
+        self.assertEqual(status, 500)
+        self.assertFalse(response["ok"])
+        self.assertEqual(negative, 400)
+
+    def tearDown(self):
+        print("End of testing 'src/service/http_server.py'")
+        self.booking = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 import unittest
 from src.user.user import User
 from src.booking.booking import Booking
+from src.booking.recurrence import RecurrenceRule, DAILY, WEEKLY
 from src.contact.contact import Contact
 from src.utils.validators import validate_email
 from datetime import datetime
@@ -27,14 +28,12 @@ class TestUser(unittest.TestCase):
         self.assertIsInstance(self.user.password, str)
         self.assertIsInstance(self.user.contacts, list)
         self.assertIsInstance(self.user.bookings, list)
-        self.assertIsInstance(self.user._initialized, bool)
         # Value assertions
         self.assertEqual(self.user.user_name, "new_user")
         self.assertEqual(self.user.email, "update_this_email@appgenie.app")
         self.assertEqual(self.user.password, self.pw_hash)
         self.assertEqual(self.user.contacts, [])
         self.assertEqual(self.user.bookings, [])
-        self.assertEqual(self.user._initialized, True)
 
     def test_create_user_with_arguments_success(self):
         print("=== test_create_user_with_arguments_success")
@@ -52,7 +51,6 @@ class TestUser(unittest.TestCase):
         self.assertIsInstance(user.password, str)
         self.assertIsInstance(user.contacts, list)
         self.assertIsInstance(user.bookings, list)
-        self.assertIsInstance(self.user._initialized, bool)
 
         # Value assertions
         self.assertEqual(user.user_name, "test_user")
@@ -60,7 +58,6 @@ class TestUser(unittest.TestCase):
         self.assertEqual(user.password, pw_hash)
         self.assertEqual(user.contacts, [])
         self.assertEqual(user.bookings, [])
-        self.assertEqual(user._initialized, True)
 
     def test_create_user_with_arguments_failure_parameter_user_name(self):
         t_name = "test_create_user_with_arguments_failure_parameter_user_name"
@@ -219,10 +216,107 @@ class TestUser(unittest.TestCase):
         self.assertIsInstance(self.user.contacts[0], Contact)
         self.assertIsInstance(self.user.contacts[1], Contact)
 
+    def test_create_booking_with_existing_contact(self):
+        print("=== test_create_booking_with_existing_contact ===")
+        contact = Contact("My Friend", "my_friend@email.com")
+        self.user.add_contact(contact)
+        self.assertIs(
+                self.user.find_contact("my friend", "MY_FRIEND@email.com"),
+                contact)
+        self.user.create_booking(
+                "New Booking", datetime(2024, 5, 30), (12, 30),
+                "My Friend", "my_friend@email.com", desc="Test Booking")
+        self.assertEqual(self.user.contacts, [contact])
+        # Renaming the contact keeps the index in sync
+        contact.email = "best_friend@email.com"
+        self.user.create_booking(
+                "New Booking", datetime(2024, 5, 31), (12, 30),
+                "My Friend", "best_friend@email.com", desc="Test Booking")
+        self.assertEqual(self.user.contacts, [contact])
+        self.assertIsNone(
+                self.user.find_contact("My Friend", "my_friend@email.com"))
+
+    def test_create_booking_invalid_contact(self):
+        print("=== test_create_booking_invalid_contact ===")
+        for name, email, error in (
+                ("My Friend", None, ValueError),
+                ("My Friend", 5, TypeError),
+                ("My Friend", "", ValueError),
+                ("My Friend", "not-an-email", ValueError),
+                ("", "my_friend@email.com", ValueError)):
+            with self.subTest(
+                    msg="Test that an invalid contact adds nothing.",
+                    name=name, email=email):
+                with self.assertRaises(error):
+                    self.user.create_booking(
+                            "New Booking", datetime(2024, 5, 30), (12, 30),
+                            name, email, desc="Test Booking")
+                self.assertEqual(self.user.bookings, [])
+                self.assertEqual(self.user.contacts, [])
+
+    def test_create_booking_conflict(self):
+        print("=== test_create_booking_conflict ===")
+        booking = self.user.create_booking(
+                "Meeting", datetime(2024, 6, 4), (9, 0), "My Friend",
+                "my_friend@email.com", desc="Test Booking", duration=60)
+        self.assertEqual(self.user.calendar.bookings_on((2024, 6, 4)),
+                         [booking])
+        with self.assertRaises(ValueError):
+            self.user.create_booking(
+                    "Clash", datetime(2024, 6, 4), (9, 30), "My Friend",
+                    "my_friend@email.com", desc="Test Booking")
+        self.assertEqual(len(self.user.bookings), 1)
+        flagged = self.user.create_booking(
+                "Clash", datetime(2024, 6, 4), (9, 30), "My Friend",
+                "my_friend@email.com", desc="Test Booking",
+                allow_conflicts=True)
+        self.assertEqual(self.user.get_conflicts(flagged), [booking])
+        self.assertEqual(
+                self.user.get_free_slots((2024, 6, 4), (9, 0), (12, 0)),
+                [(datetime(2024, 6, 4, 10, 30), datetime(2024, 6, 4, 12, 0))])
+
+    def test_create_recurring_booking(self):
+        print("=== test_create_recurring_booking ===")
+        standup = self.user.create_booking(
+                "Standup", datetime(2024, 6, 3), (9, 0), "My Friend",
+                "my_friend@email.com", desc="Daily standup", duration=15,
+                recurrence=RecurrenceRule(DAILY))
+        self.assertEqual(len(self.user.bookings), 1)
+        on_day, = self.user.calendar.bookings_on((2025, 1, 1))
+        self.assertIs(on_day.booking, standup)
+        with self.assertRaises(ValueError):
+            self.user.create_booking(
+                    "Clash", datetime(2024, 9, 10), (9, 10), "My Friend",
+                    "my_friend@email.com", desc="Test Booking")
+        # a series that meets the standup on its third date
+        with self.assertRaises(ValueError):
+            self.user.create_booking(
+                    "Weekly", datetime(2024, 5, 22), (9, 0), "My Friend",
+                    "my_friend@email.com", desc="Test Booking",
+                    recurrence=RecurrenceRule(WEEKLY, count=3))
+        self.assertEqual(len(self.user.bookings), 1)
+
+    def test_default_password_is_hashed_lazily(self):
+        print("=== test_default_password_is_hashed_lazily ===")
+        user = User()
+        self.assertIsNone(user._password)
+        self.assertTrue(user.authenticate("new_user", "password"))
+        self.assertIsNotNone(user._password)
+
     def test_get_instance(self):
         print("=== test_get_instance ===")
         self.assertIsNotNone(self.user.get_instance())
         self.assertIsInstance(self.user.get_instance(), User)
+        self.assertIs(User.get_instance(), User.get_instance())
+
+    def test_users_are_separate(self):
+        print("=== test_users_are_separate ===")
+        first = User("first")
+        second = User("second")
+        self.assertIsNot(first, second)
+        self.assertEqual(first.user_name, "first")
+        first.add_contact(Contact("Friend", "friend@email.com"))
+        self.assertEqual(second.contacts, [])
 
     def test_reset(self):
         print("=== test_reset_user ===")
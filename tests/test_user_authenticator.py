@@ -0,0 +1,150 @@
+# tests/test_user_authenticator.py
+import os
+import tempfile
+import unittest
+from unittest import mock
+import src.db.repository as repository
+from src.db.pool import ConnectionPool
+from src.contact.contact import Contact
+from src.user.authenticator import Authenticator, LoginRateLimited
+from src.user.user import User
+from src.utils import auth
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAuthenticator(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/user/authenticator.py'")
+        auth.set_hash_profile("test")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(
+                os.path.join(self.tmp_dir.name, "auth_test.db"), size=2)
+        with self.pool.cursor() as cursor:
+            repository.create_tables(cursor)
+        self.clock = FakeClock()
+        self.authenticator = Authenticator(
+                self.pool, cache_ttl=60, max_failures=3, failure_window=300,
+                clock=self.clock)
+        self.user_id = self.authenticator.register(
+                "user", "secret", "user@email.com")
+
+    def test_authenticate(self):
+        print("=== test_authenticate ===")
+        with self.pool.cursor() as cursor:
+            stored = User("user", "user@email.com")
+            stored.add_contact(Contact("Friend", "friend@email.com"))
+            repository.save_user(cursor, self.user_id, stored)
+        user = self.authenticator.authenticate("user", "secret")
+        self.assertIsInstance(user, User)
+        self.assertEqual(user.user_name, "user")
+        self.assertEqual(user.id, self.user_id)
+        self.assertEqual(len(user.contacts), 1)
+        self.assertTrue(auth.verify_password(user.password, "secret"))
+        self.assertIsNone(self.authenticator.authenticate("user", "wrong"))
+        self.assertIsNone(self.authenticator.authenticate("nobody", "secret"))
+
+    def test_username_index(self):
+        print("=== test_username_index ===")
+        with self.pool.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + repository.SELECT_USER,
+                           ("user",))
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("idx_users_username", plan)
+
+    def test_cache_skips_verification(self):
+        print("=== test_cache_skips_verification ===")
+        self.authenticator.authenticate("user", "secret")
+        with mock.patch("src.user.authenticator.verify_and_check_rehash",
+                        side_effect=AssertionError("verified again")):
+            self.assertIsNotNone(
+                    self.authenticator.authenticate("user", "secret"))
+            # a wrong password is never answered from the cache
+            with self.assertRaises(AssertionError):
+                self.authenticator.authenticate("user", "wrong")
+        self.assertEqual(self.authenticator.cache_hits, 1)
+
+    def test_cache_expires_and_follows_password(self):
+        print("=== test_cache_expires_and_follows_password ===")
+        self.authenticator.authenticate("user", "secret")
+        self.clock.now += 61
+        self.authenticator.authenticate("user", "secret")
+        self.assertEqual(self.authenticator.cache_hits, 0)
+        # a new password hash no longer matches the cached fingerprint
+        with self.pool.cursor() as cursor:
+            repository.update_password(
+                    cursor, self.user_id, auth.generate_pw_hash("changed"))
+        self.assertIsNone(self.authenticator.authenticate("user", "secret"))
+        self.assertIsNotNone(
+                self.authenticator.authenticate("user", "changed"))
+
+    def test_rate_limit(self):
+        print("=== test_rate_limit ===")
+        for _ in range(3):
+            self.assertIsNone(self.authenticator.authenticate("user", "bad"))
+        with self.assertRaises(LoginRateLimited) as raised:
+            self.authenticator.authenticate("user", "secret")
+        self.assertEqual(raised.exception.retry_after, 300)
+        # other usernames are not affected
+        self.assertIsNone(self.authenticator.authenticate("other", "bad"))
+        self.clock.now += 301
+        self.assertIsNotNone(
+                self.authenticator.authenticate("user", "secret"))
+
+    def test_failures_are_evicted(self):
+        print("=== test_failures_are_evicted ===")
+        authenticator = Authenticator(
+                self.pool, max_failures=3, failure_window=300, max_tracked=5,
+                clock=self.clock)
+        for i in range(20):
+            authenticator.authenticate(f"guess-{i}", "bad")
+        self.assertEqual(list(authenticator._failures),
+                         [f"guess-{i}" for i in range(15, 20)])
+        # expired failures are dropped as new ones come in
+        self.clock.now += 301
+        authenticator.authenticate("late", "bad")
+        self.assertEqual(list(authenticator._failures), ["late"])
+
+    def test_success_clears_failures(self):
+        print("=== test_success_clears_failures ===")
+        for _ in range(2):
+            self.authenticator.authenticate("user", "bad")
+        self.authenticator.authenticate("user", "secret")
+        for _ in range(2):
+            self.authenticator.authenticate("user", "bad")
+        self.assertIsNotNone(
+                self.authenticator.authenticate("user", "secret"))
+
+    def test_rehash_on_login(self):
+        print("=== test_rehash_on_login ===")
+        auth.set_hash_profile("batch-import")
+        user = self.authenticator.authenticate("user", "secret")
+        self.assertEqual(auth.hash_method(user.password),
+                         auth.HASH_PROFILES["batch-import"]["method"])
+        with self.pool.cursor() as cursor:
+            row = repository.find_account(cursor, "user")
+        self.assertEqual(row[2], user.password)
+        # back on the cheaper profile the stronger hash is kept
+        auth.set_hash_profile("test")
+        self.authenticator.forget("user")
+        self.authenticator.authenticate("user", "secret")
+        with self.pool.cursor() as cursor:
+            self.assertEqual(
+                    repository.find_account(cursor, "user")[2], row[2])
+
+    def tearDown(self):
+        print("End of testing 'src/user/authenticator.py'")
+        auth.set_hash_profile(None)
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# tests/test_user_session.py
+import threading
+import unittest
+from src.user.session import SessionRegistry, Session
+from src.user.user import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionRegistry(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/user/session.py'")
+        self.clock = FakeClock()
+        self.registry = SessionRegistry(
+                max_sessions=3, idle_timeout=60, clock=self.clock)
+
+    def test_create_and_get(self):
+        print("=== test_create_and_get ===")
+        first = self.registry.create(User("first"))
+        second = self.registry.create(User("second"))
+        self.assertIsInstance(first, Session)
+        self.assertNotEqual(first.id, second.id)
+        self.assertIsNot(first.user, second.user)
+        self.assertIs(self.registry.get(first.id), first)
+        self.assertIsNone(self.registry.get("unknown"))
+        self.assertEqual(len(self.registry), 2)
+        self.assertTrue(self.registry.remove(first.id))
+        self.assertFalse(self.registry.remove(first.id))
+        self.assertNotIn(first.id, self.registry)
+
+    def test_idle_sessions_expire(self):
+        print("=== test_idle_sessions_expire ===")
+        idle = self.registry.create(User("idle"))
+        self.clock.now = 30
+        active = self.registry.create(User("active"))
+        self.clock.now = 61
+        self.assertIsNone(self.registry.get(idle.id))
+        self.assertIs(self.registry.get(active.id), active)
+        self.clock.now = 200
+        self.assertEqual(self.registry.evict_idle(), 1)
+        self.assertEqual(len(self.registry), 0)
+
+    def test_cap(self):
+        print("=== test_cap ===")
+        sessions = [self.registry.create(User(f"user{i}")) for i in range(3)]
+        # using the first session makes the second the least recently used
+        self.clock.now = 10
+        self.registry.get(sessions[0].id)
+        newest = self.registry.create(User("newest"))
+        self.assertEqual(len(self.registry), 3)
+        self.assertNotIn(sessions[1].id, self.registry)
+        self.assertIn(sessions[0].id, self.registry)
+        self.assertIn(newest.id, self.registry)
+        # idle sessions are removed before any active one
+        self.clock.now = 65
+        self.registry.get(newest.id)
+        self.registry.create(User("latest"))
+        self.assertNotIn(sessions[2].id, self.registry)
+        self.assertIn(sessions[0].id, self.registry)
+
+    def test_concurrent_access(self):
+        print("=== test_concurrent_access ===")
+        registry = SessionRegistry(max_sessions=50)
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(100):
+                    session = registry.create(User())
+                    registry.get(session.id)
+                    with session.lock:
+                        session.user.user_name = "busy"
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(registry), 50)
+
+    def test_failure(self):
+        print("=== test_failure ===")
+        with self.assertRaises(TypeError):
+            self.registry.create("user")
+        with self.assertRaises(TypeError):
+            self.registry.get(1)
+        raises_value_errors = [{"max_sessions": 0}, {"idle_timeout": 0}]
+        for invalid_value in raises_value_errors:
+            with self.subTest(
+                    msg="Test values that will raise a ValueError exception.",
+                    value=invalid_value):
+                with self.assertRaises(ValueError):
+                    SessionRegistry(**invalid_value)
+        raises_type_errors = [{"max_sessions": 1.5}, {"idle_timeout": "60"}]
+        for invalid_value in raises_type_errors:
+            with self.subTest(
+                    msg="Test values that will raise a TypeError exception.",
+                    value=invalid_value):
+                with self.assertRaises(TypeError):
+                    SessionRegistry(**invalid_value)
+
+    def tearDown(self):
+        print("End of testing 'src/user/session.py'")
+        self.registry = None
+        self.clock = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 # test/test_utils_auth.py
+import os
 import unittest
+from unittest import mock
+from src.utils import auth
 from src.utils.auth import generate_pw_hash, verify_password
 
 
@@ -93,6 +96,125 @@ class TestAuth(unittest.TestCase):
                 with self.assertRaises(TypeError):
                     generate_pw_hash(invalid_value)
 
+    def test_hash_profiles(self):
+        print("=== test_hash_profiles ===")
+        self.assertEqual(auth.get_hash_profile(), "interactive")
+        self.assertEqual(auth.hash_method(self.pw_hash), "scrypt:32768:8:1")
+        test_hash = generate_pw_hash(self.pw, profile="test")
+        self.assertEqual(auth.hash_method(test_hash), "scrypt:1024:8:1")
+        self.assertTrue(verify_password(test_hash, self.pw))
+
+        with mock.patch.dict(os.environ, {auth.HASH_PROFILE_ENV: "test"}):
+            self.assertEqual(auth.get_hash_profile(), "test")
+            auth.set_hash_profile("batch-import")
+            self.assertEqual(auth.get_hash_profile(), "batch-import")
+            auth.set_hash_profile(None)
+            self.assertEqual(auth.get_hash_profile(), "test")
+
+        raises_value_errors = [None, "", " ", "unknown"]
+        for invalid_value in raises_value_errors:
+            with self.subTest(
+                    msg="Test values that will raise a ValueError exception " +
+                    "when selecting a hash profile.",
+                    value=invalid_value):
+                with self.assertRaises(ValueError):
+                    auth.validate_hash_profile(invalid_value)
+        with self.assertRaises(ValueError):
+            auth.set_hash_profile("unknown")
+
+    def test_verify_and_check_rehash(self):
+        print("=== test_verify_and_check_rehash ===")
+        self.assertEqual(
+                auth.verify_and_check_rehash(self.pw_hash, self.pw),
+                (True, False))
+        self.assertEqual(
+                auth.verify_and_check_rehash(self.pw_hash, "wrong"),
+                (False, False))
+        test_hash = generate_pw_hash(self.pw, profile="test")
+        self.assertEqual(
+                auth.verify_and_check_rehash(test_hash, self.pw),
+                (True, True))
+        # a stronger hash is never replaced by a cheaper profile's
+        self.assertEqual(
+                auth.verify_and_check_rehash(
+                    self.pw_hash, self.pw, profile="test"),
+                (True, False))
+
+    def test_needs_rehash(self):
+        print("=== test_needs_rehash ===")
+        auth.register_hash_profile("rehash-test", "scrypt:16384:8:2")
+        try:
+            for method, expected in (
+                    ("scrypt:16384:8:2", False),
+                    ("scrypt:32768:8:1", False),  # N higher, never lowered
+                    ("scrypt:32768:8:2", False),
+                    ("scrypt:1024:8:1", True),
+                    ("scrypt:16384:4:2", True),
+                    ("pbkdf2:sha256:600000", True)):
+                with self.subTest(method=method):
+                    self.assertEqual(
+                            auth.needs_rehash(method + "$salt$hash",
+                                              "rehash-test"),
+                            expected)
+            # a profile that isn't scrypt doesn't replace a scrypt hash
+            auth.register_hash_profile("rehash-test", "pbkdf2:sha256:1000")
+            self.assertFalse(auth.needs_rehash(
+                    "scrypt:1024:8:1$salt$hash", "rehash-test"))
+        finally:
+            del auth.HASH_PROFILES["rehash-test"]
+
+    def test_user_rehashes_old_profile_on_login(self):
+        print("=== test_user_rehashes_old_profile_on_login ===")
+        from src.user.user import User
+        auth.set_hash_profile("test")
+        try:
+            user = User(user_name="user", password=self.pw)
+        finally:
+            auth.set_hash_profile(None)
+        old_hash = user.password
+        self.assertTrue(user.authenticate("user", self.pw))
+        self.assertNotEqual(user.password, old_hash)
+        self.assertEqual(auth.hash_method(user.password), "scrypt:32768:8:1")
+        self.assertTrue(verify_password(user.password, self.pw))
+        # logging in under a cheaper profile keeps the stronger hash
+        strong_hash = user.password
+        auth.set_hash_profile("test")
+        try:
+            self.assertTrue(user.authenticate("user", self.pw))
+        finally:
+            auth.set_hash_profile(None)
+        self.assertEqual(user.password, strong_hash)
+
+    def test_calibrate(self):
+        print("=== test_calibrate ===")
+        result = auth.calibrate(
+                target_ms=10000, max_n=2 ** 11, samples=1,
+                profile="calibration-test")
+        self.assertEqual(result["method"], "scrypt:2048:8:1")
+        self.assertIsInstance(result["ms"], float)
+        self.assertEqual(
+                auth.get_profile_settings("calibration-test")["method"],
+                "scrypt:2048:8:1")
+        # A target no N can meet falls back to the cheapest one
+        result = auth.calibrate(
+                target_ms=0, max_n=2 ** 11, samples=1,
+                profile="calibration-test")
+        self.assertEqual(result["method"], "scrypt:1024:8:1")
+        # N values past the memory cap are never tried
+        result = auth.calibrate(
+                target_ms=10000, max_n=2 ** 20, samples=1,
+                profile="calibration-test", max_memory=128 * 8 * 2 ** 11)
+        self.assertEqual(result["method"], "scrypt:2048:8:1")
+        del auth.HASH_PROFILES["calibration-test"]
+        for kwargs in ({"min_n": 2 ** 12, "max_n": 2 ** 11},
+                       {"min_n": 2 ** 12, "max_memory": 2 ** 20},
+                       {"min_n": 1}, {"min_n": 3000}):
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(ValueError):
+                    auth.calibrate(samples=1, profile="calibration-test",
+                                   **kwargs)
+        self.assertNotIn("calibration-test", auth.HASH_PROFILES)
+
     def tearDown(self):
         print("End of testing 'src/utils/auth.py'")
         self.pw = None
@@ -0,0 +1,90 @@
+# tests/test_utils_auth_service.py
+import asyncio
+import unittest
+from concurrent.futures import Future
+from src.utils.auth import verify_password, default_password_hash, \
+        DEFAULT_PASSWORD
+from src.utils.auth_service import AuthService
+
+
+class TestAuthService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = AuthService(max_workers=2)
+
+    def setUp(self):
+        print("Testing '/src/utils/auth_service.py'")
+        self.pw = "password"
+        self.generic_string_type_error_values = [
+                1, 2.2, [2, 3], {}, ()]
+
+    def test_executor_is_lazy(self):
+        print("=== test_executor_is_lazy ===")
+        service = AuthService()
+        self.assertIsNone(service._executor)
+        service.shutdown()
+
+    def test_submit_hash_and_verify(self):
+        print("=== test_submit_hash_and_verify ===")
+        future = self.service.submit_hash(self.pw)
+        self.assertIsInstance(future, Future)
+        pw_hash = future.result()
+        self.assertTrue(verify_password(pw_hash, self.pw))
+        self.assertTrue(
+                self.service.submit_verify(pw_hash, self.pw).result())
+        self.assertFalse(
+                self.service.submit_verify(pw_hash, "wrong").result())
+
+    def test_async_hash_and_verify(self):
+        print("=== test_async_hash_and_verify ===")
+
+        async def run():
+            hashes = await asyncio.gather(
+                    self.service.hash_password("first"),
+                    self.service.hash_password("second"))
+            checks = await asyncio.gather(
+                    self.service.verify_password(hashes[0], "first"),
+                    self.service.verify_password(hashes[1], "first"))
+            return checks
+
+        self.assertEqual(asyncio.run(run()), [True, False])
+
+    def test_submit_failure(self):
+        print("=== test_submit_failure ===")
+        raises_value_errors = [None, "", ' ']
+        for invalid_value in raises_value_errors:
+            with self.subTest(
+                    msg="Test values that will raise a ValueError exception " +
+                    "before any work is submitted.",
+                    value=invalid_value):
+                with self.assertRaises(ValueError):
+                    self.service.submit_hash(invalid_value)
+                with self.assertRaises(ValueError):
+                    self.service.submit_verify(invalid_value, self.pw)
+        for invalid_value in self.generic_string_type_error_values:
+            with self.subTest(
+                    msg="Test values that will raise a TypeError exception " +
+                    "before any work is submitted.",
+                    value=invalid_value):
+                with self.assertRaises(TypeError):
+                    self.service.submit_hash(invalid_value)
+
+    def test_default_password_hash_is_cached(self):
+        print("=== test_default_password_hash_is_cached ===")
+        self.assertIs(default_password_hash(), default_password_hash())
+        self.assertTrue(
+                verify_password(default_password_hash(), DEFAULT_PASSWORD))
+
+    def tearDown(self):
+        print("End of testing 'src/utils/auth_service.py'")
+        self.pw = None
+        self.generic_string_type_error_values = None
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_utils_log.py
+import unittest
+import logging
+from src.utils import log
+from src.contact.contact import Contact
+from src.controller.controller import Controller
+
+
+class CountingRepr:
+    def __init__(self):
+        self.calls = 0
+
+    def __repr__(self):
+        self.calls += 1
+        return "CountingRepr()"
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def handle(self, record):
+        self.records.append(record)
+        return True
+
+
+class TestLog(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/utils/log.py'")
+        self.logger = log.get_logger("test")
+        self.events = []
+        self.handlers = []
+
+    def hook(self, event, fields, record):
+        self.events.append((event, fields, record.getMessage()))
+
+    def test_logging_is_off_by_default(self):
+        print("=== test_logging_is_off_by_default ===")
+        value = CountingRepr()
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+        log.log_event(self.logger, "test_event", "value: %r", value)
+        # The message was never formatted
+        self.assertEqual(value.calls, 0)
+
+    def test_event_hook(self):
+        print("=== test_event_hook ===")
+        self.handlers.append(log.add_event_hook(self.hook))
+        log.log_event(self.logger, "test_event", "%s + %s", 1, 2, answer=3)
+        self.assertEqual(self.events, [("test_event", {"answer": 3}, "1 + 2")])
+
+    def test_model_events(self):
+        print("=== test_model_events ===")
+        self.handlers.append(log.add_event_hook(self.hook))
+        contact = Contact("Test Contact", "test@app_genie.app")
+        controller = Controller()
+        controller.handle_add_contact(["Test Contact", "test@app_genie.app"])
+        controller.handle_login("nobody", "password")
+        events = [event for event, _, _ in self.events]
+        # handle_add_contact creates the controller's own Contact
+        self.assertEqual(
+                events, ["contact_created", "contact_created", "add_contact",
+                         "login"])
+        self.assertIn(repr(contact), self.events[0][2])
+        self.assertEqual(self.events[3][1], {"success": False})
+
+    def test_buffered_sink(self):
+        print("=== test_buffered_sink ===")
+        target = ListHandler()
+        sink = log.install_buffered_sink(target, capacity=3)
+        self.handlers.append(sink)
+        for i in range(7):
+            log.log_event(self.logger, "test_event", "record %d", i)
+        # Two full batches were handed over, one record is still buffered
+        self.assertEqual(len(target.records), 6)
+        log.remove_sink(sink)
+        self.handlers.remove(sink)
+        self.assertEqual(len(target.records), 7)
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+
+    def tearDown(self):
+        print("End of testing 'src/utils/log.py'")
+        for handler in self.handlers:
+            log.remove_sink(handler)
+        self.handlers = None
+        self.events = None
+
+
+if __name__ == '__main__':
+    unittest.main()
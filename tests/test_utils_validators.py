@@ -1,6 +1,7 @@
 # tests/test_utils_validators.py
 import src.utils.validators as val
 from datetime import datetime
+import itertools
 import unittest
 
 
@@ -350,6 +351,54 @@ class TestUtilsValidators(unittest.TestCase):
                 with self.assertRaises(TypeError):
                     val.validate_email(invalid_value)
 
+    def test_is_valid_email(self):
+        print("=== test_is_valid_email ===")
+        for email in ["my_test_email@my_mail.com", "a@b.c",
+                      "my.test.email@my_mail.co.uk"]:
+            with self.subTest(msg="Test valid emails.", value=email):
+                self.assertTrue(val.is_valid_email(email))
+        for email in ["", " ", None, 10, "my_bad_email.com", "my.email@bad",
+                      "will_this.email.fail@", "broken@mymail.com.", "@.",
+                      "a.b@c"]:
+            with self.subTest(msg="Test invalid emails.", value=email):
+                self.assertFalse(val.is_valid_email(email))
+
+    def test_validate_email_matches_previous_rules(self):
+        print("=== test_validate_email_matches_previous_rules ===")
+
+        def previous_rules(email):
+            # The checks validate_email made before it used a regex
+            if '@' in email and '.' in email:
+                at_index = email.find('@')
+                dot_index = email.find('.')
+                if email.count('.') > 1:
+                    for i in range(dot_index, len(email)):
+                        if email[i] == '.':
+                            dot_index = i
+                return dot_index != len(email) - 1 and dot_index > at_index
+            return False
+
+        # every string of up to 5 of these characters
+        candidates = ("".join(chars) for length in range(1, 6)
+                      for chars in itertools.product("a@.\n ", repeat=length))
+        for email in candidates:
+            if not email.strip():
+                continue
+            with self.subTest(msg="Test the same emails are accepted.",
+                              value=email):
+                self.assertEqual(val.is_valid_email(email),
+                                 previous_rules(email))
+
+    def test_validate_emails(self):
+        print("=== test_validate_emails ===")
+        emails = ["good@mail.com", "bad_mail.com", None, "also@good.co.uk",
+                  10, " ", "broken@mymail.com."]
+        errors = val.validate_emails(emails)
+        self.assertEqual([row for row, _ in errors], [1, 2, 4, 5, 6])
+        self.assertEqual(errors[0], (1, "Invalid 'email' format."))
+        self.assertEqual(errors[2], (4, "'email' must be a string."))
+        self.assertEqual(val.validate_emails(iter(["a@b.c", "d@e.f"])), [])
+
     def test_validate_string_tuple_property_success(self):
         print("=== test_validate_string_tuple_property ===")
         test_string_tuple = ("testing", "string", "tuple")
@@ -20,7 +20,7 @@ class TestView(unittest.TestCase):
         self.assertIsInstance(self.view.width, int)
         self.assertIsInstance(self.view.height, int)
         self.assertIsInstance(self.view.components, list)
-        self.assertIsInstance(self.view.tk, tk.Tk)
+        self.assertIsInstance(self.view.tk, tk.Toplevel)
         self.assertIsInstance(self.view.frame, ttk.Frame)
         self.assertEqual(self.view.title, "new_view")
         self.assertEqual(self.view.size, (300, 400))
@@ -180,6 +180,34 @@ class TestView(unittest.TestCase):
                 with self.assertRaises(TypeError):
                     self.view.get_component(invalid_value)
 
+    def test_components_is_read_only(self):
+        print("=== test_components_is_read_only ===")
+        button = self.view.create_button("my_button")
+        components = self.view.components
+        components.clear()
+        self.assertEqual(
+                self.view.components,
+                [{self.view.frame.name: self.view.frame},
+                 {"my_button": button}])
+        # A duplicate name keeps resolving to the first widget
+        self.view.create_button("my_button")
+        self.assertIs(self.view.get_component("my_button"), button)
+        self.assertEqual(len(self.view.components), 3)
+        with self.assertRaises(AttributeError):
+            self.view.components = []
+
+    def test_get_components_of_type(self):
+        print("=== test_get_components_of_type ===")
+        label = self.view.create_label("my_label")
+        entry = self.view.create_entry_text_field("my_entry")
+        button = self.view.create_button("my_button")
+        self.assertEqual(
+                self.view.get_components_of_type(tk.Button), [button])
+        self.assertEqual(
+                self.view.get_components_of_type(tk.Entry, ttk.Label),
+                [label, entry])
+        self.assertEqual(self.view.get_components_of_type(tk.Spinbox), [])
+
     def test_create_label(self):
         print("=== test_create_label ===")
         self.view.create_label("my_label", "test_label")
@@ -634,8 +662,7 @@ class TestView(unittest.TestCase):
         for comp in self.view.components:
             if isinstance(comp, DateEntry):
                 comp.destroy()
-        self.view.components.clear()
-        self.view.components = None
+        self.view.clear_components()
         self.view.tk.destroy()
         self.view = None
 
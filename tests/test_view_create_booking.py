@@ -98,7 +98,7 @@ class TestViewCreateBooking(unittest.TestCase):
                                                             new_date.day))
 
     def tearDown(self):
-        self.create_booking.components = None
+        self.create_booking.clear_components()
         self.create_booking.tk.destroy()
         self.create_booking = None
 
@@ -0,0 +1,101 @@
+# tests/test_view_font_cache.py
+import unittest
+from src.views.font_cache import FontCache
+
+
+class FakeRoot:
+    def __init__(self):
+        self.tk = object()
+
+
+class FakeFont:
+    def __init__(self, root=None, **options):
+        self._tk = getattr(root, 'tk', root)
+        self.options = options
+
+
+class TestFontCache(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/views/font_cache.py'")
+        self.root = FakeRoot()
+        self.cache = FontCache(max_size=3, factory=FakeFont)
+
+    def test_hit_and_miss(self):
+        print("=== test_hit_and_miss ===")
+        first = self.cache.get(self.root, "Arial", 9)
+        second = self.cache.get(self.root, "Arial", 9)
+        bold = self.cache.get(self.root, "Arial", 9, weight="bold")
+        self.assertIs(first, second)
+        self.assertIsNot(first, bold)
+        self.assertEqual(bold.options["weight"], "bold")
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_underline_key(self):
+        print("=== test_underline_key ===")
+        self.assertEqual(FontCache.make_key("Arial", 9, underline=True),
+                         ("Arial", 9, "normal", "roman", 1))
+        self.assertIs(self.cache.get(self.root, "Arial", 9, underline=True),
+                      self.cache.get(self.root, "Arial", 9, underline=1))
+
+    def test_eviction(self):
+        print("=== test_eviction ===")
+        for size in (9, 10, 11):
+            self.cache.get(self.root, "Arial", size)
+        # use size 9 again so size 10 is the least recently used
+        self.cache.get(self.root, "Arial", 9)
+        self.cache.get(self.root, "Arial", 12)
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertNotIn(FontCache.make_key("Arial", 10), self.cache)
+        self.assertIn(FontCache.make_key("Arial", 9), self.cache)
+
+    def test_other_root_is_a_miss(self):
+        print("=== test_other_root_is_a_miss ===")
+        first = self.cache.get(self.root, "Arial", 9)
+        other_root = FakeRoot()
+        second = self.cache.get(other_root, "Arial", 9)
+        self.assertIsNot(first, second)
+        self.assertIs(second._tk, other_root.tk)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertIs(self.cache.get(other_root, "Arial", 9), second)
+
+    def test_stats_and_clear(self):
+        print("=== test_stats_and_clear ===")
+        self.cache.get(self.root, "Arial", 9)
+        self.cache.get(self.root, "Arial", 9)
+        self.assertEqual(self.cache.stats(), {
+            "size": 1, "max_size": 3, "hits": 1, "misses": 1,
+            "evictions": 0})
+        self.cache.clear()
+        self.cache.reset_stats()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_failure(self):
+        print("=== test_failure ===")
+        for invalid_value in [0, -1]:
+            with self.subTest(
+                    msg="Test values that will raise a ValueError exception.",
+                    value=invalid_value):
+                with self.assertRaises(ValueError):
+                    FontCache(max_size=invalid_value)
+        for invalid_value in [1.5, "3", None]:
+            with self.subTest(
+                    msg="Test values that will raise a TypeError exception.",
+                    value=invalid_value):
+                with self.assertRaises((TypeError, ValueError)):
+                    FontCache(max_size=invalid_value)
+        with self.assertRaises(TypeError):
+            self.cache.get(self.root, "Arial", "9")
+
+    def tearDown(self):
+        print("End of testing 'src/views/font_cache.py'")
+        self.cache = None
+        self.root = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+# tests/test_view_window_manager.py
+import unittest
+import tkinter as tk
+from src.views.view import View
+from src.views.window_manager import WindowManager
+
+
+class TestWindowManager(unittest.TestCase):
+
+    def setUp(self):
+        print("Testing '/src/views/window_manager.py'")
+        self.manager = WindowManager()
+
+    def test_single_root(self):
+        print("=== test_single_root ===")
+        first = View("first", window_manager=self.manager)
+        second = View("second", window_manager=self.manager)
+        self.assertIsInstance(self.manager.root, tk.Tk)
+        self.assertIsInstance(first.tk, tk.Toplevel)
+        self.assertIs(first.tk.master, self.manager.root)
+        self.assertIs(second.tk.master, self.manager.root)
+        self.assertEqual(self.manager.root.state(), "withdrawn")
+        self.assertEqual(len(self.manager.windows), 2)
+
+    def test_show_hide_and_switch(self):
+        print("=== test_show_hide_and_switch ===")
+        first = View("first", window_manager=self.manager)
+        second = View("second", window_manager=self.manager)
+        first.hide()
+        self.assertFalse(first.visible)
+        self.assertTrue(second.visible)
+        first.show()
+        self.assertTrue(first.visible)
+        self.manager.switch_to(second.tk)
+        self.assertEqual(self.manager.visible_windows, [second.tk])
+
+    def test_close_hides_window(self):
+        print("=== test_close_hides_window ===")
+        view = View("closing", window_manager=self.manager)
+        # run the handler the window manager registered for the close button
+        view.tk.tk.call(view.tk.protocol("WM_DELETE_WINDOW"))
+        self.assertFalse(view.visible)
+        self.assertIn(view.tk, self.manager.windows)
+
+    def test_destroyed_root_is_replaced(self):
+        print("=== test_destroyed_root_is_replaced ===")
+        View("first", window_manager=self.manager)
+        old_root = self.manager.root
+        old_root.destroy()
+        view = View("second", window_manager=self.manager)
+        self.assertIsNot(self.manager.root, old_root)
+        self.assertEqual(self.manager.windows, [view.tk])
+
+    def tearDown(self):
+        print("End of testing 'src/views/window_manager.py'")
+        self.manager.destroy()
+        self.manager = None
+
+
+if __name__ == '__main__':
+    unittest.main()